@@ -1,7 +1,13 @@
 from django.contrib import admin
+from django.db.models import Count
+from django.utils import timezone
 from .models import (
-    Event, Team, Player, PlayerStatistics, Match, Tournament, Recommendation
+    Event, Team, Player, PlayerStatistics, PlayerMatchStat, CommandJournalEntry, Match, Tournament, Recommendation, TeamRating, TeamRatingHistory
 )
+from .services.standings_sync import deferred_standings, mark_dirty
+from .services.ratings import EloRatingSystem
+from .services.player_stats_updater import remove_player_match_stats
+from .services.tournament_cache import tournament_cache
 
 class PlayerInline(admin.TabularInline):
     model = Player
@@ -20,9 +26,12 @@ class TeamAdmin(admin.ModelAdmin):
     search_fields = ('name', 'coach')
     inlines = [PlayerInline]
 
-    @admin.display(description="Кількість гравців")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(players_count=Count('players'))
+
+    @admin.display(description="Кількість гравців", ordering='players_count')
     def player_count_display(self, obj):
-        return obj.players.count()
+        return obj.players_count
 
 @admin.register(Player)
 class PlayerAdmin(admin.ModelAdmin):
@@ -67,9 +76,12 @@ class EventAdmin(admin.ModelAdmin):
         ('Participants', {'fields': ('teams',)}),
     )
 
-    @admin.display(description="Кількість команд")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(teams_count=Count('teams'))
+
+    @admin.display(description="Кількість команд", ordering='teams_count')
     def teams_count_display(self, obj):
-        return obj.teams.count()
+        return obj.teams_count
 
 @admin.register(Match)
 class MatchAdmin(admin.ModelAdmin):
@@ -79,8 +91,8 @@ class MatchAdmin(admin.ModelAdmin):
     list_editable = ('status',)
     list_select_related = ('team1', 'team2', 'tournament')
     actions = ['mark_as_finished', 'mark_as_scheduled', 'mark_as_cancelled']
-    fields = ('tournament', 'team1', 'team2', 'match_datetime', 'status', 'score1', 'score2')
-    readonly_fields = ('team1', 'team2', 'tournament')
+    fields = ('tournament', 'team1', 'team2', 'match_datetime', 'status', 'score1', 'score2', 'venue', 'simulation_seed')
+    readonly_fields = ('team1', 'team2', 'tournament', 'simulation_seed')
 
     @admin.display(description="Рахунок")
     def get_score(self, obj):
@@ -91,21 +103,36 @@ class MatchAdmin(admin.ModelAdmin):
     @admin.action(description="Позначити вибрані матчі як Завершені")
     def mark_as_finished(self, request, queryset):
         updated_count = 0
-        for match in queryset:
-            if match.score1 is not None and match.score2 is not None:
-                 match.status = Match.STATUS_FINISHED
-                 match.save(update_fields=['status'])
-                 updated_count += 1
+        with deferred_standings():
+            for match in queryset:
+                if match.score1 is not None and match.score2 is not None:
+                     match.status = Match.STATUS_FINISHED
+                     match.save(update_fields=['status'])
+                     updated_count += 1
         self.message_user(request, f"{updated_count} матчів позначено як завершені.")
 
     @admin.action(description="Позначити вибрані матчі як Заплановані")
     def mark_as_scheduled(self, request, queryset):
-        updated_count = queryset.update(status=Match.STATUS_SCHEDULED, score1=None, score2=None)
+        with deferred_standings():
+            tournament_ids = list(queryset.values_list('tournament_id', flat=True).distinct())
+            mark_dirty(*tournament_ids)
+            tournament_cache.invalidate(*tournament_ids)
+            match_ids = list(queryset.values_list('id', flat=True))
+            EloRatingSystem().revert_matches(match_ids)
+            remove_player_match_stats(match_ids)
+            updated_count = queryset.update(status=Match.STATUS_SCHEDULED, score1=None, score2=None, updated_at=timezone.now())
         self.message_user(request, f"{updated_count} матчів позначено як заплановані (рахунок скинуто).")
 
     @admin.action(description="Позначити вибрані матчі як Скасовані")
     def mark_as_cancelled(self, request, queryset):
-        updated_count = queryset.update(status=Match.STATUS_CANCELLED)
+        with deferred_standings():
+            tournament_ids = list(queryset.values_list('tournament_id', flat=True).distinct())
+            mark_dirty(*tournament_ids)
+            tournament_cache.invalidate(*tournament_ids)
+            match_ids = list(queryset.values_list('id', flat=True))
+            EloRatingSystem().revert_matches(match_ids)
+            remove_player_match_stats(match_ids)
+            updated_count = queryset.update(status=Match.STATUS_CANCELLED, updated_at=timezone.now())
         self.message_user(request, f"{updated_count} матчів позначено як скасовані.")
 
 
@@ -116,20 +143,26 @@ class TournamentAdmin(admin.ModelAdmin):
     search_fields = ('name', 'event__name', 'winner__name')
     filter_horizontal = ('teams',)
     list_editable = ('status',)
-    readonly_fields = ('standings',)
+    list_select_related = ('event', 'winner')
+    readonly_fields = ('standings', 'bracket')
     fieldsets = (
-        (None, {'fields': ('name', 'event', 'status', 'winner')}),
+        (None, {'fields': ('name', 'event', 'status', 'winner', 'rounds_planned')}),
         ('Participants', {'fields': ('teams',)}),
-        ('Standings', {'fields': ('standings', 'final_standings')}),
+        ('Standings', {'fields': ('standings', 'final_standings', 'bracket')}),
     )
 
-    @admin.display(description="Кількість команд")
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            teams_count=Count('teams', distinct=True), matches_count=Count('matches', distinct=True),
+        )
+
+    @admin.display(description="Кількість команд", ordering='teams_count')
     def teams_count_display(self, obj):
-        return obj.teams.count()
+        return obj.teams_count
 
-    @admin.display(description="Кількість матчів")
+    @admin.display(description="Кількість матчів", ordering='matches_count')
     def matches_count_display(self, obj):
-        return obj.matches.count()
+        return obj.matches_count
 
 @admin.register(PlayerStatistics)
 class PlayerStatisticsAdmin(admin.ModelAdmin):
@@ -137,6 +170,43 @@ class PlayerStatisticsAdmin(admin.ModelAdmin):
     search_fields = ('player__name',)
     readonly_fields = ('player',)
 
+@admin.register(PlayerMatchStat)
+class PlayerMatchStatAdmin(admin.ModelAdmin):
+    list_display = ('player', 'match', 'team', 'goals', 'assists', 'appeared')
+    list_filter = ('appeared', 'match__tournament')
+    search_fields = ('player__name',)
+    list_select_related = ('player', 'team', 'match__team1', 'match__team2')
+    readonly_fields = ('player', 'match', 'team', 'goals', 'assists', 'appeared')
+
+@admin.register(CommandJournalEntry)
+class CommandJournalEntryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'action', 'command_type', 'match', 'tournament', 'undone')
+    list_filter = ('action', 'command_type', 'undone', 'tournament')
+    list_select_related = ('match__team1', 'match__team2', 'tournament')
+    readonly_fields = ('action', 'command_type', 'match', 'tournament', 'target', 'payload',
+                       'previous_state', 'result_state', 'stat_deltas', 'undone', 'created_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TeamRating)
+class TeamRatingAdmin(admin.ModelAdmin):
+    list_display = ('team', 'rating', 'matches_rated', 'updated_at')
+    search_fields = ('team__name',)
+    list_select_related = ('team',)
+    readonly_fields = ('team', 'rating', 'matches_rated', 'updated_at')
+
+@admin.register(TeamRatingHistory)
+class TeamRatingHistoryAdmin(admin.ModelAdmin):
+    list_display = ('team', 'match', 'rating_before', 'rating_after', 'match_datetime')
+    list_filter = ('team',)
+    list_select_related = ('team', 'match__team1', 'match__team2')
+    readonly_fields = ('team', 'match', 'rating_before', 'rating_after', 'match_datetime')
+
 
 @admin.register(Recommendation)
 class RecommendationAdmin(admin.ModelAdmin):
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import uuid
+from datetime import date
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Q, Sum
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
+
+from .models import Match, PlayerMatchStat, PlayerStatistics, Tournament
+from .pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+from .services.tournament_cache import tournament_cache
+
+STANDINGS_FIELDS = ('team_id', 'team_name', 'played', 'won', 'drawn', 'lost', 'gf', 'ga', 'gd', 'points')
+
+FIXTURE_FIELDS = {
+    'id': 'id',
+    'tournament_id': 'tournament_id',
+    'round_number': 'round_number',
+    'match_datetime': 'match_datetime',
+    'status': 'status',
+    'team1_id': 'team1_id',
+    'team1_name': 'team1__name',
+    'team2_id': 'team2_id',
+    'team2_name': 'team2__name',
+    'score1': 'score1',
+    'score2': 'score2',
+    'venue': 'venue',
+}
+
+SCORER_FIELDS = {
+    'player_id': 'player_id',
+    'player_name': 'player__name',
+    'team_id': 'team_id',
+    'goals': 'goals',
+    'assists': 'assists',
+}
+
+LEADERBOARD_FIELDS = ('player_id', 'player_name', 'team_name', 'games_played', 'goals', 'assists')
+LEADERBOARD_STATS = ('goals', 'assists', 'games_played')
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(view):
+    """GET-only JSON-ендпоінт: ApiError перетворюється на {'errors': [...]} з відповідним статусом."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'errors': [str(e)]}, status=e.status)
+    return wrapper
+
+
+def serialize(data):
+    body = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def json_response(request, data):
+    """Серіалізує data без шаблонів; ETag — хеш тіла, If-None-Match з тим самим тегом дає 304."""
+    return conditional_json(request, *serialize(data))
+
+
+def cached_json_response(request, tournament_id, build):
+    """
+    Як json_response, але тіло й ETag кешуються під версією турніру (tournament_cache):
+    до наступної зміни турніру повторний запит з тими ж параметрами не робить запитів до БД.
+    """
+    query = '&'.join(f'{key}={value}' for key, value in sorted(request.GET.items()))
+    name = 'api:' + hashlib.sha1(f'{request.path}?{query}'.encode()).hexdigest()
+    return conditional_json(request, *tournament_cache.get_or_set(tournament_id, name, lambda: serialize(build())))
+
+
+def conditional_json(request, body, etag):
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def selected_fields(request, allowed):
+    """?fields=a,b — підмножина allowed у порядку запиту; без параметра — усі поля."""
+    raw = request.GET.get('fields')
+    if not raw:
+        return list(allowed)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ApiError(f"Невідомі поля: {', '.join(unknown) or raw}. Доступні: {', '.join(allowed)}.")
+    return fields
+
+
+def uuid_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ApiError(f"Параметр {name} має бути UUID.")
+
+
+def project(queryset, mapping, names):
+    """values() лише з потрібних колонок; поля з іншим шляхом (team1__name) — під своїм ім'ям."""
+    plain = [name for name in names if mapping[name] == name]
+    renamed = {name: F(mapping[name]) for name in names if mapping[name] != name}
+    return queryset.values(*plain, **renamed)
+
+
+def paginated(request, queryset, ordering, fields):
+    try:
+        page_size = int(request.GET.get('size', DEFAULT_PAGE_SIZE))
+        page = keyset_paginate(queryset, ordering, after=request.GET.get('after'), before=request.GET.get('before'), page_size=page_size)
+    except ValueError as e:
+        raise ApiError(str(e))
+    return {
+        'results': [{name: row[name] for name in fields} for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+
+
+@api_view
+def tournament_standings(request, tournament_id):
+    """Збережена турнірна таблиця турніру (Tournament.standings) без перерахунку."""
+    fields = selected_fields(request, STANDINGS_FIELDS)
+
+    def build():
+        tournament = Tournament.objects.filter(pk=tournament_id).values('id', 'name', 'status', 'standings').first()
+        if tournament is None:
+            raise ApiError("Турнір не знайдено.", status=404)
+        table = (tournament['standings'] or {}).get('table') or []
+        return {
+            'tournament': {'id': tournament['id'], 'name': tournament['name'], 'status': tournament['status']},
+            'table': [{name: row.get(name) for name in fields} for row in table],
+        }
+    return cached_json_response(request, tournament_id, build)
+
+
+@api_view
+def fixtures(request):
+    """Матчі з фільтрами ?tournament=, ?date=YYYY-MM-DD, ?status=; курсорна пагінація за часом матчу."""
+    fields = selected_fields(request, FIXTURE_FIELDS)
+    queryset = Match.objects.all()
+    tournament_id = uuid_param(request, 'tournament')
+    if tournament_id:
+        queryset = queryset.filter(tournament_id=tournament_id)
+    if request.GET.get('date'):
+        try:
+            queryset = queryset.filter(match_datetime__date=date.fromisoformat(request.GET['date']))
+        except ValueError:
+            raise ApiError("Дата має бути у форматі YYYY-MM-DD.")
+    if request.GET.get('status'):
+        if request.GET['status'] not in dict(Match.STATUS_CHOICES):
+            raise ApiError("Невідомий статус матчу.")
+        queryset = queryset.filter(status=request.GET['status'])
+
+    ordering = ['match_datetime', 'id']
+    queryset = project(queryset, FIXTURE_FIELDS, list(dict.fromkeys(fields + ordering)))
+    if tournament_id:
+        return cached_json_response(request, tournament_id, lambda: paginated(request, queryset, ordering, fields))
+    return json_response(request, paginated(request, queryset, ordering, fields))
+
+
+@api_view
+def match_detail(request, match_id):
+    """Матч і його рядки PlayerMatchStat (автори голів і асистів)."""
+    fields = selected_fields(request, FIXTURE_FIELDS)
+    match = project(Match.objects.filter(pk=match_id), FIXTURE_FIELDS, fields).first()
+    if match is None:
+        raise ApiError("Матч не знайдено.", status=404)
+    scorers = project(
+        PlayerMatchStat.objects.filter(match_id=match_id).filter(Q(goals__gt=0) | Q(assists__gt=0)),
+        SCORER_FIELDS, list(SCORER_FIELDS),
+    ).order_by('-goals', '-assists', 'player__name')
+    return json_response(request, {'match': match, 'scorers': list(scorers)})
+
+
+@api_view
+def player_leaderboard(request):
+    """
+    Рейтинг гравців за ?stat=goals|assists|games_played. Без ?tournament= — зі зведення
+    PlayerStatistics (індекси за голами/асистами), з ним — агрегат PlayerMatchStat турніру.
+    """
+    fields = selected_fields(request, LEADERBOARD_FIELDS)
+    stat = request.GET.get('stat', 'goals')
+    if stat not in LEADERBOARD_STATS:
+        raise ApiError(f"Параметр stat має бути одним з: {', '.join(LEADERBOARD_STATS)}.")
+
+    names = {'player_name': F('player__name'), 'team_name': F('player__team__name')}
+    tournament_id = uuid_param(request, 'tournament')
+    if tournament_id:
+        queryset = PlayerMatchStat.objects.filter(match__tournament_id=tournament_id).values('player_id', **names).annotate(
+            games_played=Count('id', filter=Q(appeared=True)), goals=Sum('goals'), assists=Sum('assists'),
+        )
+    else:
+        queryset = PlayerStatistics.objects.values('player_id', 'games_played', 'goals', 'assists', **names)
+    ordering = [f'-{stat}', '-player_id']
+    if tournament_id:
+        return cached_json_response(request, tournament_id, lambda: paginated(request, queryset, ordering, fields))
+    return json_response(request, paginated(request, queryset, ordering, fields))
@@ -1,9 +1,13 @@
+import logging
 from django.apps import AppConfig
 
+logger = logging.getLogger(__name__)
+
 class SimulatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'simulator'
 
     def ready(self):
         import simulator.signals
-        print("Simulator signals registered.")
\ No newline at end of file
+        import simulator.checks
+        logger.debug("Simulator signals registered.")
\ No newline at end of file
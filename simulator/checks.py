@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .services.tournament_cache import tournament_cache
+
+
+@register(Tags.caches)
+def check_tournament_cache_backend(app_configs, **kwargs):
+    """Кеш турнірів на LocMemCache поза DEBUG: кожен воркер бачить лише власні інвалідації."""
+    if settings.DEBUG or not tournament_cache.process_local:
+        return []
+    return [Warning(
+        f"SIMULATOR_TOURNAMENT_CACHE_ALIAS '{tournament_cache.alias}' uses a process-local cache backend.",
+        hint=(
+            "Version bumps are not visible to other worker processes, so their cached tournament pages, "
+            "API payloads and ETags can be stale for up to SIMULATOR_TOURNAMENT_CACHE_LOCAL_TIMEOUT seconds. "
+            "Point the alias at a shared backend (Redis, Memcached, database or file-based) in CACHES."
+        ),
+        id='simulator.W001',
+    )]
@@ -39,7 +39,7 @@ class PlayerForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        if self.instance and self.instance.pk:
+        if self.instance and not self.instance._state.adding:
              try:
                  stats = self.instance.statistics
                  self.fields['goals'].initial = stats.goals
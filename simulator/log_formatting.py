@@ -0,0 +1,25 @@
+import json
+import logging
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Один JSON-об'єкт на запис: час, рівень, логер, повідомлення, а також
+    додаткові поля з extra={...} і traceback, якщо він є.
+    """
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
@@ -0,0 +1,42 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from simulator.services.command_journal import CommandJournal
+from simulator.services.commands import batch_commands_from_payload
+
+
+class Command(BaseCommand):
+    help = (
+        'Applies a batch of match results from a JSON file in one transaction: '
+        '{"results": [{"match_id", "score1", "score2", "scorers1_ids", ...}], "simulate": [match_id, ...], "seed": int}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the JSON file.')
+        parser.add_argument('--validate-only', action='store_true', help='Only validate the batch, do not write anything.')
+        parser.add_argument('--workers', type=int, default=1, help='Worker processes for simulated matches.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as f:
+                commands = batch_commands_from_payload(json.load(f), workers=options['workers'])
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options['validate_only']:
+            errors = [error for command in commands for error in command.validate()[1]]
+            if errors:
+                raise CommandError("\n".join(errors))
+            self.stdout.write(self.style.SUCCESS("Batch is valid."))
+            return
+
+        journal = CommandJournal()
+        try:
+            with transaction.atomic():
+                entries = [entry for command in commands for entry in journal.execute_batch(command)]
+        except ValidationError as e:
+            raise CommandError("\n".join(e.messages))
+        self.stdout.write(self.style.SUCCESS(f"Applied {len(entries)} match results."))
@@ -8,6 +8,9 @@ import logging
 from simulator.models import Team, Player, PlayerStatistics, Tournament, Event, Match
 from simulator.services.schedule_generator import create_schedule_generator
 from simulator.services.commands import SimulateMatchResultCommand
+from simulator.services.parallel_simulation import ParallelMatchSimulator
+from simulator.services.monte_carlo import SimulationRNG
+from simulator.services.team_cache import team_cache
 
 logger = logging.getLogger(__name__)
 DEMO_PREFIX = "DEMO_"
@@ -23,6 +26,8 @@ class Command(BaseCommand):
         parser.add_argument('--tournaments', type=int, default=2, help='Number of tournaments per event.')
         parser.add_argument('--events', type=int, default=1, help='Number of events to generate.')
         parser.add_argument('--simulate-matches', type=float, default=0.5, help='Fraction of generated matches to simulate results for (0.0 to 1.0).')
+        parser.add_argument('--seed', type=int, default=None, help='Root seed for data generation and simulation; the same seed replays the same run.')
+        parser.add_argument('--workers', type=int, default=0, help='Simulate matches in a process pool with this many workers (0 = serial, one command per match).')
 
     @transaction.atomic
     def handle(self, *args, **options):
@@ -38,10 +43,13 @@ class Command(BaseCommand):
             num_tournaments = options['tournaments']
             num_events = options['events']
             simulate_fraction = options['simulate_matches']
+            workers = options['workers']
+            self.sim_rng = SimulationRNG(options['seed'])
+            self.random = random.Random(self.sim_rng.seed)
 
             self.stdout.write(self.style.SUCCESS(f"Generating sample data ({num_events} events, {num_tournaments} tour/event, {num_teams} teams, {num_players} play/team)..."))
-            self.generate_data(num_events, num_tournaments, num_teams, num_players, simulate_fraction)
-            self.stdout.write(self.style.SUCCESS("Sample data generated successfully."))
+            self.generate_data(num_events, num_tournaments, num_teams, num_players, simulate_fraction, workers)
+            self.stdout.write(self.style.SUCCESS(f"Sample data generated successfully (seed {self.sim_rng.seed})."))
         elif delete:
             self.stdout.write(self.style.WARNING(f"Deleting sample data with prefix '{DEMO_PREFIX}'..."))
             self.delete_data()
@@ -49,7 +57,7 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING("Please specify either --generate or --delete flag."))
 
-    def generate_data(self, num_events, num_tournaments_per_event, num_teams, num_players_per_team, simulate_fraction):
+    def generate_data(self, num_events, num_tournaments_per_event, num_teams, num_players_per_team, simulate_fraction, workers=0):
         team_names = ["Dragons", "Lions", "Eagles", "Sharks", "Wolves", "Bears", "Falcons", "Cobras", "Vipers", "Titans", "Hawks", "Panthers"]
         player_first_names = ["Alex", "Ben", "Chris", "Dan", "Ethan", "Finn", "Greg", "Hugo", "Ivan", "Jack", "Ken", "Liam"]
         player_last_names = ["Smith", "Jones", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor", "Anderson", "Thomas", "Martin"]
@@ -60,21 +68,21 @@ class Command(BaseCommand):
 
         created_teams_map = {}
         for i in range(num_teams):
-            name = f"{DEMO_PREFIX}{random.choice(team_names)}_{i+1}"
-            coach = f"Coach {random.choice(player_last_names)}"
+            name = f"{DEMO_PREFIX}{self.random.choice(team_names)}_{i+1}"
+            coach = f"Coach {self.random.choice(player_last_names)}"
             team, created = Team.objects.get_or_create(name=name, defaults={'coach': coach})
             created_teams_map[name] = team
             if created:
                 self.stdout.write(f"Created Team: {name}")
                 players_to_create = []
                 for j in range(num_players_per_team):
-                    p_name = f"{random.choice(player_first_names)} {random.choice(player_last_names)} {i*num_players_per_team + j}"
-                    age = random.randint(18, 35)
-                    position = random.choice(positions)
+                    p_name = f"{self.random.choice(player_first_names)} {self.random.choice(player_last_names)} {i*num_players_per_team + j}"
+                    age = self.random.randint(18, 35)
+                    position = self.random.choice(positions)
                     player = Player(name=p_name, age=age, position=position, team=team)
                     players_to_create.append(player)
                 created_players = Player.objects.bulk_create(players_to_create)
-                stats_to_create = [PlayerStatistics(player=p, goals=random.randint(0,5), assists=random.randint(0,7), games_played=random.randint(5,15)) for p in created_players]
+                stats_to_create = [PlayerStatistics(player=p) for p in created_players]
                 PlayerStatistics.objects.bulk_create(stats_to_create)
                 self.stdout.write(f"  - Created {len(created_players)} players with stats")
             else:
@@ -85,23 +93,24 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("No teams available to assign to events/tournaments."))
             return
 
+        parallel_match_ids = []
         for i in range(num_events):
-            ev_name = f"{DEMO_PREFIX}{random.choice(event_names)} {i+1}"
+            ev_name = f"{DEMO_PREFIX}{self.random.choice(event_names)} {i+1}"
             start_dt = timezone.now().date() + timedelta(days=i*30)
-            end_dt = start_dt + timedelta(days=random.randint(7, 20))
+            end_dt = start_dt + timedelta(days=self.random.randint(7, 20))
             event, ev_created = Event.objects.get_or_create(
                 name=ev_name,
-                defaults={'location': random.choice(locations), 'start_date': start_dt, 'end_date': end_dt}
+                defaults={'location': self.random.choice(locations), 'start_date': start_dt, 'end_date': end_dt}
             )
             if ev_created: self.stdout.write(f"Created Event: {ev_name}")
 
             for j in range(num_tournaments_per_event):
-                tourn_name = f"{DEMO_PREFIX}{event.name} {random.choice(tournament_names)} {j+1}"
+                tourn_name = f"{DEMO_PREFIX}{event.name} {self.random.choice(tournament_names)} {j+1}"
                 tournament, t_created = Tournament.objects.get_or_create(name=tourn_name, defaults={'event': event})
                 if t_created:
                     self.stdout.write(f"  - Created Tournament: {tourn_name}")
-                    num_teams_in_tourn = random.randint(min(2, len(all_created_teams)), min(len(all_created_teams), 16))
-                    teams_for_tournament = random.sample(all_created_teams, num_teams_in_tourn)
+                    num_teams_in_tourn = self.random.randint(min(2, len(all_created_teams)), min(len(all_created_teams), 16))
+                    teams_for_tournament = self.random.sample(all_created_teams, num_teams_in_tourn)
                     tournament.teams.add(*teams_for_tournament)
                     self.stdout.write(f"    - Added {len(teams_for_tournament)} teams")
 
@@ -109,19 +118,24 @@ class Command(BaseCommand):
                         try:
                             sched_start_date = event.start_date + timedelta(days=1)
                             generator = create_schedule_generator('round_robin')
-                            created_matches = generator.create_matches_for_tournament(tournament, sched_start_date)
+                            created_matches = generator.create_matches_for_tournament(tournament, sched_start_date, rng=self.sim_rng)
                             self.stdout.write(f"    - Generated {len(created_matches)} matches")
                             tournament.status = Tournament.STATUS_ONGOING
                             tournament.save(update_fields=['status'])
 
-                            matches_to_simulate = random.sample(
+                            matches_to_simulate = self.random.sample(
                                 created_matches,
                                 k=int(len(created_matches) * simulate_fraction)
                             )
+                            if workers:
+                                parallel_match_ids.extend(match.id for match in matches_to_simulate)
+                                matches_to_simulate = []
                             simulated_count = 0
+                            if matches_to_simulate:
+                                team_cache.preload(team.id for team in teams_for_tournament)
                             for match in matches_to_simulate:
                                 try:
-                                    sim_command = SimulateMatchResultCommand(match_id=match.id)
+                                    sim_command = SimulateMatchResultCommand(match_id=match.id, rng=self.sim_rng)
                                     sim_command.execute()
                                     simulated_count += 1
                                 except Exception as sim_err:
@@ -137,6 +151,11 @@ class Command(BaseCommand):
                 else:
                     self.stdout.write(f"  - Tournament {tourn_name} already exists.")
 
+        if parallel_match_ids:
+            simulator = ParallelMatchSimulator(workers=workers, seed=self.sim_rng)
+            results = simulator.simulate_matches(Match.objects.filter(pk__in=parallel_match_ids))
+            self.stdout.write(f"Simulated results for {len(results)} matches using {workers} workers")
+
     def delete_data(self):
         deleted_count_info = {}
 
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from simulator.services.monte_carlo import SimulationRNG
+from simulator.services.tournament_projection import TournamentProjection
+
+
+class Command(BaseCommand):
+    help = 'Projects final tournament standings by simulating all remaining scheduled matches in memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tournament_id', help='UUID of the tournament to project.')
+        parser.add_argument('--replications', type=int, default=20000, help='Number of Monte Carlo replications.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible projections.')
+
+    def handle(self, *args, **options):
+        rng = SimulationRNG(options['seed'])
+        try:
+            projection = TournamentProjection(options['tournament_id'], replications=options['replications'], rng=rng)
+            rows = projection.project()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Projection for '{projection.tournament.name}' ({options['replications']} replications, seed {rng.seed}):"
+        ))
+        for entry in rows:
+            positions = " ".join(f"{p * 100:5.1f}" for p in entry['position_probabilities'])
+            self.stdout.write(
+                f"{entry['team_name']:<25} pts={entry['current_points']:<4} "
+                f"exp={entry['expected_points']:6.1f} win={entry['win_probability'] * 100:5.1f}% | {positions}"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from simulator.services.player_stats_updater import rebuild_player_statistics
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the PlayerStatistics rollup from per-match PlayerMatchStat rows.'
+
+    def handle(self, *args, **options):
+        count = rebuild_player_statistics()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {count} players."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from simulator.services.ratings import EloRatingSystem, K_FACTOR
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds Elo ratings and rating history by replaying all finished matches in match_datetime order.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Matches read and history rows written per batch.')
+        parser.add_argument('--k-factor', type=float, default=K_FACTOR, help='Elo K-factor.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        match_count, team_count = EloRatingSystem(k_factor=options['k_factor']).rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Replayed {match_count} matches, rated {team_count} teams."))
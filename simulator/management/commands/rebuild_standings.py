@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from simulator.models import Tournament
+from simulator.services.tournament_manager import TournamentManager
+
+
+class Command(BaseCommand):
+    help = 'Verifies incrementally maintained tournament standings against a full recompute and repairs mismatches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tournament_ids', nargs='*', help='UUIDs of tournaments to check (default: all).')
+        parser.add_argument('--check', action='store_true', help='Only report mismatches, do not write anything.')
+        parser.add_argument('--force', action='store_true', help='Rewrite standings even when they already match.')
+
+    def handle(self, *args, **options):
+        tournament_ids = options['tournament_ids'] or list(Tournament.objects.values_list('id', flat=True))
+        mismatched = []
+
+        for tournament_id in tournament_ids:
+            try:
+                manager = TournamentManager(tournament_id=tournament_id)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            expected = manager.serialize_standings(manager.calculate_standings())
+            stored = (manager.tournament.standings or {}).get('table')
+            if stored != expected:
+                mismatched.append(manager.tournament)
+                self.stdout.write(self.style.WARNING(f"Standings mismatch: {manager.tournament.name} ({tournament_id})"))
+
+            if not options['check'] and (stored != expected or options['force']):
+                manager.update_tournament_standings()
+
+        if options['check'] and mismatched:
+            raise CommandError(f"{len(mismatched)} of {len(tournament_ids)} tournaments have inconsistent standings.")
+
+        action = "checked" if options['check'] else "verified/repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tournament_ids)} tournaments {action}, {len(mismatched)} mismatches found."
+        ))
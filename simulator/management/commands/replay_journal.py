@@ -0,0 +1,39 @@
+from datetime import datetime, time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from simulator.models import Tournament
+from simulator.services.command_journal import CommandJournal
+
+
+def parse_day(value):
+    try:
+        return timezone.make_aware(datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), time.min))
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = 'Re-applies results of active journaled match commands in one transaction, recomputing each tournament once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only commands journaled on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--until', help='Only commands journaled before this date (YYYY-MM-DD).')
+        parser.add_argument('--tournament', help='Only commands for this tournament UUID.')
+
+    def handle(self, *args, **options):
+        since = parse_day(options['since']) if options['since'] else None
+        until = parse_day(options['until']) if options['until'] else None
+        tournament_id = options['tournament']
+        if tournament_id is not None:
+            try:
+                if not Tournament.objects.filter(pk=tournament_id).exists():
+                    raise CommandError(f"Tournament '{tournament_id}' does not exist.")
+            except ValidationError:
+                raise CommandError(f"Invalid tournament id '{tournament_id}', expected a UUID.")
+        replayed = CommandJournal().replay(since=since, until=until, tournament_id=tournament_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Replayed {sum(replayed.values())} matches across {len(replayed)} tournaments."
+        ))
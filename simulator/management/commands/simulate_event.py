@@ -0,0 +1,34 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from simulator.services.monte_carlo import SimulationRNG
+from simulator.services.parallel_simulation import ParallelMatchSimulator
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulates every scheduled match of an event across a process pool and writes all results '
+        'in one transaction. The same seed reproduces the same results regardless of --workers.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_id', help='UUID of the event to simulate.')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: number of CPUs).')
+        parser.add_argument('--seed', type=int, default=None, help='Root seed for reproducible results.')
+        parser.add_argument('--chunk-size', type=int, default=64, help='Matches per task sent to a worker.')
+        parser.add_argument('--simulator', choices=sorted(ParallelMatchSimulator.CHUNK_SIMULATORS), default='simple', help='Match simulator to reproduce.')
+
+    def handle(self, *args, **options):
+        rng = SimulationRNG(options['seed'])
+        simulator = ParallelMatchSimulator(
+            workers=options['workers'], seed=rng, chunk_size=options['chunk_size'], simulator=options['simulator']
+        )
+        try:
+            with transaction.atomic():
+                results = simulator.simulate_event(options['event_id'])
+        except (ValueError, ValidationError) as e:
+            raise CommandError(e.messages[0] if isinstance(e, ValidationError) else str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Simulated {len(results)} matches with {simulator.workers} workers ({options['simulator']}, seed {rng.seed})."
+        ))
@@ -0,0 +1,182 @@
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template as DjangoTemplate
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """
+    Обгортка для connection.execute_wrapper: рахує запити, час у БД
+    і повтори однакового SQL (з плейсхолдерами, тобто без урахування параметрів).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+_active_recorder = ContextVar('simulator_query_recorder', default=None)
+
+
+def _timed_render(render):
+    """
+    Обгортка Template.render бекенду Django-шаблонів (render(), TemplateResponse): додає
+    час рендерингу до активного QueryRecorder. Запити, виконані з шаблону (ліниві
+    QuerySet), лишаються в db_time і з часу рендерингу віднімаються; вкладені
+    render_to_string усередині шаблону не рахуються двічі.
+    """
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        recorder = _active_recorder.get()
+        if recorder is None:
+            return render(self, *args, **kwargs)
+        token = _active_recorder.set(None)
+        db_before, start = recorder.db_time, time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            recorder.render_time += time.perf_counter() - start - (recorder.db_time - db_before)
+            _active_recorder.reset(token)
+    wrapper.timed_by_query_metrics = True
+    return wrapper
+
+
+def install_render_timer():
+    if not getattr(DjangoTemplate.render, 'timed_by_query_metrics', False):
+        DjangoTemplate.render = _timed_render(DjangoTemplate.render)
+
+
+class QueryMetricsStore:
+    """Ковзне вікно останніх замірів для кожного view; потокобезпечне, у пам'яті процесу."""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._violations = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, view_name, sample, over_budget=False):
+        with self._lock:
+            self._samples[view_name].append(sample)
+            if over_budget:
+                self._violations[view_name] += 1
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._violations.clear()
+
+    def summary(self, budgets=None):
+        budgets = budgets or {}
+        with self._lock:
+            snapshot = {name: list(samples) for name, samples in self._samples.items()}
+            violations = dict(self._violations)
+
+        rows = []
+        for name, samples in snapshot.items():
+            queries = [s['queries'] for s in samples]
+            total_ms = sorted(s['total_ms'] for s in samples)
+            rows.append({
+                'view': name,
+                'requests': len(samples),
+                'queries_avg': round(sum(queries) / len(queries), 2),
+                'queries_max': max(queries),
+                'db_ms_avg': round(sum(s['db_ms'] for s in samples) / len(samples), 3),
+                'render_ms_avg': round(sum(s['render_ms'] for s in samples) / len(samples), 3),
+                'app_ms_avg': round(sum(s['app_ms'] for s in samples) / len(samples), 3),
+                'total_ms_avg': round(sum(total_ms) / len(total_ms), 3),
+                'total_ms_p95': total_ms[min(len(total_ms) - 1, int(len(total_ms) * 0.95))],
+                'budget': budgets.get(name),
+                'budget_violations': violations.get(name, 0),
+                'duplicates': samples[-1]['duplicates'],
+            })
+        rows.sort(key=lambda row: -row['queries_max'])
+        return rows
+
+
+query_metrics = QueryMetricsStore(getattr(settings, 'SIMULATOR_QUERY_METRICS_WINDOW', 200))
+
+
+class QueryMetricsMiddleware:
+    """
+    Для кожного запиту вимірює кількість SQL-запитів, час у БД, час рендерингу шаблонів
+    і загальний час view (решта — Python). Повтори одного запиту >= SIMULATOR_QUERY_DUPLICATE_THRESHOLD
+    разів позначаються як ймовірний N+1. Перевищення SIMULATOR_QUERY_BUDGETS логуються.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SIMULATOR_QUERY_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.store = query_metrics
+        install_render_timer()
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        token = _active_recorder.set(recorder)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _active_recorder.reset(token)
+        total = time.perf_counter() - start
+        app_time = max(total - recorder.db_time - recorder.render_time, 0.0)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        view_name = match.view_name
+        threshold = getattr(settings, 'SIMULATOR_QUERY_DUPLICATE_THRESHOLD', 5)
+        budget = getattr(settings, 'SIMULATOR_QUERY_BUDGETS', {}).get(view_name)
+        duplicates = recorder.duplicates(threshold)
+        over_budget = budget is not None and recorder.count > budget
+
+        self.store.record(view_name, {
+            'queries': recorder.count,
+            'db_ms': round(recorder.db_time * 1000, 3),
+            'total_ms': round(total * 1000, 3),
+            'render_ms': round(recorder.render_time * 1000, 3),
+            'app_ms': round(app_time * 1000, 3),
+            'duplicates': [{'sql': sql, 'count': count} for sql, count in duplicates],
+        }, over_budget=over_budget)
+
+        if over_budget:
+            logger.warning("View %s виконав %s SQL-запитів (бюджет %s).", view_name, recorder.count, budget,
+                           extra={'view': view_name, 'queries': recorder.count, 'budget': budget})
+        if duplicates:
+            logger.warning("View %s: ймовірний N+1 — %s запит(и) повторено >= %s разів.", view_name, len(duplicates), threshold,
+                           extra={'view': view_name, 'duplicates': [count for _, count in duplicates]})
+
+        response['Server-Timing'] = (
+            f'db;dur={recorder.db_time * 1000:.1f};desc="{recorder.count} queries", '
+            f'render;dur={recorder.render_time * 1000:.1f}, '
+            f'app;dur={app_time * 1000:.1f}'
+        )
+        return response
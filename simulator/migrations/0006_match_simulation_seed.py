@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0005_alter_tournament_final_standings_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='simulation_seed',
+            field=models.CharField(blank=True, help_text='Кореневий seed запуску, яким отримано результат. Порожній для результатів, записаних вручну.', max_length=64, null=True, verbose_name='Seed симуляції'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0006_match_simulation_seed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='round_number',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Тур'),
+        ),
+    ]
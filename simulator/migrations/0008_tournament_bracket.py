@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0007_match_round_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='bracket',
+            field=models.JSONField(blank=True, default=dict, help_text='Заповнюється автоматично для турнірів на вибування.', verbose_name='Сітка плей-оф (авто)'),
+        ),
+    ]
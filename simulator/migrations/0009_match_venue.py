@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0008_tournament_bracket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='venue',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Арена'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0009_match_venue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='rounds_planned',
+            field=models.PositiveIntegerField(blank=True, help_text='Для швейцарської системи: турнір не завершується, доки не зіграно всі тури.', null=True, verbose_name='Заплановано турів'),
+        ),
+    ]
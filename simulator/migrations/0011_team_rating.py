@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-17 04:35
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0010_tournament_rounds_planned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('rating', models.FloatField(default=1500.0, verbose_name='Рейтинг Ело')),
+                ('matches_rated', models.PositiveIntegerField(default=0, verbose_name='Враховано матчів')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Оновлено')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='simulator.team', verbose_name='Команда')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг команди',
+                'verbose_name_plural': 'Рейтинги команд',
+                'ordering': ['-rating'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamRatingHistory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('rating_before', models.FloatField(verbose_name='Рейтинг до')),
+                ('rating_after', models.FloatField(verbose_name='Рейтинг після')),
+                ('match_datetime', models.DateTimeField(verbose_name='Дата матчу')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_changes', to='simulator.match', verbose_name='Матч')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_history', to='simulator.team', verbose_name='Команда')),
+            ],
+            options={
+                'verbose_name': 'Зміна рейтингу',
+                'verbose_name_plural': 'Історія рейтингів',
+                'ordering': ['-match_datetime'],
+                'indexes': [models.Index(fields=['team', '-match_datetime'], name='rating_history_team_idx')],
+                'constraints': [models.UniqueConstraint(fields=('team', 'match'), name='unique_rating_change_per_match')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 04:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0011_team_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerMatchStat',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('goals', models.PositiveIntegerField(default=0, verbose_name='Голи')),
+                ('assists', models.PositiveIntegerField(default=0, verbose_name='Асисти')),
+                ('appeared', models.BooleanField(default=True, verbose_name='Зіграв')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_stats', to='simulator.match', verbose_name='Матч')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_stats', to='simulator.player', verbose_name='Гравець')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='player_match_stats', to='simulator.team', verbose_name='Команда')),
+            ],
+            options={
+                'verbose_name': 'Статистика гравця в матчі',
+                'verbose_name_plural': 'Статистика гравців у матчах',
+                'indexes': [models.Index(fields=['match'], name='player_match_stat_match_idx')],
+                'constraints': [models.UniqueConstraint(fields=('player', 'match'), name='unique_player_match_stat')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 04:44
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0012_player_match_stat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommandJournalEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('action', models.CharField(choices=[('execute', 'Виконання'), ('undo', 'Скасування'), ('redo', 'Повторення')], default='execute', max_length=10, verbose_name='Дія')),
+                ('command_type', models.CharField(max_length=100, verbose_name='Тип команди')),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Параметри команди')),
+                ('previous_state', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Стан до виконання')),
+                ('result_state', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Стан після виконання')),
+                ('stat_deltas', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Прирости статистики')),
+                ('undone', models.BooleanField(default=False, verbose_name='Скасовано')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Час запису')),
+                ('match', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journal_entries', to='simulator.match', verbose_name='Матч')),
+                ('target', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='followups', to='simulator.commandjournalentry', verbose_name='Команда, до якої застосовано дію')),
+                ('tournament', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='journal_entries', to='simulator.tournament', verbose_name='Турнір')),
+            ],
+            options={
+                'verbose_name': 'Запис журналу команд',
+                'verbose_name_plural': 'Журнал команд',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['match', 'action', '-created_at'], name='journal_match_idx'), models.Index(fields=['action', 'undone', 'created_at'], name='journal_replay_idx')],
+            },
+        ),
+    ]
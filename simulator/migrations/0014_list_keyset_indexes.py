@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0013_command_journal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date', 'id'], name='event_start_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['name', 'id'], name='player_name_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['age', 'id'], name='player_age_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstatistics',
+            index=models.Index(fields=['goals', 'player'], name='player_stats_goals_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstatistics',
+            index=models.Index(fields=['assists', 'player'], name='player_stats_assists_idx'),
+        ),
+    ]
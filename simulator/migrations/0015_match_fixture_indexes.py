@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0014_list_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'match_datetime', 'id'], name='match_fixture_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['match_datetime', 'id'], name='match_datetime_keyset_idx'),
+        ),
+    ]
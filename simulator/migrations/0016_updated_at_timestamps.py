@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0015_match_fixture_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Оновлено'),
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Оновлено'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Оновлено'),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Оновлено'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', 'updated_at'], name='match_tournament_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['status', 'updated_at'], name='match_status_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0016_updated_at_timestamps'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='match',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(fields=('tournament', 'team1', 'team2', 'round_number'), name='unique_match_pair_per_round'),
+        ),
+        migrations.AddConstraint(
+            model_name='match',
+            constraint=models.UniqueConstraint(condition=models.Q(('round_number__isnull', True)), fields=('tournament', 'team1', 'team2'), name='unique_match_pair_without_round'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 05:30
+
+from django.db import migrations
+
+
+def create_missing_statistics(apps, schema_editor):
+    Player = apps.get_model('simulator', 'Player')
+    PlayerStatistics = apps.get_model('simulator', 'PlayerStatistics')
+    missing = Player.objects.filter(statistics__isnull=True).values_list('id', flat=True)
+    PlayerStatistics.objects.bulk_create([PlayerStatistics(player_id=player_id) for player_id in missing], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulator', '0017_match_unique_pair_per_round'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_statistics, migrations.RunPython.noop),
+    ]
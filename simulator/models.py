@@ -1,14 +1,35 @@
+import logging
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 import uuid
 
+logger = logging.getLogger(__name__)
+
 class BaseUUIDModel(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     class Meta:
         abstract = True
 
+class TimestampedModel(BaseUUIDModel):
+    """
+    Модель з міткою останньої зміни (для Last-Modified / ETag у view).
+    save(update_fields=[...]) завжди дописує updated_at; масові update()/bulk_update()
+    мають встановлювати його самі.
+    """
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'updated_at' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'updated_at']
+        super().save(*args, **kwargs)
+
 class PlayerStatistics(BaseUUIDModel):
     player = models.OneToOneField(
         'Player',
@@ -26,6 +47,10 @@ class PlayerStatistics(BaseUUIDModel):
         constraints = [
             models.UniqueConstraint(fields=['player'], name='unique_player_stats')
         ]
+        indexes = [
+            models.Index(fields=['goals', 'player'], name='player_stats_goals_idx'),
+            models.Index(fields=['assists', 'player'], name='player_stats_assists_idx'),
+        ]
 
     def __str__(self):
         player_name = self.player.name if self.player else "Не призначено"
@@ -38,7 +63,7 @@ class PlayerStatistics(BaseUUIDModel):
         self.assists += assists
         self.save()
 
-class Player(BaseUUIDModel):
+class Player(TimestampedModel):
     name = models.CharField(max_length=200, verbose_name="Ім'я")
     age = models.PositiveIntegerField(verbose_name="Вік")
     position = models.CharField(max_length=100, blank=True, null=True, verbose_name="Позиція")
@@ -55,6 +80,10 @@ class Player(BaseUUIDModel):
         verbose_name = "Гравець"
         verbose_name_plural = "Гравці"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='player_name_keyset_idx'),
+            models.Index(fields=['age', 'id'], name='player_age_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.position or 'N/A'})"
@@ -77,7 +106,7 @@ class Player(BaseUUIDModel):
             'stats': stats_data
         }
 
-class Team(BaseUUIDModel):
+class Team(TimestampedModel):
     name = models.CharField(max_length=200, unique=True, verbose_name="Назва команди")
     coach = models.CharField(max_length=200, blank=True, null=True, verbose_name="Тренер")
 
@@ -139,6 +168,9 @@ class Event(BaseUUIDModel):
         verbose_name = "Подія"
         verbose_name_plural = "Події"
         ordering = ['start_date', 'name']
+        indexes = [
+            models.Index(fields=['start_date', 'id'], name='event_start_keyset_idx'),
+        ]
 
     def __str__(self):
         start_str = self.start_date.strftime('%Y-%m-%d') if self.start_date else 'N/A'
@@ -161,7 +193,7 @@ class Event(BaseUUIDModel):
     def get_teams(self):
         return self.teams.all()
 
-class Match(BaseUUIDModel):
+class Match(TimestampedModel):
     STATUS_SCHEDULED = 'scheduled'
     STATUS_IN_PROGRESS = 'in_progress'
     STATUS_FINISHED = 'finished'
@@ -180,12 +212,27 @@ class Match(BaseUUIDModel):
     score2 = models.PositiveIntegerField(null=True, blank=True, verbose_name="Рахунок команди 2")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_SCHEDULED, verbose_name="Статус матчу")
     tournament = models.ForeignKey('Tournament', on_delete=models.SET_NULL, null=True, blank=True, related_name='matches', verbose_name="Турнір")
+    round_number = models.PositiveIntegerField(null=True, blank=True, verbose_name="Тур")
+    venue = models.CharField(max_length=255, blank=True, default='', verbose_name="Арена")
+    simulation_seed = models.CharField(max_length=64, null=True, blank=True, verbose_name="Seed симуляції",
+                                       help_text="Кореневий seed запуску, яким отримано результат. Порожній для результатів, записаних вручну.")
 
     class Meta:
         verbose_name = "Матч"
         verbose_name_plural = "Матчі"
         ordering = ['match_datetime']
-        unique_together = [['tournament', 'team1', 'team2']]
+        constraints = [
+            # Пара може зустрічатися в різних турах (груповий етап і плей-оф), але лише раз у турі;
+            # матчі без туру (створені вручну) унікальні в межах турніру, як і раніше.
+            models.UniqueConstraint(fields=['tournament', 'team1', 'team2', 'round_number'], name='unique_match_pair_per_round'),
+            models.UniqueConstraint(fields=['tournament', 'team1', 'team2'], condition=models.Q(round_number__isnull=True), name='unique_match_pair_without_round'),
+        ]
+        indexes = [
+            models.Index(fields=['tournament', 'match_datetime', 'id'], name='match_fixture_keyset_idx'),
+            models.Index(fields=['match_datetime', 'id'], name='match_datetime_keyset_idx'),
+            models.Index(fields=['tournament', 'updated_at'], name='match_tournament_updated_idx'),
+            models.Index(fields=['status', 'updated_at'], name='match_status_updated_idx'),
+        ]
 
     def __str__(self):
         team1_name = getattr(self.team1, 'name', 'N/A')
@@ -198,15 +245,16 @@ class Match(BaseUUIDModel):
             if self.team1_id == self.team2_id:
                 raise ValidationError("Команда не може грати сама з собою.")
 
-    def set_result(self, score1, score2):
+    def set_result(self, score1, score2, simulation_seed=None):
         if self.status == self.STATUS_CANCELLED: raise ValueError("Неможливо встановити результат для скасованого матчу.")
         if not isinstance(score1, int) or not isinstance(score2, int) or score1 < 0 or score2 < 0: raise ValueError("Рахунок має бути невід'ємним цілим числом.")
         self.score1 = score1
         self.score2 = score2
         self.status = self.STATUS_FINISHED
-        self.save(update_fields=['score1', 'score2', 'status'])
+        self.simulation_seed = str(simulation_seed) if simulation_seed is not None else None
+        self.save(update_fields=['score1', 'score2', 'status', 'simulation_seed'])
 
-class Tournament(BaseUUIDModel):
+class Tournament(TimestampedModel):
     STATUS_PLANNED = 'planned'
     STATUS_ONGOING = 'ongoing'
     STATUS_FINISHED = 'finished'
@@ -242,6 +290,14 @@ class Tournament(BaseUUIDModel):
         default=dict, blank=True, verbose_name="Фінальна таблиця (офіційна)",
         help_text="Ви можете скопіювати дані з автоматичної таблиці сюди і відредагувати вручну. Зберігайте валідну JSON структуру."
     )
+    rounds_planned = models.PositiveIntegerField(
+        null=True, blank=True, verbose_name="Заплановано турів",
+        help_text="Для швейцарської системи: турнір не завершується, доки не зіграно всі тури."
+    )
+    bracket = models.JSONField(
+        default=dict, blank=True, verbose_name="Сітка плей-оф (авто)",
+        help_text="Заповнюється автоматично для турнірів на вибування."
+    )
 
     class Meta:
         verbose_name = "Турнір"
@@ -273,7 +329,18 @@ class Tournament(BaseUUIDModel):
             return True
         return False
 
+    def bracket_champion_id(self):
+        rounds = (self.bracket or {}).get('rounds') or []
+        if rounds and len(rounds[-1]) == 1:
+            return rounds[-1][0].get('winner')
+        return None
+
     def maybe_determine_winner(self):
+        champion_id = self.bracket_champion_id()
+        if champion_id:
+            self.winner = Team.objects.filter(id=champion_id).first()
+            self.save(update_fields=['winner'])
+            return self.winner
         standings_data = self.final_standings.get('table', []) or self.standings.get('table', [])
         if standings_data:
             winner_data = standings_data[0]
@@ -290,16 +357,114 @@ class Tournament(BaseUUIDModel):
 
     def check_and_finish(self):
         if self.status == self.STATUS_ONGOING:
+            if self.bracket.get('rounds') and not self.bracket_champion_id():
+                return False
+            if self.rounds_planned and (self.matches.aggregate(last=models.Max('round_number'))['last'] or 0) < self.rounds_planned:
+                return False
             all_matches = self.matches.all()
-            if all_matches and all(m.status == Match.STATUS_FINISHED for m in all_matches):
+            if all_matches.exists() and not all_matches.exclude(status=Match.STATUS_FINISHED).exists():
                 self.status = self.STATUS_FINISHED
                 self.update_official_standings()
                 self.maybe_determine_winner()
                 self.save(update_fields=['status'])
-                print(f"Tournament {self.name} finished automatically.")
+                logger.info("Tournament %s finished automatically.", self.name)
                 return True
         return False
 
+class TeamRating(BaseUUIDModel):
+    INITIAL_RATING = 1500.0
+
+    team = models.OneToOneField('Team', on_delete=models.CASCADE, related_name='rating', verbose_name="Команда")
+    rating = models.FloatField(default=INITIAL_RATING, verbose_name="Рейтинг Ело")
+    matches_rated = models.PositiveIntegerField(default=0, verbose_name="Враховано матчів")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Оновлено")
+
+    class Meta:
+        verbose_name = "Рейтинг команди"
+        verbose_name_plural = "Рейтинги команд"
+        ordering = ['-rating']
+
+    def __str__(self):
+        team_name = getattr(self.team, 'name', 'N/A')
+        return f"{team_name}: {self.rating:.0f}"
+
+class TeamRatingHistory(BaseUUIDModel):
+    team = models.ForeignKey('Team', on_delete=models.CASCADE, related_name='rating_history', verbose_name="Команда")
+    match = models.ForeignKey('Match', on_delete=models.CASCADE, related_name='rating_changes', verbose_name="Матч")
+    rating_before = models.FloatField(verbose_name="Рейтинг до")
+    rating_after = models.FloatField(verbose_name="Рейтинг після")
+    match_datetime = models.DateTimeField(verbose_name="Дата матчу")
+
+    class Meta:
+        verbose_name = "Зміна рейтингу"
+        verbose_name_plural = "Історія рейтингів"
+        ordering = ['-match_datetime']
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'match'], name='unique_rating_change_per_match')
+        ]
+        indexes = [
+            models.Index(fields=['team', '-match_datetime'], name='rating_history_team_idx'),
+        ]
+
+    @property
+    def delta(self):
+        return self.rating_after - self.rating_before
+
+class PlayerMatchStat(BaseUUIDModel):
+    player = models.ForeignKey('Player', on_delete=models.CASCADE, related_name='match_stats', verbose_name="Гравець")
+    match = models.ForeignKey('Match', on_delete=models.CASCADE, related_name='player_stats', verbose_name="Матч")
+    team = models.ForeignKey('Team', on_delete=models.SET_NULL, null=True, blank=True, related_name='player_match_stats', verbose_name="Команда")
+    goals = models.PositiveIntegerField(default=0, verbose_name="Голи")
+    assists = models.PositiveIntegerField(default=0, verbose_name="Асисти")
+    appeared = models.BooleanField(default=True, verbose_name="Зіграв")
+
+    class Meta:
+        verbose_name = "Статистика гравця в матчі"
+        verbose_name_plural = "Статистика гравців у матчах"
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'match'], name='unique_player_match_stat')
+        ]
+        indexes = [
+            models.Index(fields=['match'], name='player_match_stat_match_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} у матчі {self.match_id}: {self.goals} г., {self.assists} а."
+
+class CommandJournalEntry(BaseUUIDModel):
+    ACTION_EXECUTE = 'execute'
+    ACTION_UNDO = 'undo'
+    ACTION_REDO = 'redo'
+    ACTION_CHOICES = [
+        (ACTION_EXECUTE, 'Виконання'),
+        (ACTION_UNDO, 'Скасування'),
+        (ACTION_REDO, 'Повторення'),
+    ]
+
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=ACTION_EXECUTE, verbose_name="Дія")
+    command_type = models.CharField(max_length=100, verbose_name="Тип команди")
+    match = models.ForeignKey('Match', on_delete=models.SET_NULL, null=True, blank=True, related_name='journal_entries', verbose_name="Матч")
+    tournament = models.ForeignKey('Tournament', on_delete=models.SET_NULL, null=True, blank=True, related_name='journal_entries', verbose_name="Турнір")
+    target = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='followups', verbose_name="Команда, до якої застосовано дію")
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Параметри команди")
+    previous_state = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Стан до виконання")
+    result_state = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Стан після виконання")
+    stat_deltas = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name="Прирости статистики")
+    undone = models.BooleanField(default=False, verbose_name="Скасовано")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Час запису")
+
+    class Meta:
+        verbose_name = "Запис журналу команд"
+        verbose_name_plural = "Журнал команд"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['match', 'action', '-created_at'], name='journal_match_idx'),
+            models.Index(fields=['action', 'undone', 'created_at'], name='journal_replay_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} {self.command_type} ({self.created_at:%Y-%m-%d %H:%M:%S})"
+
 class Recommendation(BaseUUIDModel):
     team = models.ForeignKey('Team', on_delete=models.CASCADE, related_name='recommendations')
     recommendation_text = models.TextField(verbose_name="Текст рекомендації")
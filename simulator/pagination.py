@@ -0,0 +1,101 @@
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(values):
+    # isoformat() напряму: DjangoJSONEncoder обрізає мікросекунди, і курсор пропускав би рядки.
+    values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value for value in values]
+    raw = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Некоректний курсор сторінки.")
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError("Некоректний курсор сторінки.")
+    return values
+
+
+def _row_value(row, field):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+def _keyset_filter(ordering, values, backwards):
+    """(a, b, id) > (x, y, z) з урахуванням напрямку кожного поля, розгорнуте в OR/AND."""
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != backwards
+        step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+class KeysetPage:
+    """Сторінка keyset-пагінації: рядки і курсори сусідніх сторінок (None, якщо їх немає)."""
+
+    def __init__(self, rows, next_cursor=None, previous_cursor=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor or self.previous_cursor)
+
+
+def keyset_paginate(queryset, ordering, after=None, before=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Keyset (seek) пагінація: замість OFFSET — умова «після останнього рядка попередньої сторінки»,
+    тож будь-яка сторінка коштує як перша, якщо за ordering є індекс.
+
+    ordering — поля/анотації ('-' для спадання), останнє має бути унікальним (зазвичай 'id');
+    всі вони мають бути доступні в рядках queryset (у values() — серед вибраних полів).
+    after/before — курсори з попередньої сторінки; некоректний курсор — ValueError.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    backwards = before is not None and after is None
+    cursor = before if backwards else after
+    if cursor is not None:
+        queryset = queryset.filter(_keyset_filter(ordering, decode_cursor(cursor, len(ordering)), backwards))
+    if backwards:
+        queryset = queryset.order_by(*(field[1:] if field.startswith('-') else f'-{field}' for field in ordering))
+    else:
+        queryset = queryset.order_by(*ordering)
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def row_cursor(row):
+        return encode_cursor([_row_value(row, field.lstrip('-')) for field in ordering])
+
+    if not rows:
+        return KeysetPage(rows)
+    has_next = (has_more and not backwards) or backwards
+    has_previous = (has_more and backwards) or (cursor is not None and not backwards)
+    return KeysetPage(
+        rows,
+        next_cursor=row_cursor(rows[-1]) if has_next else None,
+        previous_cursor=row_cursor(rows[0]) if has_previous else None,
+    )
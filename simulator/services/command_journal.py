@@ -0,0 +1,197 @@
+import logging
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from ..models import CommandJournalEntry, Match, PlayerMatchStat
+from .commands import COMMAND_TYPES, BatchCommand, Command
+from .player_stats_updater import accumulate_fact_deltas, new_stat_deltas
+from .result_writer import RESULT_FIELDS, write_match_results
+
+logger = logging.getLogger(__name__)
+
+
+def match_result_snapshots(match_ids):
+    """
+    Стан матчів після виконання команд двома запитами:
+    {match_id: {рахунок, статус, seed, tournament_id, player_stats: [...]}}.
+    """
+    states = {row.pop('id'): row for row in Match.objects.filter(pk__in=match_ids).values('id', 'tournament_id', *RESULT_FIELDS)}
+    facts = defaultdict(list)
+    for row in PlayerMatchStat.objects.filter(match_id__in=match_ids).values('match_id', *Command.PLAYER_STAT_FIELDS):
+        facts[row.pop('match_id')].append(row)
+    for match_id, state in states.items():
+        state['player_stats'] = facts[match_id]
+    return states
+
+
+def match_result_snapshot(match_id):
+    """Стан матчу після виконання команди: рахунок, статус, seed і рядки PlayerMatchStat."""
+    state = match_result_snapshots([match_id]).get(match_id, {'player_stats': []})
+    state.pop('tournament_id', None)
+    return state
+
+
+def fact_row_deltas(previous_rows, result_rows):
+    """Прирости зведення між двома знімками рядків PlayerMatchStat одного матчу."""
+    deltas = accumulate_fact_deltas(new_stat_deltas(), [PlayerMatchStat(**row) for row in previous_rows], -1)
+    accumulate_fact_deltas(deltas, [PlayerMatchStat(**row) for row in result_rows])
+    return {player_id: dict(delta) for player_id, delta in deltas.items() if any(delta.values())}
+
+
+class CommandJournal:
+    """
+    Журнал команд над матчами.
+
+    Кожне виконання записує параметри команди, знімок стану до неї, результат
+    і застосовані прирости статистики, тож undo/redo працюють з будь-якого процесу.
+    Записи не видаляються, а їхні параметри, знімки й прирости не переписуються:
+    скасування і повторення додаються окремими записами з посиланням на команду.
+    Єдине поле, що змінюється на місці, — прапорець undone виконаного запису
+    (поточний стан за останнім undo/redo, по ньому індексовано replay).
+    replay() застосовує збережені результати пакетом в одній транзакції.
+    """
+
+    def execute(self, command: Command):
+        """Виконує команду й записує її в журнал. Повертає запис або None, якщо команда не виконалась."""
+        with transaction.atomic():
+            if not command.execute():
+                return None
+            match = Match.objects.filter(pk=command.match_id).values('tournament_id').first() or {}
+            entry = CommandJournalEntry.objects.create(
+                action=CommandJournalEntry.ACTION_EXECUTE,
+                command_type=type(command).__name__,
+                match_id=command.match_id,
+                tournament_id=match.get('tournament_id'),
+                payload=command.journal_payload(),
+                previous_state=command.backup_state(),
+                result_state=match_result_snapshot(command.match_id),
+                stat_deltas=command._applied_stat_deltas,
+            )
+        logger.debug("[Journal] Команду %s для матчу %s записано (%s).", entry.command_type, entry.match_id, entry.id)
+        return entry
+
+    def execute_batch(self, command: BatchCommand):
+        """
+        Виконує пакетну команду й записує по одному запису журналу на матч (bulk_create),
+        тож кожен результат пакета можна окремо скасувати чи відтворити.
+        """
+        with transaction.atomic():
+            command.execute()
+            results = match_result_snapshots(list(command.backups))
+            entries = []
+            for match_id, command_type, payload in command.journal_entries():
+                result = results[match_id]
+                backup = command.backups[match_id]
+                entries.append(CommandJournalEntry(
+                    action=CommandJournalEntry.ACTION_EXECUTE,
+                    command_type=command_type,
+                    match_id=match_id,
+                    tournament_id=result.pop('tournament_id'),
+                    payload=payload,
+                    previous_state=backup,
+                    result_state=result,
+                    stat_deltas=fact_row_deltas(backup['player_stats'], result['player_stats']),
+                ))
+            CommandJournalEntry.objects.bulk_create(entries, batch_size=500)
+        logger.info("[Journal] Пакет %s: записано %s команд.", type(command).__name__, len(entries))
+        return entries
+
+    @staticmethod
+    def _executions():
+        return CommandJournalEntry.objects.filter(action=CommandJournalEntry.ACTION_EXECUTE)
+
+    def _resolve(self, entry_id, match_id, undone):
+        entries = self._executions().filter(undone=undone, match__isnull=False)
+        if entry_id is not None:
+            entries = entries.filter(pk=entry_id)
+        if match_id is not None:
+            entries = entries.filter(match_id=match_id)
+        entry = entries.order_by('-created_at').first()
+        if entry is None:
+            raise ValueError("Немає команди, яку можна " + ("повторити." if undone else "скасувати."))
+        return entry
+
+    @staticmethod
+    def _matches_state(match_id, state):
+        current = Match.objects.filter(pk=match_id).values('status', 'score1', 'score2').first()
+        return current is not None and all(current[field] == state.get(field) for field in current)
+
+    def _append(self, action, entry, stat_deltas=None):
+        return CommandJournalEntry.objects.create(
+            action=action, command_type=entry.command_type, match_id=entry.match_id,
+            tournament_id=entry.tournament_id, target=entry, stat_deltas=stat_deltas or {}
+        )
+
+    def undo(self, entry_id=None, match_id=None):
+        """Скасовує команду (за замовчуванням — останню активну) за збереженим знімком."""
+        with transaction.atomic():
+            entry = self._resolve(entry_id, match_id, undone=False)
+            if self._executions().filter(match_id=entry.match_id, undone=False, created_at__gt=entry.created_at).exists():
+                raise ValueError("Спершу скасуйте пізніші команди для цього матчу.")
+            if not self._matches_state(entry.match_id, entry.result_state):
+                raise ValueError("Результат матчу змінено поза журналом; скасування неможливе.")
+
+            command = COMMAND_TYPES[entry.command_type].from_payload(entry.payload)
+            command.load_backup(entry.previous_state, entry.stat_deltas)
+            if not command.undo():
+                raise ValueError(f"Не вдалося скасувати команду {entry.id}.")
+            entry.undone = True
+            entry.save(update_fields=['undone'])
+            self._append(CommandJournalEntry.ACTION_UNDO, entry)
+        return entry
+
+    def redo(self, entry_id=None, match_id=None):
+        """Повторно застосовує збережений результат скасованої команди (без повторної симуляції)."""
+        with transaction.atomic():
+            entry = self._resolve(entry_id, match_id, undone=True)
+            if not self._matches_state(entry.match_id, entry.previous_state.get('match') or {}):
+                raise ValueError("Стан матчу змінився після скасування; повторення неможливе.")
+
+            stat_deltas = self._apply_results([entry])
+            entry.undone = False
+            entry.save(update_fields=['undone'])
+            self._append(CommandJournalEntry.ACTION_REDO, entry, stat_deltas)
+        return entry
+
+    def replay(self, since=None, until=None, tournament_id=None):
+        """
+        Застосовує результати активних команд журналу за період однією транзакцією.
+
+        Для кожного матчу береться остання команда; матчі й статистика пишуться
+        пакетно, а таблиця кожного турніру перераховується один раз.
+        Повертає {tournament_id: кількість матчів}.
+        """
+        entries = self._executions().filter(undone=False, match__isnull=False)
+        if since is not None:
+            entries = entries.filter(created_at__gte=since)
+        if until is not None:
+            entries = entries.filter(created_at__lt=until)
+        if tournament_id is not None:
+            entries = entries.filter(tournament_id=tournament_id)
+
+        latest = {}
+        for entry in entries.order_by('created_at').iterator(chunk_size=2000):
+            latest[entry.match_id] = entry
+        if not latest:
+            return {}
+
+        self._apply_results(list(latest.values()))
+        per_tournament = Counter(entry.tournament_id for entry in latest.values())
+        logger.info("[Journal] Відтворено %s матчів у %s турнірах.", len(latest), len(per_tournament))
+        return dict(per_tournament)
+
+    @staticmethod
+    def _apply_results(entries):
+        matches = Match.objects.in_bulk([entry.match_id for entry in entries])
+        stat_rows = {}
+        for entry in entries:
+            match = matches.get(entry.match_id)
+            if match is None:
+                continue
+            for field in RESULT_FIELDS:
+                setattr(match, field, entry.result_state.get(field))
+            stat_rows[match.id] = [
+                PlayerMatchStat(match_id=match.id, **row) for row in entry.result_state.get('player_stats', [])
+            ]
+        return write_match_results(matches.values(), stat_rows)
@@ -1,17 +1,31 @@
+import logging
 import abc
 import uuid
+from collections import Counter, defaultdict
 from datetime import datetime
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
-from ..models import Match, Player, PlayerStatistics
-from .player_stats_updater import update_player_stats_from_match_data, _update_single_player_stat
-from .match_simulator import SimpleMatchSimulator
-from .tournament_manager import TournamentManager
+from ..models import Match, Player, PlayerMatchStat, PlayerStatistics, Tournament
+from .player_stats_updater import update_player_stats_from_match_data, restore_player_match_stats, load_squads, match_stat_rows
+from .match_simulator import MATCH_SIMULATORS
+from .monte_carlo import SimulationRNG
+from .parallel_simulation import ParallelMatchSimulator
+from .result_writer import write_match_results
+from .tournament_cache import tournament_cache
+
+logger = logging.getLogger(__name__)
 
 class Command(abc.ABC):
+    PLAYER_STAT_FIELDS = ('player_id', 'team_id', 'goals', 'assists', 'appeared')
+    TOURNAMENT_STATE_FIELDS = ('status', 'winner_id', 'final_standings')
+
     def __init__(self):
         self._previous_match_state = {}
+        self._previous_player_stats = []
+        self._previous_tournament_state = None
+        self._applied_stat_deltas = {}
 
     @abc.abstractmethod
     def execute(self):
@@ -21,52 +35,89 @@ class Command(abc.ABC):
     def undo(self):
         pass
 
+    def journal_payload(self):
+        """Параметри, з яких команду можна відтворити (from_payload)."""
+        return {'match_id': str(self.match_id)}
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(**payload)
+
+    def backup_state(self):
+        """Знімок стану до виконання, достатній для undo() в іншому процесі."""
+        return {
+            'match': self._previous_match_state,
+            'player_stats': self._previous_player_stats,
+            'tournament': self._previous_tournament_state,
+        }
+
+    def load_backup(self, state, stat_deltas):
+        self._previous_match_state = dict(state.get('match') or {})
+        self._previous_player_stats = list(state.get('player_stats') or [])
+        self._previous_tournament_state = state.get('tournament')
+        self._applied_stat_deltas = dict(stat_deltas or {})
+
     def _get_match(self, match_id):
         try:
             return Match.objects.select_related('team1', 'team2', 'tournament').get(pk=match_id)
         except Match.DoesNotExist:
             raise ValueError(f"Матч з ID {match_id} не знайдено.")
 
-    def _backup_match_state(self, match: Match):
-        self._previous_match_state = {
+    @staticmethod
+    def _match_state(match: Match):
+        return {
             'score1': match.score1,
             'score2': match.score2,
             'status': match.status,
-            'match_datetime': match.match_datetime
+            'match_datetime': match.match_datetime,
+            'simulation_seed': match.simulation_seed,
         }
-        print(f"[Command Backup] Saved state for match {match.id}: {self._previous_match_state}")
+
+    def _backup_match_state(self, match: Match):
+        self._previous_match_state = self._match_state(match)
+        self._previous_player_stats = list(
+            PlayerMatchStat.objects.filter(match_id=match.id).values(*self.PLAYER_STAT_FIELDS)
+        )
+        self._previous_tournament_state = (
+            Tournament.objects.filter(pk=match.tournament_id).values(*self.TOURNAMENT_STATE_FIELDS).first()
+            if match.tournament_id else None
+        )
+        self._applied_stat_deltas = {}
+        logger.debug("[Command Backup] Saved state for match %s: %s", match.id, self._previous_match_state)
 
 
     def _restore_match_state(self, match: Match):
         if not self._previous_match_state:
-            print(f"[Command Restore] No previous state saved for match {match.id}.")
+            logger.warning("[Command Restore] No previous state saved for match %s.", match.id)
             return False
 
         try:
-            match.score1 = self._previous_match_state.get('score1')
-            match.score2 = self._previous_match_state.get('score2')
-            match.status = self._previous_match_state.get('status', Match.STATUS_SCHEDULED)
-            match.save(update_fields=['score1', 'score2', 'status'])
-            print(f"[Command Restore] Restored state for match {match.id}: {self._previous_match_state}")
-
-            if match.tournament:
-                try:
-                    manager = TournamentManager(tournament_id=match.tournament.id)
-                    manager.update_tournament_standings()
-                except Exception as e:
-                    print(f"[Command Restore] Error updating standings after undo for tournament {match.tournament.id}: {e}")
+            with transaction.atomic():
+                restore_player_match_stats(
+                    match.id,
+                    [PlayerMatchStat(match_id=match.id, **row) for row in self._previous_player_stats],
+                    self._applied_stat_deltas
+                )
+                match.score1 = self._previous_match_state.get('score1')
+                match.score2 = self._previous_match_state.get('score2')
+                match.status = self._previous_match_state.get('status', Match.STATUS_SCHEDULED)
+                match.simulation_seed = self._previous_match_state.get('simulation_seed')
+                match.save(update_fields=['score1', 'score2', 'status', 'simulation_seed'])
+                self._restore_tournament_state(match)
+            self._applied_stat_deltas = {}
+            logger.debug("[Command Restore] Restored state for match %s: %s", match.id, self._previous_match_state)
             return True
         except Exception as e:
-             print(f"[Command Restore] Error restoring state for match {match.id}: {e}")
+             logger.exception("[Command Restore] Error restoring state for match %s: %s", match.id, e)
              return False
 
-    def _update_standings(self, match: Match):
-         if match.tournament:
-            try:
-                manager = TournamentManager(tournament_id=match.tournament.id)
-                manager.update_tournament_standings()
-            except Exception as e:
-                print(f"[Command Update Standings] Error updating standings for tournament {match.tournament.id}: {e}")
+    def _restore_tournament_state(self, match: Match):
+        """Знімає автоматичне завершення турніру, якщо його спричинила скасована команда."""
+        previous = self._previous_tournament_state
+        if not previous or previous['status'] == Tournament.STATUS_FINISHED:
+            return
+        Tournament.objects.filter(pk=match.tournament_id, status=Tournament.STATUS_FINISHED).update(**previous, updated_at=timezone.now())
+        tournament_cache.invalidate(match.tournament_id)
 
 
 class RecordMatchResultCommand(Command):
@@ -81,10 +132,9 @@ class RecordMatchResultCommand(Command):
         self.assists1_ids = assists1_ids or []
         self.scorers2_ids = scorers2_ids or []
         self.assists2_ids = assists2_ids or []
-        self._previous_player_stats = {}
 
     def execute(self):
-        print(f"[RecordMatchResultCommand] Executing for match {self.match_id} with score {self.score1}-{self.score2}")
+        logger.debug("[RecordMatchResultCommand] Executing for match %s with score %s-%s", self.match_id, self.score1, self.score2)
         match = self._get_match(self.match_id)
 
         if match.status == Match.STATUS_CANCELLED:
@@ -93,44 +143,55 @@ class RecordMatchResultCommand(Command):
         self._backup_match_state(match)
 
         try:
-            match.set_result(self.score1, self.score2)
+            with transaction.atomic():
+                match.set_result(self.score1, self.score2)
 
-            update_player_stats_from_match_data(
-                match=match,
-                scorers1_ids=self.scorers1_ids, assists1_ids=self.assists1_ids,
-                scorers2_ids=self.scorers2_ids, assists2_ids=self.assists2_ids
-            )
-            print(f"[RecordMatchResultCommand] Successfully executed for match {self.match_id}")
+                self._applied_stat_deltas = update_player_stats_from_match_data(
+                    match=match,
+                    scorers1_ids=self.scorers1_ids, assists1_ids=self.assists1_ids,
+                    scorers2_ids=self.scorers2_ids, assists2_ids=self.assists2_ids
+                )
+            logger.debug("[RecordMatchResultCommand] Successfully executed for match %s", self.match_id)
             return True
         except (ValidationError, ValueError) as e:
-            print(f"[RecordMatchResultCommand] Validation Error for match {self.match_id}: {e}")
+            logger.warning("[RecordMatchResultCommand] Validation Error for match %s: %s", self.match_id, e)
             raise
         except Exception as e:
-            print(f"[RecordMatchResultCommand] Unexpected Error for match {self.match_id}: {e}")
-            self._restore_match_state(match)
+            logger.exception("[RecordMatchResultCommand] Unexpected Error for match %s: %s", self.match_id, e)
             raise
 
     def undo(self):
-        print(f"[RecordMatchResultCommand] Undoing for match {self.match_id}")
+        logger.debug("[RecordMatchResultCommand] Undoing for match %s", self.match_id)
         match = self._get_match(self.match_id)
-        print("[RecordMatchResultCommand] Warning: Player stats undo is not fully implemented.")
         restored = self._restore_match_state(match)
         if restored:
-             print(f"[RecordMatchResultCommand] Successfully undone for match {self.match_id}")
+             logger.info("[RecordMatchResultCommand] Successfully undone for match %s", self.match_id)
         else:
-             print(f"[RecordMatchResultCommand] Failed to undo for match {self.match_id}")
+             logger.error("[RecordMatchResultCommand] Failed to undo for match %s", self.match_id)
         return restored
 
 
+    def journal_payload(self):
+        return {
+            **super().journal_payload(),
+            'score1': self.score1, 'score2': self.score2,
+            'scorers1_ids': [str(i) for i in self.scorers1_ids], 'assists1_ids': [str(i) for i in self.assists1_ids],
+            'scorers2_ids': [str(i) for i in self.scorers2_ids], 'assists2_ids': [str(i) for i in self.assists2_ids],
+        }
+
+
 class SimulateMatchResultCommand(Command):
-    def __init__(self, match_id):
+    def __init__(self, match_id, rng: SimulationRNG = None, simulator: str = 'simple'):
         super().__init__()
+        if simulator not in MATCH_SIMULATORS:
+            raise ValueError(f"Невідомий симулятор: {simulator}")
         self.match_id = match_id
-        self._previous_player_stats = {}
+        self.rng = rng
+        self.simulator = simulator
         self._simulated_result = None
 
     def execute(self):
-        print(f"[SimulateMatchResultCommand] Executing for match {self.match_id}")
+        logger.debug("[SimulateMatchResultCommand] Executing for match %s", self.match_id)
         match = self._get_match(self.match_id)
 
         if match.status != Match.STATUS_SCHEDULED:
@@ -138,25 +199,281 @@ class SimulateMatchResultCommand(Command):
 
         self._backup_match_state(match)
 
-        simulator = SimpleMatchSimulator(match)
-        success = simulator.simulate_and_set_result()
+        simulator = MATCH_SIMULATORS[self.simulator](match, rng=self.rng)
+        with transaction.atomic():
+            success = simulator.simulate_and_set_result()
 
         if success:
+             self._applied_stat_deltas = simulator.stat_deltas
              match.refresh_from_db()
              self._simulated_result = (match.score1, match.score2)
-             print(f"[SimulateMatchResultCommand] Successfully executed for match {self.match_id}. Result: {self._simulated_result}")
+             logger.debug("[SimulateMatchResultCommand] Successfully executed for match %s. Result: %s", self.match_id, self._simulated_result)
              return True
         else:
-             print(f"[SimulateMatchResultCommand] Failed to simulate or set result for match {self.match_id}")
+             logger.warning("[SimulateMatchResultCommand] Failed to simulate or set result for match %s", self.match_id)
              return False
 
     def undo(self):
-        print(f"[SimulateMatchResultCommand] Undoing for match {self.match_id}")
+        logger.debug("[SimulateMatchResultCommand] Undoing for match %s", self.match_id)
         match = self._get_match(self.match_id)
-        print("[SimulateMatchResultCommand] Warning: Player stats undo is not fully implemented.")
         restored = self._restore_match_state(match)
         if restored:
-             print(f"[SimulateMatchResultCommand] Successfully undone for match {self.match_id}")
+             logger.info("[SimulateMatchResultCommand] Successfully undone for match %s", self.match_id)
         else:
-             print(f"[SimulateMatchResultCommand] Failed to undo for match {self.match_id}")
-        return restored
\ No newline at end of file
+             logger.error("[SimulateMatchResultCommand] Failed to undo for match %s", self.match_id)
+        return restored
+
+    def journal_payload(self):
+        return {
+            **super().journal_payload(),
+            'seed': str(self.rng.seed) if self.rng is not None else None,
+            'simulator': self.simulator,
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        payload = dict(payload)
+        seed = payload.pop('seed', None)
+        return cls(rng=SimulationRNG(int(seed)) if seed is not None else None, **payload)
+
+
+class BatchCommand(Command):
+    """
+    Пакетна команда над багатьма матчами (напр. весь тур).
+
+    Усі матчі вибираються й перевіряються разом; у разі помилок не пишеться нічого,
+    а ValidationError містить повідомлення для кожного проблемного результату.
+    Запис іде через write_match_results: bulk_update матчів, статистика гравців
+    одним пакетом і один перерахунок таблиці на турнір. Знімки стану до виконання
+    (backups) дозволяють скасувати весь пакет так само пакетно.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.backups = {}
+
+    def _load_matches(self, match_ids, errors):
+        parsed = []
+        for match_id in match_ids:
+            try:
+                parsed.append(uuid.UUID(str(match_id)))
+            except ValueError:
+                errors.append(f"Некоректний ID матчу: {match_id}")
+        for match_id in [match_id for match_id, count in Counter(parsed).items() if count > 1]:
+            errors.append(f"Матч {match_id} зустрічається в пакеті кілька разів.")
+        matches = Match.objects.in_bulk(parsed)
+        for match_id in set(parsed) - matches.keys():
+            errors.append(f"Матч з ID {match_id} не знайдено.")
+        return matches
+
+    def _snapshot(self, matches):
+        """Знімки стану як у _backup_match_state для всіх матчів пакета двома запитами."""
+        facts = defaultdict(list)
+        for row in PlayerMatchStat.objects.filter(match_id__in=[m.id for m in matches]).values('match_id', *self.PLAYER_STAT_FIELDS):
+            facts[row.pop('match_id')].append(row)
+        tournaments = {
+            row.pop('id'): row
+            for row in Tournament.objects.filter(pk__in={m.tournament_id for m in matches}).values('id', *self.TOURNAMENT_STATE_FIELDS)
+        }
+        self.backups = {
+            match.id: {
+                'match': self._match_state(match),
+                'player_stats': facts[match.id],
+                'tournament': tournaments.get(match.tournament_id),
+            }
+            for match in matches
+        }
+
+    @abc.abstractmethod
+    def journal_entries(self):
+        """Пари (match_id, тип команди, payload) для запису пакета в журнал по одному матчу."""
+        pass
+
+    def undo(self):
+        logger.debug("[%s] Undoing %s matches", type(self).__name__, len(self.backups))
+        if not self.backups:
+            return False
+        matches = Match.objects.in_bulk(list(self.backups))
+        stat_rows = {}
+        for match_id, match in matches.items():
+            previous = self.backups[match_id]
+            for field in ('score1', 'score2', 'status', 'simulation_seed'):
+                setattr(match, field, previous['match'].get(field))
+            stat_rows[match_id] = [PlayerMatchStat(match_id=match_id, **row) for row in previous['player_stats']]
+
+        with transaction.atomic():
+            write_match_results(matches.values(), stat_rows)
+            restored = set()
+            for match in matches.values():
+                previous = self.backups[match.id]['tournament']
+                if match.tournament_id in restored or not previous or previous['status'] == Tournament.STATUS_FINISHED:
+                    continue
+                Tournament.objects.filter(pk=match.tournament_id, status=Tournament.STATUS_FINISHED).update(**previous, updated_at=timezone.now())
+                restored.add(match.tournament_id)
+            tournament_cache.invalidate(*restored)
+        self._applied_stat_deltas = {}
+        logger.info("[%s] Successfully undone %s matches", type(self).__name__, len(matches))
+        return True
+
+
+class BatchRecordResultsCommand(BatchCommand):
+    """
+    Запис пакета результатів. results — список словників з ключами match_id, score1,
+    score2 і необов'язковими scorers1_ids, assists1_ids, scorers2_ids, assists2_ids.
+    """
+
+    ID_FIELDS = ('scorers1_ids', 'assists1_ids', 'scorers2_ids', 'assists2_ids')
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = [dict(result) for result in results]
+        self.squads = {}
+
+    def validate(self):
+        """Повертає (матчі за ID, список помилок) без запису в БД."""
+        errors = []
+        for index, result in enumerate(self.results, start=1):
+            for field in ('score1', 'score2'):
+                value = result.get(field)
+                if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                    errors.append(f"Результат #{index}: {field} має бути невід'ємним цілим числом.")
+        matches = self._load_matches([result.get('match_id') for result in self.results], errors)
+        for match in matches.values():
+            if match.status == Match.STATUS_CANCELLED:
+                errors.append(f"Матч {match.id} скасовано, результат записати неможливо.")
+        self.squads = load_squads({team_id for m in matches.values() for team_id in (m.team1_id, m.team2_id) if team_id})
+        for index, result in enumerate(self.results, start=1):
+            match = self._result_match(result, matches)
+            if match is not None:
+                errors.extend(f"Результат #{index}: {error}" for error in self._player_errors(result, match))
+        return matches, errors
+
+    @staticmethod
+    def _result_match(result, matches):
+        try:
+            return matches.get(uuid.UUID(str(result.get('match_id'))))
+        except ValueError:
+            return None
+
+    def _player_errors(self, result, match):
+        """Автори голів і асистенти мають бути гравцями своєї команди в матчі."""
+        for field in self.ID_FIELDS:
+            player_ids = result.get(field) or []
+            if not isinstance(player_ids, list):
+                yield f"{field} має бути списком ID гравців."
+                continue
+            team_id = match.team1_id if field.endswith('1_ids') else match.team2_id
+            squad = {str(player_id) for player_id in self.squads.get(team_id, [])}
+            for player_id in player_ids:
+                try:
+                    player_id = str(uuid.UUID(str(player_id)))
+                except ValueError:
+                    yield f"{field}: некоректний ID гравця {player_id}."
+                    continue
+                if player_id not in squad:
+                    yield f"{field}: гравець {player_id} не грає за команду {team_id} у матчі {match.id}."
+
+    def execute(self):
+        logger.debug("[BatchRecordResultsCommand] Executing for %s results", len(self.results))
+        matches, errors = self.validate()
+        if errors:
+            raise ValidationError(errors)
+        self._snapshot(matches.values())
+
+        squads = self.squads
+        stat_rows = {}
+        for result in self.results:
+            match = matches[uuid.UUID(str(result['match_id']))]
+            match.score1, match.score2 = result['score1'], result['score2']
+            match.status = Match.STATUS_FINISHED
+            match.simulation_seed = None
+            stat_rows[match.id] = match_stat_rows(
+                match.id,
+                {team_id: squads.get(team_id, []) for team_id in (match.team1_id, match.team2_id) if team_id},
+                list(result.get('scorers1_ids') or []) + list(result.get('scorers2_ids') or []),
+                list(result.get('assists1_ids') or []) + list(result.get('assists2_ids') or [])
+            )
+        self._applied_stat_deltas = write_match_results(matches.values(), stat_rows)
+        logger.info("[BatchRecordResultsCommand] Successfully recorded %s results", len(matches))
+        return len(matches)
+
+    def journal_entries(self):
+        for result in self.results:
+            match_id = uuid.UUID(str(result['match_id']))
+            payload = {'match_id': str(match_id), 'score1': result['score1'], 'score2': result['score2']}
+            payload.update({field: [str(i) for i in result.get(field) or []] for field in self.ID_FIELDS})
+            yield match_id, RecordMatchResultCommand.__name__, payload
+
+
+class BatchSimulateResultsCommand(BatchCommand):
+    """Симуляція пакета запланованих матчів через ParallelMatchSimulator з одним seed і симулятором з MATCH_SIMULATORS."""
+
+    def __init__(self, match_ids, rng: SimulationRNG = None, workers=1, simulator: str = 'simple'):
+        super().__init__()
+        if simulator not in MATCH_SIMULATORS:
+            raise ValueError(f"Невідомий симулятор: {simulator}")
+        self.match_ids = list(match_ids)
+        self.rng = rng if rng is not None else SimulationRNG()
+        self.workers = workers
+        self.simulator = simulator
+
+    def validate(self):
+        errors = []
+        matches = self._load_matches(self.match_ids, errors)
+        for match in matches.values():
+            if match.status != Match.STATUS_SCHEDULED:
+                errors.append(f"Матч {match.id} не запланований, симуляція неможлива.")
+        return matches, errors
+
+    def execute(self):
+        logger.debug("[BatchSimulateResultsCommand] Executing for %s matches", len(self.match_ids))
+        matches, errors = self.validate()
+        if errors:
+            raise ValidationError(errors)
+        self._snapshot(matches.values())
+
+        simulator = ParallelMatchSimulator(workers=self.workers, seed=self.rng, simulator=self.simulator)
+        with transaction.atomic():
+            results = simulator.simulate_matches(Match.objects.filter(pk__in=matches.keys()))
+        self._applied_stat_deltas = simulator.stat_deltas
+        logger.info("[BatchSimulateResultsCommand] Successfully simulated %s matches", len(results))
+        return len(results)
+
+    def journal_entries(self):
+        for match_id in self.backups:
+            yield match_id, SimulateMatchResultCommand.__name__, {
+                'match_id': str(match_id), 'seed': str(self.rng.seed), 'simulator': self.simulator
+            }
+
+
+def batch_commands_from_payload(data, workers=1):
+    """
+    Пакетні команди з JSON: {"results": [...], "simulate": [match_id, ...], "seed": int,
+    "simulator": ключ MATCH_SIMULATORS} або просто список результатів.
+    """
+    if isinstance(data, list):
+        data = {'results': data}
+    if not isinstance(data, dict):
+        raise ValueError("Очікується JSON-об'єкт або список результатів.")
+    results, simulate = data.get('results') or [], data.get('simulate') or []
+    if not isinstance(results, list) or not all(isinstance(result, dict) for result in results):
+        raise ValueError("Поле results має бути списком об'єктів.")
+    if not isinstance(simulate, list):
+        raise ValueError("Поле simulate має бути списком ID матчів.")
+    if not results and not simulate:
+        raise ValueError("Пакет порожній.")
+
+    commands = []
+    if results:
+        commands.append(BatchRecordResultsCommand(results))
+    if simulate:
+        seed = data.get('seed')
+        simulator = data.get('simulator') or 'simple'
+        commands.append(BatchSimulateResultsCommand(simulate, rng=SimulationRNG(seed), workers=workers, simulator=simulator))
+    return commands
+
+
+COMMAND_TYPES = {
+    RecordMatchResultCommand.__name__: RecordMatchResultCommand,
+    SimulateMatchResultCommand.__name__: SimulateMatchResultCommand,
+}
\ No newline at end of file
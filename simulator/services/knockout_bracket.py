@@ -0,0 +1,265 @@
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Match, Team, Tournament
+from .monte_carlo import MonteCarloMatchEngine, SimulationRNG
+from .strength import get_strength_provider
+from .tournament_manager import TournamentManager
+
+logger = logging.getLogger(__name__)
+
+
+def bracket_size(num_teams):
+    size = 1
+    while size < num_teams:
+        size *= 2
+    return size
+
+
+def seed_positions(size):
+    """
+    Стандартна розстановка посіву в сітці: [1, 2] -> [1, 4, 2, 3] -> [1, 8, 4, 5, 2, 7, 3, 6] ...
+    Сіяні 1 і 2 можуть зустрітися лише у фіналі.
+    """
+    positions = [1]
+    while len(positions) < size:
+        mirror = 2 * len(positions) + 1
+        positions = [seed for position in positions for seed in (position, mirror - position)]
+    return positions
+
+
+def bracket_slots(seeded_teams):
+    """
+    Розставляє команди (у порядку посіву) по слотах першого раунду.
+    Вільні слоти (None) — це «вихідні», які дістаються найвище сіяним командам.
+    """
+    num_teams = len(seeded_teams)
+    if num_teams < 2:
+        return []
+    return [seeded_teams[seed - 1] if seed <= num_teams else None for seed in seed_positions(bracket_size(num_teams))]
+
+
+def bracket_entry(team1_id, team2_id, match_id=None):
+    winner = None
+    if team1_id is None or team2_id is None:
+        winner = team1_id if team2_id is None else team2_id
+    return {'team1': team1_id, 'team2': team2_id, 'match_id': match_id, 'winner': winner}
+
+
+def initial_bracket(slots, match_ids, first_round=1):
+    """
+    Будує JSON сітки з першого раунду. match_ids — {(team1_id, team2_id): match_id}.
+    ID зберігаються рядками, як і в турнірній таблиці. first_round — round_number
+    матчів першого раунду (після групового етапу він більший за 1).
+    """
+    ids = [str(team.id) if team is not None else None for team in slots]
+    round_entries = []
+    for i in range(0, len(ids), 2):
+        match_id = match_ids.get((ids[i], ids[i + 1]))
+        round_entries.append(bracket_entry(ids[i], ids[i + 1], str(match_id) if match_id else None))
+    return {'size': len(slots), 'first_round': first_round, 'rounds': [round_entries]}
+
+
+def bracket_round_count(bracket):
+    size = bracket.get('size') or 0
+    return max(size.bit_length() - 1, 0)
+
+
+def team_strengths(tournament, strength_provider=None):
+    """Повертає {str(team_id): (base, bonus)} для всіх учасників турніру."""
+    strength_provider = strength_provider or get_strength_provider()
+    return strength_provider.strengths(tournament.teams.values_list('id', flat=True))
+
+
+def standings_seed_order(tournament):
+    return [entry['team'].id for entry in TournamentManager(tournament_id=tournament.id).calculate_standings()]
+
+
+def strength_seed_order(tournament):
+    strengths = team_strengths(tournament)
+    teams = tournament.teams.order_by('name', 'id').values_list('id', flat=True)
+    return sorted(teams, key=lambda team_id: -sum(strengths[str(team_id)]))
+
+
+def _match_winner(match):
+    if match['status'] != Match.STATUS_FINISHED or match['score1'] is None or match['score2'] is None:
+        raise ValueError(f"Матч {match['id']} ще не завершено.")
+    if match['score1'] == match['score2']:
+        raise ValueError(f"Матч {match['id']} завершився нічиєю — у плей-оф потрібен переможець.")
+    return match['team1_id'] if match['score1'] > match['score2'] else match['team2_id']
+
+
+def advance_bracket(tournament: Tournament, time_per_match=timedelta(days=1), matches_per_day=1):
+    """
+    Фіксує переможців поточного раунду сітки і створює матчі наступного.
+
+    Усі матчі раунду мають бути завершені з переможцем, інакше ValueError.
+    Після фіналу визначає чемпіона і завершує турнір. Повертає створені матчі.
+    """
+    with transaction.atomic():
+        tournament = Tournament.objects.select_for_update().get(pk=tournament.pk)
+        bracket = tournament.bracket or {}
+        rounds = bracket.get('rounds') or []
+        if not rounds:
+            raise ValueError(f"Турнір '{tournament.name}' не має сітки плей-оф.")
+
+        current = rounds[-1]
+        if len(current) == 1 and current[0]['winner']:
+            raise ValueError(f"Сітку турніру '{tournament.name}' вже завершено.")
+
+        match_ids = [entry['match_id'] for entry in current if entry['match_id']]
+        matches = {
+            str(m['id']): m
+            for m in Match.objects.filter(pk__in=match_ids).values('id', 'status', 'score1', 'score2', 'team1_id', 'team2_id', 'match_datetime')
+        }
+        for entry in current:
+            if entry['match_id']:
+                match = matches.get(entry['match_id'])
+                if match is None:
+                    raise ValueError(f"Матч {entry['match_id']} сітки не знайдено.")
+                entry['winner'] = str(_match_winner(match))
+
+        created = []
+        if len(current) > 1:
+            round_number = bracket.get('first_round', 1) + len(rounds)
+            match_datetime = max((m['match_datetime'] for m in matches.values()), default=timezone.now()) + time_per_match
+            teams = {str(pk): team for pk, team in Team.objects.in_bulk({entry['winner'] for entry in current}).items()}
+
+            next_round = []
+            new_matches = []
+            match_count_today = 0
+            for i in range(0, len(current), 2):
+                entry = bracket_entry(current[i]['winner'], current[i + 1]['winner'])
+                if entry['winner'] is None:
+                    match = Match(
+                        tournament=tournament, team1=teams[entry['team1']], team2=teams[entry['team2']],
+                        match_datetime=match_datetime,
+                        status=Match.STATUS_SCHEDULED, round_number=round_number,
+                    )
+                    new_matches.append((entry, match))
+                    match_count_today += 1
+                    if match_count_today >= matches_per_day:
+                        match_datetime += time_per_match
+                        match_count_today = 0
+                next_round.append(entry)
+
+            created = Match.objects.bulk_create([match for _, match in new_matches])
+            for (entry, _), match in zip(new_matches, created):
+                entry['match_id'] = str(match.id)
+            rounds.append(next_round)
+            logger.info("Сітка '%s': створено %s матчів раунду %s.", tournament.name, len(created), round_number)
+
+        tournament.bracket = bracket
+        tournament.save(update_fields=['bracket'])
+        if len(current) == 1:
+            logger.info("Сітка '%s': чемпіон визначено.", tournament.name)
+            if tournament.status == Tournament.STATUS_ONGOING:
+                tournament.check_and_finish()
+    return created
+
+
+class KnockoutProjection:
+    """
+    Монте-Карло симуляція сітки плей-оф у пам'яті.
+
+    Стан сітки (учасники, вже визначені переможці, вихідні) читається один раз,
+    далі всі ще не зіграні раунди симулюються векторно: кожен раунд — один виклик
+    MonteCarloMatchEngine.simulate_matrix для всіх реплікацій і пар одразу.
+    Нічия вирішується серією пенальті — підкиданням монети.
+    """
+
+    def __init__(self, tournament_id, replications=10000, engine: MonteCarloMatchEngine = None, chunk_size=5000,
+                 rng: SimulationRNG = None, strength_provider=None):
+        if replications < 1:
+            raise ValueError("Кількість реплікацій має бути додатною.")
+        self.strength_provider = strength_provider
+        try:
+            self.tournament = Tournament.objects.get(pk=tournament_id)
+        except (Tournament.DoesNotExist, ValueError):
+            raise ValueError(f"Турнір з ID {tournament_id} не знайдено.")
+        self.replications = replications
+        self.rng = rng or SimulationRNG()
+        self.engine = engine or MonteCarloMatchEngine(rng=self.rng.for_tournament(self.tournament.id))
+        self.chunk_size = chunk_size
+
+    def _load_state(self):
+        bracket = self.tournament.bracket or {}
+        rounds = bracket.get('rounds') or []
+        if not rounds:
+            raise ValueError(f"Турнір '{self.tournament.name}' не має сітки плей-оф.")
+
+        team_ids = [team_id for entry in rounds[0] for team_id in (entry['team1'], entry['team2']) if team_id]
+        teams = {str(pk): team for pk, team in Team.objects.in_bulk(team_ids).items()}
+        teams = [teams[team_id] for team_id in team_ids]
+        index = {str(team.id): i for i, team in enumerate(teams)}
+
+        strengths = team_strengths(self.tournament, self.strength_provider)
+        # Останній елемент — «порожній» слот (індекс -1) для вихідних.
+        base = np.array([strengths.get(str(team.id), (0, 0))[0] for team in teams] + [0], dtype=float)
+        bonus = np.array([strengths.get(str(team.id), (0, 0))[1] for team in teams] + [0], dtype=float)
+
+        first_slots = np.array([
+            index[team_id] if team_id else -1
+            for entry in rounds[0] for team_id in (entry['team1'], entry['team2'])
+        ], dtype=np.int64)
+        match_ids = [entry['match_id'] for entry in rounds[-1] if entry['match_id'] and not entry['winner']]
+        played = {}
+        for match in Match.objects.filter(pk__in=match_ids, status=Match.STATUS_FINISHED).values('id', 'status', 'score1', 'score2', 'team1_id', 'team2_id'):
+            try:
+                played[str(match['id'])] = str(_match_winner(match))
+            except ValueError:
+                continue
+
+        fixed_winners = []
+        for round_entries in rounds:
+            fixed = {}
+            for i, entry in enumerate(round_entries):
+                winner = entry['winner'] or played.get(entry['match_id'])
+                if winner and entry['match_id']:
+                    fixed[i] = index[winner]
+            fixed_winners.append(fixed)
+        return teams, base, bonus, first_slots, fixed_winners, bracket_round_count(bracket)
+
+    def project(self):
+        teams, base, bonus, first_slots, fixed_winners, round_count = self._load_state()
+        num_teams = len(teams)
+        reach_counts = np.zeros((num_teams, round_count + 1), dtype=np.int64)
+
+        done = 0
+        while done < self.replications:
+            chunk = min(self.chunk_size, self.replications - done)
+            participants = np.broadcast_to(first_slots, (chunk, len(first_slots)))
+            for round_index in range(round_count):
+                present = participants[participants >= 0]
+                reach_counts[:, round_index] += np.bincount(present, minlength=num_teams)
+
+                side1, side2 = participants[:, 0::2], participants[:, 1::2]
+                score1, score2 = self.engine.simulate_matrix(base[side1], base[side2], bonus[side1], bonus[side2])
+                coin = self.engine.rng.random(score1.shape) < 0.5
+                first_wins = (score1 > score2) | ((score1 == score2) & coin)
+                winners = np.where(first_wins, side1, side2)
+                winners = np.where(side1 < 0, side2, np.where(side2 < 0, side1, winners))
+                if round_index < len(fixed_winners):
+                    for position, winner in fixed_winners[round_index].items():
+                        winners[:, position] = winner
+                participants = winners
+            reach_counts[:, round_count] += np.bincount(participants.ravel(), minlength=num_teams)
+            done += chunk
+
+        probabilities = reach_counts / self.replications
+        rows = [
+            {
+                'team': team,
+                'team_id': str(team.id),
+                'team_name': team.name,
+                'round_probabilities': [float(p) for p in probabilities[i, :round_count]],
+                'champion_probability': float(probabilities[i, round_count]),
+            }
+            for i, team in enumerate(teams)
+        ]
+        rows.sort(key=lambda row: (-row['champion_probability'], row['team_name']))
+        return rows
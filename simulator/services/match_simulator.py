@@ -1,46 +1,45 @@
-import random
+import logging
 from ..models import Match, Team
 from django.core.exceptions import ValidationError
 from .player_stats_updater import update_player_stats_from_match_data
+from .monte_carlo import MonteCarloMatchEngine, SimulationRNG, assign_scorers
+from .team_cache import TeamSquadCache, team_cache
+from .strength import get_strength_provider
+from .poisson_model import PoissonGoalModel, get_fitted_poisson_model
+
+logger = logging.getLogger(__name__)
+
 
 class SimpleMatchSimulator:
 
-    def __init__(self, match: Match):
+    def __init__(self, match: Match, rng: SimulationRNG = None, cache: TeamSquadCache = None, strength_provider=None):
         if not isinstance(match, Match):
             raise TypeError("Необхідно передати об'єкт Match.")
         self.match = match
-
-    def _get_team_strength(self, team: Team):
-        base_strength = team.players.count() * 10
-        random_factor = random.uniform(0.8, 1.2)
-        name_bonus = len(team.name) % 5
-        return base_strength * random_factor + name_bonus
+        self.rng = rng or SimulationRNG()
+        self._generator = self.rng.for_match(match.id)
+        self.engine = MonteCarloMatchEngine(rng=self._generator)
+        self.cache = cache or team_cache
+        self.strength_provider = strength_provider or get_strength_provider()
+        self.stat_deltas = {}
 
     def simulate(self):
 
         if self.match.status != Match.STATUS_SCHEDULED:
-             print(f"Матч {self.match.id} не запланований, симуляція неможлива.")
+             logger.warning("Матч %s не запланований, симуляція неможлива.", self.match.id)
              return None
 
-        print(f"Симуляція матчу: {self.match.team1} vs {self.match.team2}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Симуляція матчу: %s vs %s", self.match.team1, self.match.team2)
 
-        strength1 = self._get_team_strength(self.match.team1)
-        strength2 = self._get_team_strength(self.match.team2)
+        strengths = self.strength_provider.strengths([self.match.team1_id, self.match.team2_id])
+        base1, bonus1 = strengths[str(self.match.team1_id)]
+        base2, bonus2 = strengths[str(self.match.team2_id)]
 
-        max_goals = 5
-        score1 = 0
-        score2 = 0
+        scores1, scores2 = self.engine.simulate([base1], [base2], 1, bonus1=[bonus1], bonus2=[bonus2])
+        score1, score2 = int(scores1[0, 0]), int(scores2[0, 0])
 
-        simulation_steps = 10
-        for _ in range(simulation_steps):
-            if random.random() < (strength1 / (strength1 + strength2 + 1)) * 0.5:
-                if score1 < max_goals:
-                     score1 += 1
-            if random.random() < (strength2 / (strength1 + strength2 + 1)) * 0.5:
-                 if score2 < max_goals:
-                     score2 += 1
-
-        print(f"Результат симуляції: {score1} - {score2}")
+        logger.debug("Результат симуляції: %s - %s", score1, score2)
         return score1, score2
 
     def simulate_and_set_result(self):
@@ -48,42 +47,56 @@ class SimpleMatchSimulator:
         if result is not None:
             score1, score2 = result
             try:
-                self.match.set_result(score1, score2)
-                print(f"Результат {score1}-{score2} для матчу {self.match.id} записано.")
+                self.match.set_result(score1, score2, simulation_seed=self.rng.seed)
+                logger.debug("Результат %s-%s для матчу %s записано.", score1, score2, self.match.id)
                 self._assign_random_scorers(score1, score2)
                 return True
             except (ValueError, ValidationError) as e:
-                print(f"Помилка запису результату симуляції: {e}")
+                logger.error("Помилка запису результату симуляції: %s", e)
                 return False
         return False
 
+    def _squad_ids(self, team: Team):
+        return list(self.cache.get(team.id)['squad'])
+
     def _assign_random_scorers(self, score1, score2):
-        scorers1_ids = []
-        assists1_ids = []
-        scorers2_ids = []
-        assists2_ids = []
-
-        players1 = list(self.match.team1.players.all())
-        players2 = list(self.match.team2.players.all())
-
-        if players1:
-            for _ in range(score1):
-                 scorer = random.choice(players1)
-                 scorers1_ids.append(str(scorer.id))
-                 potential_assistants = [p for p in players1 if p != scorer]
-                 if potential_assistants and random.random() > 0.3:
-                     assists1_ids.append(str(random.choice(potential_assistants).id))
-
-        if players2:
-            for _ in range(score2):
-                 scorer = random.choice(players2)
-                 scorers2_ids.append(str(scorer.id))
-                 potential_assistants = [p for p in players2 if p != scorer]
-                 if potential_assistants and random.random() > 0.3:
-                     assists2_ids.append(str(random.choice(potential_assistants).id))
-
-        update_player_stats_from_match_data(
+        scorers1_ids, assists1_ids = assign_scorers(self._generator, self._squad_ids(self.match.team1), score1)
+        scorers2_ids, assists2_ids = assign_scorers(self._generator, self._squad_ids(self.match.team2), score2)
+
+        self.stat_deltas = update_player_stats_from_match_data(
              match=self.match,
              scorers1_ids=scorers1_ids, assists1_ids=assists1_ids,
              scorers2_ids=scorers2_ids, assists2_ids=assists2_ids
-        )
\ No newline at end of file
+        )
+
+
+class PoissonMatchSimulator(SimpleMatchSimulator):
+    """
+    Симулятор на пуассонівській моделі голів (PoissonGoalModel).
+
+    Рахунок — один обернений CDF-запит до кешованої матриці ймовірностей пари;
+    автори голів і запис результату такі ж, як у SimpleMatchSimulator.
+    """
+
+    def __init__(self, match: Match, rng: SimulationRNG = None, cache: TeamSquadCache = None, model: PoissonGoalModel = None):
+        super().__init__(match, rng=rng, cache=cache)
+        self.model = model or get_fitted_poisson_model()
+
+    def outcome_probabilities(self):
+        return self.model.outcome_probabilities(self.match.team1_id, self.match.team2_id)
+
+    def simulate(self):
+        if self.match.status != Match.STATUS_SCHEDULED:
+             logger.warning("Матч %s не запланований, симуляція неможлива.", self.match.id)
+             return None
+
+        score1, score2 = self.model.sample(self.match.team1_id, self.match.team2_id, self._generator)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Результат симуляції (Пуассон): %s vs %s %s - %s", self.match.team1, self.match.team2, score1, score2)
+        return score1, score2
+
+
+MATCH_SIMULATORS = {
+    'simple': SimpleMatchSimulator,
+    'poisson': PoissonMatchSimulator,
+}
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+Чисті обчислення симуляції без залежності від Django.
+
+Модуль імпортується воркерами ProcessPoolExecutor, тому не повинен
+торкатися моделей чи налаштувань Django.
+"""
+import hashlib
+import uuid
+
+import numpy as np
+
+
+def _key_to_int(key):
+    if isinstance(key, int):
+        return key
+    if isinstance(key, uuid.UUID):
+        return key.int
+    try:
+        return uuid.UUID(str(key)).int
+    except ValueError:
+        return int(hashlib.sha256(str(key).encode('utf-8')).hexdigest(), 16)
+
+
+class SimulationRNG:
+    """
+    Контекст відтворюваних випадкових потоків для одного запуску симуляції.
+
+    Потоки не залежать від порядку викликів: генератор для матчу чи турніру
+    виводиться з кореневого seed та ключа (простір імен + ID) через
+    SeedSequence(spawn_key=...). Тож результат конкретного матчу однаковий
+    незалежно від того, чи симулювався він окремо, у пакеті чи в іншому процесі.
+    """
+
+    MATCH = 1
+    TOURNAMENT = 2
+
+    def __init__(self, seed=None):
+        self.seed = np.random.SeedSequence(None if seed is None else int(seed)).entropy
+
+    def stream(self, namespace, key=0):
+        spawn_key = (int(namespace), _key_to_int(key))
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=spawn_key))
+
+    def for_match(self, match_id):
+        return self.stream(self.MATCH, match_id)
+
+    def for_tournament(self, tournament_id):
+        return self.stream(self.TOURNAMENT, tournament_id)
+
+
+def team_base_strength(player_count, team_name):
+    return player_count * 10, len(team_name) % 5
+
+
+class MonteCarloMatchEngine:
+    """
+    Векторизований рушій симуляції: N матчів × K реплікацій за один виклик.
+
+    Модель та сама, що й у SimpleMatchSimulator: сила команди = base * U(0.8, 1.2) + bonus,
+    на кожному з `simulation_steps` кроків команда забиває з імовірністю
+    strength / (strength1 + strength2 + 1) * 0.5, рахунок обмежено `max_goals`.
+    Сума незалежних кроків Бернуллі — це біноміальний розподіл, тож кроки
+    семплюються одним викликом `binomial` без циклу.
+    """
+
+    def __init__(self, max_goals=5, simulation_steps=10, noise_range=(0.8, 1.2), rng=None):
+        self.max_goals = max_goals
+        self.simulation_steps = simulation_steps
+        self.noise_range = noise_range
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def _perturb(self, base, bonus):
+        if self.noise_range is None:
+            return base + bonus
+        low, high = self.noise_range
+        return base * self.rng.uniform(low, high, size=base.shape) + bonus
+
+    def goal_probabilities(self, strengths1, strengths2):
+        total = strengths1 + strengths2 + 1
+        return strengths1 / total * 0.5, strengths2 / total * 0.5
+
+    def simulate(self, base1, base2, replications=1, bonus1=None, bonus2=None):
+        """Повертає два масиви рахунків форми (N, K)."""
+        columns = []
+        for values in (base1, base2, bonus1, bonus2):
+            values = np.zeros(1) if values is None else np.asarray(values, dtype=float)
+            columns.append(values.reshape(-1, 1))
+        if columns[0].shape != columns[1].shape:
+            raise ValueError("Масиви сил команд повинні мати однакову довжину.")
+        shape = (columns[0].shape[0], replications)
+        base1, base2, bonus1, bonus2 = (np.broadcast_to(column, shape) for column in columns)
+        return self.simulate_matrix(base1, base2, bonus1, bonus2)
+
+    def simulate_matrix(self, base1, base2, bonus1=0.0, bonus2=0.0):
+        """
+        Як simulate, але сили задано поелементно масивами однакової форми —
+        наприклад, коли в кожній репліці грають різні пари команд (сітка плей-оф).
+        """
+        base1 = np.asarray(base1, dtype=float)
+        base2 = np.asarray(base2, dtype=float)
+        if base1.shape != base2.shape:
+            raise ValueError("Масиви сил команд повинні мати однакову форму.")
+        strengths1 = self._perturb(base1, bonus1)
+        strengths2 = self._perturb(base2, bonus2)
+
+        p1, p2 = self.goal_probabilities(strengths1, strengths2)
+        score1 = np.minimum(self.rng.binomial(self.simulation_steps, p1), self.max_goals)
+        score2 = np.minimum(self.rng.binomial(self.simulation_steps, p2), self.max_goals)
+        return score1, score2
+
+
+def assign_scorers(rng, player_ids, goals):
+    scorers = []
+    assists = []
+    if not player_ids:
+        return scorers, assists
+    for _ in range(goals):
+        scorer_idx = int(rng.integers(len(player_ids)))
+        scorers.append(player_ids[scorer_idx])
+        if len(player_ids) > 1 and rng.random() > 0.3:
+            assistant_idx = int(rng.integers(len(player_ids) - 1))
+            if assistant_idx >= scorer_idx:
+                assistant_idx += 1
+            assists.append(player_ids[assistant_idx])
+    return scorers, assists
+
+
+def simulate_single_match(rng, base1, bonus1, base2, bonus2, players1, players2):
+    """
+    Симулює один матч на генераторі rng: рахунок, далі автори голів і асистенти.
+    Порядок споживання випадкових чисел фіксований, що робить результат відтворюваним.
+    """
+    engine = MonteCarloMatchEngine(rng=rng)
+    scores1, scores2 = engine.simulate([base1], [base2], 1, bonus1=[bonus1], bonus2=[bonus2])
+    score1, score2 = int(scores1[0, 0]), int(scores2[0, 0])
+    scorers1, assists1 = assign_scorers(rng, players1, score1)
+    scorers2, assists2 = assign_scorers(rng, players2, score2)
+    return score1, score2, scorers1, assists1, scorers2, assists2
+
+
+def simulate_match_chunk(payloads, seed):
+    """
+    Симулює пакет матчів у воркері.
+
+    payloads — список кортежів (match_id, base1, bonus1, base2, bonus2, players1, players2).
+    Кожен матч отримує власний потік SimulationRNG(seed).for_match(match_id).
+    Повертає список кортежів (match_id, score1, score2, scorers1, assists1, scorers2, assists2).
+    """
+    rng = SimulationRNG(seed)
+    results = []
+    for match_id, base1, bonus1, base2, bonus2, players1, players2 in payloads:
+        outcome = simulate_single_match(rng.for_match(match_id), base1, bonus1, base2, bonus2, players1, players2)
+        results.append((match_id,) + outcome)
+    return results
+
+
+def sample_score(cdf, max_goals, rng, size=None):
+    """Обернений CDF по плоскій таблиці рахунків: одна рівномірна величина на матч."""
+    draws = np.minimum(np.searchsorted(cdf, rng.random(size), side='right'), cdf.size - 1)
+    score1, score2 = np.divmod(draws, max_goals + 1)
+    if size is None:
+        return int(score1), int(score2)
+    return score1, score2
+
+
+def simulate_poisson_chunk(payloads, seed):
+    """
+    Як simulate_match_chunk, але рахунок семплюється з таблиці пуассонівської моделі.
+
+    payloads — список кортежів (match_id, cdf, max_goals, players1, players2), де cdf —
+    кумулятивна таблиця рахунків пари (PoissonGoalModel.score_cdf). Порядок споживання
+    випадкових чисел той самий, що в PoissonMatchSimulator.
+    """
+    rng = SimulationRNG(seed)
+    results = []
+    for match_id, cdf, max_goals, players1, players2 in payloads:
+        generator = rng.for_match(match_id)
+        score1, score2 = sample_score(cdf, max_goals, generator)
+        scorers1, assists1 = assign_scorers(generator, players1, score1)
+        scorers2, assists2 = assign_scorers(generator, players2, score2)
+        results.append((match_id, score1, score2, scorers1, assists1, scorers2, assists2))
+    return results
@@ -0,0 +1,114 @@
+import os
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from ..models import Event, Match
+from .monte_carlo import SimulationRNG, simulate_match_chunk, simulate_poisson_chunk
+from .player_stats_updater import match_stat_rows
+from .poisson_model import get_fitted_poisson_model
+from .result_writer import write_match_results
+from .team_cache import team_cache
+from .strength import get_strength_provider
+
+
+class ParallelMatchSimulator:
+    """
+    Паралельна симуляція великої кількості запланованих матчів.
+
+    Дані для симуляції (сили команд, склади) завантажуються кількома запитами,
+    самі обчислення розподіляються по ProcessPoolExecutor пакетами фіксованого
+    розміру. Кожен матч симулюється на власному потоці SimulationRNG(seed).for_match(id),
+    тому результат залежить лише від seed — не від розміру пакетів чи кількості
+    воркерів — і збігається з симулятором MATCH_SIMULATORS[simulator] з тим самим seed.
+    Для 'poisson' модель підбирається в батьківському процесі, а воркери отримують
+    лише кумулятивні таблиці рахунків пар.
+    Батьківський процес записує всі результати однією транзакцією, а таблиця
+    кожного турніру перераховується один раз після коміту (deferred_standings).
+    """
+
+    # Ключ MATCH_SIMULATORS -> функція воркера, що відтворює цей симулятор.
+    CHUNK_SIMULATORS = {
+        'simple': simulate_match_chunk,
+        'poisson': simulate_poisson_chunk,
+    }
+
+    def __init__(self, workers=None, seed=None, chunk_size=64, strength_provider=None, simulator='simple', model=None):
+        if simulator not in self.CHUNK_SIMULATORS:
+            raise ValueError(f"Невідомий симулятор: {simulator}")
+        self.workers = workers or os.cpu_count() or 1
+        self.rng = seed if isinstance(seed, SimulationRNG) else SimulationRNG(seed)
+        self.chunk_size = chunk_size
+        self.simulator = simulator
+        self.strength_provider = strength_provider or get_strength_provider()
+        self.model = model
+        self.stat_deltas = {}
+
+    def simulate_event(self, event_id):
+        if not Event.objects.filter(pk=event_id).exists():
+            raise ValueError(f"Подію з ID {event_id} не знайдено.")
+        matches = Match.objects.filter(tournament__event_id=event_id)
+        return self.simulate_matches(matches)
+
+    def simulate_matches(self, matches):
+        matches = list(matches.filter(status=Match.STATUS_SCHEDULED))
+        if not matches:
+            return []
+
+        payloads, squads = self._build_payloads(matches)
+        results = self._run(payloads)
+        self._write_results(matches, results, squads)
+        return results
+
+    def _build_payloads(self, matches):
+        team_ids = {m.team1_id for m in matches} | {m.team2_id for m in matches}
+        profiles = team_cache.get_many(team_ids)
+        if self.simulator == 'poisson':
+            model = self.model or get_fitted_poisson_model()
+        else:
+            strengths = self.strength_provider.strengths(team_ids)
+        squads = {}
+        payloads = []
+        for match in matches:
+            team1, team2 = str(match.team1_id), str(match.team2_id)
+            squads[match.team1_id], squads[match.team2_id] = profiles[team1]['squad'], profiles[team2]['squad']
+            if self.simulator == 'poisson':
+                parameters = (model.score_cdf(team1, team2), model.max_goals)
+            else:
+                parameters = (*strengths[team1], *strengths[team2])
+            payloads.append((
+                str(match.id), *parameters,
+                profiles[team1]['squad'], profiles[team2]['squad']
+            ))
+        return payloads, squads
+
+    def _run(self, payloads):
+        chunks = [payloads[i:i + self.chunk_size] for i in range(0, len(payloads), self.chunk_size)]
+        seeds = itertools.repeat(self.rng.seed)
+        simulate_chunk = self.CHUNK_SIMULATORS[self.simulator]
+
+        if self.workers == 1 or len(chunks) == 1:
+            chunk_results = map(simulate_chunk, chunks, seeds)
+            return [result for chunk in chunk_results for result in chunk]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as executor:
+            chunk_results = executor.map(simulate_chunk, chunks, seeds)
+            return [result for chunk in chunk_results for result in chunk]
+
+    def _write_results(self, matches, results, squads):
+        by_id = {str(m.id): m for m in matches}
+        stat_rows = {}
+
+        for match_id, score1, score2, scorers1, assists1, scorers2, assists2 in results:
+            match = by_id[match_id]
+            match.score1 = score1
+            match.score2 = score2
+            match.status = Match.STATUS_FINISHED
+            match.simulation_seed = str(self.rng.seed)
+            stat_rows[match.id] = match_stat_rows(
+                match.id,
+                {match.team1_id: squads[match.team1_id], match.team2_id: squads[match.team2_id]},
+                scorers1 + scorers2,
+                assists1 + assists2
+            )
+
+        self.stat_deltas = write_match_results(by_id.values(), stat_rows)
@@ -1,86 +1,254 @@
-from ..models import Match, Player, PlayerStatistics
+from ..models import Match, Player, PlayerMatchStat, PlayerStatistics
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from collections import defaultdict
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
 
-def _update_single_player_stat(player_id, stat_type):
-    try:
-        valid_uuid = uuid.UUID(str(player_id))
-        player = Player.objects.select_related('statistics').get(pk=valid_uuid)
 
-        stats, created = PlayerStatistics.objects.get_or_create(player=player)
-        if created:
-            print(f"Створено запис статистики для гравця {player.name}")
-
-        fields_to_update = ['games_played']
-        stats.games_played += 1
-
-        if stat_type == 'goal':
-             stats.goals += 1
-             fields_to_update.append('goals')
-        elif stat_type == 'assist':
-             stats.assists += 1
-             fields_to_update.append('assists')
-
-        stats.save(update_fields=fields_to_update)
-        print(f"Оновлено статистику ({stat_type or 'played'}) для {player.name}: {fields_to_update}")
-
-    except Player.DoesNotExist:
-        print(f"Помилка оновлення статистики: Гравець з ID {player_id} не знайдений.")
-    except PlayerStatistics.MultipleObjectsReturned:
-         print(f"Помилка: Знайдено декілька записів статистики для гравця ID {player_id}.")
-    except ValueError:
-         print(f"Помилка: Некоректний UUID {player_id}")
-    except Exception as e:
-        logger.error(f"Неочікувана помилка при оновленні статистики для {player_id}: {e}", exc_info=True)
-        print(f"Неочікувана помилка при оновленні статистики для {player_id}: {e}")
+STAT_FIELDS = ('games_played', 'goals', 'assists')
+STAT_UPDATE_BATCH = 500
+
+
+def new_stat_deltas():
+    return defaultdict(lambda: dict.fromkeys(STAT_FIELDS, 0))
+
+
+def negate_stat_deltas(deltas):
+    return {player_id: {field: -value for field, value in delta.items()} for player_id, delta in deltas.items()}
+
+
+def _raise_negative_stats(player_ids, deltas):
+    current = {player_id: dict(zip(STAT_FIELDS, values)) for player_id, *values in
+               PlayerStatistics.objects.filter(player_id__in=player_ids).values_list('player_id', *STAT_FIELDS)}
+    for player_id in player_ids:
+        totals = current.get(player_id, dict.fromkeys(STAT_FIELDS, 0))
+        below_zero = [field for field in STAT_FIELDS if totals[field] + deltas[player_id][field] < 0]
+        if below_zero:
+            raise ValueError(
+                f"Статистика гравця {player_id} стала б від'ємною ({', '.join(below_zero)}): "
+                f"зведення розійшлося з PlayerMatchStat, виконайте rebuild_player_stats."
+            )
+    raise ValueError("Статистику гравців не оновлено: записи змінилися під час оновлення.")
+
+
+def apply_player_stat_deltas(deltas):
+    """
+    Застосовує прирости відносним оновленням: UPDATE ... SET goals = goals + CASE ... END
+    (F()-вирази), тож записи не перечитуються й не блокуються заздалегідь, а зміни
+    паралельних транзакцій не губляться. Для гравців без запису PlayerStatistics
+    він створюється одним bulk_create. Кількість запитів не залежить від кількості гравців.
+
+    Значення не обрізаються нулем: зменшення виконується лише з умовою «результат ≥ 0»
+    в тому ж UPDATE; якщо для когось вона не справдилась (зведення змінили в обхід
+    PlayerMatchStat), нічого не пишеться і виникає ValueError — інакше відкат з
+    подальшим повтором не повертав би ті самі підсумки.
+    """
+    parsed = {}
+    for player_id, delta in deltas.items():
+        if not any(delta.values()):
+            continue
+        try:
+            parsed[uuid.UUID(str(player_id))] = delta
+        except ValueError:
+            logger.warning("Некоректний UUID гравця %s, статистику пропущено.", player_id)
+    if not parsed:
+        return 0
+
+    with transaction.atomic():
+        existing = list(PlayerStatistics.objects.filter(player_id__in=parsed.keys()).values_list('player_id', flat=True))
+        for start in range(0, len(existing), STAT_UPDATE_BATCH):
+            batch = existing[start:start + STAT_UPDATE_BATCH]
+            changes = {}
+            guards = []
+            for field in STAT_FIELDS:
+                cases = [When(player_id=player_id, then=Value(parsed[player_id][field])) for player_id in batch if parsed[player_id][field]]
+                if cases:
+                    change = Case(*cases, default=Value(0), output_field=IntegerField())
+                    changes[field] = F(field) + change
+                    if any(parsed[player_id][field] < 0 for player_id in batch):
+                        guards.append(GreaterThanOrEqual(F(field) + change, 0))
+            updated = PlayerStatistics.objects.filter(*guards, player_id__in=batch).update(**changes)
+            if updated != len(batch):
+                _raise_negative_stats(batch, parsed)
+
+        missing_ids = set(parsed) - set(existing)
+        to_create = []
+        if any(value < 0 for player_id in missing_ids for value in parsed[player_id].values()):
+            _raise_negative_stats(missing_ids, parsed)
+        if missing_ids:
+            known_ids = Player.objects.filter(pk__in=missing_ids).values_list('pk', flat=True)
+            to_create = [
+                PlayerStatistics(player_id=player_id, **parsed[player_id])
+                for player_id in known_ids
+            ]
+            PlayerStatistics.objects.bulk_create(to_create)
+
+    return len(existing) + len(to_create)
+
+
+def load_squads(team_ids):
+    """Склади команд одним запитом: {team_id: [player_id, ...]} (порожній список для команд без гравців)."""
+    squads = {team_id: [] for team_id in team_ids}
+    if squads:
+        for player_id, team_id in Player.objects.filter(team_id__in=squads.keys()).values_list('id', 'team_id'):
+            squads[team_id].append(player_id)
+    return squads
+
+
+def match_stat_rows(match_id, squads, scorers_ids, assists_ids):
+    """
+    Будує рядки PlayerMatchStat одного матчу (без запитів).
+    squads — {team_id: [player_id, ...]} обох команд; автори голів і асистів
+    поза заявкою теж вважаються учасниками матчу.
+    """
+    rows = {}
+
+    def row(player_id, team_id=None):
+        try:
+            player_id = uuid.UUID(str(player_id))
+        except ValueError:
+            logger.warning("Некоректний UUID гравця %s, статистику пропущено.", player_id)
+            return None
+        if player_id not in rows:
+            rows[player_id] = PlayerMatchStat(player_id=player_id, match_id=match_id, team_id=team_id)
+        return rows[player_id]
+
+    for team_id, squad in squads.items():
+        for player_id in squad:
+            row(player_id, team_id)
+    for player_id in scorers_ids or []:
+        stat = row(player_id)
+        if stat is not None:
+            stat.goals += 1
+    for player_id in assists_ids or []:
+        stat = row(player_id)
+        if stat is not None:
+            stat.assists += 1
+    return list(rows.values())
+
+
+def accumulate_fact_deltas(deltas, facts, sign=1):
+    """Додає (sign=1) або віднімає (sign=-1) внесок рядків PlayerMatchStat у прирости зведення."""
+    for fact in facts:
+        delta = deltas[str(fact.player_id)]
+        delta['games_played'] += sign * int(fact.appeared)
+        delta['goals'] += sign * fact.goals
+        delta['assists'] += sign * fact.assists
+    return deltas
+
+
+def record_player_match_stats(rows_by_match):
+    """
+    Записує статистику гравців за матчі: {match_id: [PlayerMatchStat, ...]}.
+
+    Наявні рядки цих матчів (виправлення результату) замінюються, а зведення
+    PlayerStatistics змінюється рівно на різницю між старими і новими рядками.
+    Повертає застосовані прирости {player_id: {поле: зміна}} — їх достатньо для
+    точного відкату (restore_player_match_stats). Кількість запитів не залежить
+    ні від кількості матчів, ні від кількості гравців.
+    """
+    if not rows_by_match:
+        return {}
+    with transaction.atomic():
+        previous = list(PlayerMatchStat.objects.filter(match_id__in=rows_by_match.keys()))
+        rows = [row for match_rows in rows_by_match.values() for row in match_rows]
+        known_ids = {str(pk) for pk in Player.objects.filter(pk__in={row.player_id for row in rows}).values_list('pk', flat=True)}
+        rows = [row for row in rows if str(row.player_id) in known_ids]
+
+        deltas = accumulate_fact_deltas(new_stat_deltas(), previous, -1)
+        accumulate_fact_deltas(deltas, rows)
+        if previous:
+            PlayerMatchStat.objects.filter(match_id__in=rows_by_match.keys()).delete()
+        PlayerMatchStat.objects.bulk_create(rows, batch_size=1000)
+        deltas = {player_id: dict(delta) for player_id, delta in deltas.items() if any(delta.values())}
+        apply_player_stat_deltas(deltas)
+    return deltas
+
+
+def restore_player_match_stats(match_id, rows, applied_deltas):
+    """
+    Повертає рядки матчу до rows (знімок до виконання команди) і відкочує зведення
+    на applied_deltas одним відносним оновленням, не перераховуючи статистику.
+    """
+    with transaction.atomic():
+        PlayerMatchStat.objects.filter(match_id=match_id).delete()
+        PlayerMatchStat.objects.bulk_create(rows)
+        apply_player_stat_deltas(negate_stat_deltas(applied_deltas))
+
+
+def remove_player_match_stats(match_ids):
+    """Видаляє статистику гравців за матчі й точно віднімає її зі зведення. Повертає кількість рядків."""
+    with transaction.atomic():
+        facts = list(PlayerMatchStat.objects.filter(match_id__in=match_ids))
+        if not facts:
+            return 0
+        PlayerMatchStat.objects.filter(pk__in=[fact.pk for fact in facts]).delete()
+        apply_player_stat_deltas(accumulate_fact_deltas(new_stat_deltas(), facts, -1))
+    return len(facts)
+
+
+def aggregate_player_stats(queryset=None):
+    """
+    Агрегати за рядками PlayerMatchStat (за замовчуванням — за всі матчі), напр.
+    aggregate_player_stats(PlayerMatchStat.objects.filter(match__tournament=t)).
+    Повертає values-queryset з player_id, player__name, player__team__name,
+    games_played, goals, assists, відсортований за голами.
+    """
+    queryset = PlayerMatchStat.objects.all() if queryset is None else queryset
+    return (
+        queryset.values('player_id', 'player__name', 'player__team__name')
+        .annotate(games_played=Count('id', filter=Q(appeared=True)), goals=Sum('goals'), assists=Sum('assists'))
+        .order_by('-goals', '-assists', 'player__name')
+    )
+
+
+def rebuild_player_statistics():
+    """
+    Перераховує зведення PlayerStatistics з PlayerMatchStat для всіх гравців і створює
+    відсутні рядки (нульові для гравців без матчів). Повертає кількість записів.
+    """
+    totals = {
+        row['player_id']: row
+        for row in PlayerMatchStat.objects.values('player_id').annotate(
+            games_played=Count('id', filter=Q(appeared=True)), goals=Sum('goals'), assists=Sum('assists')
+        ).order_by()
+    }
+    with transaction.atomic():
+        existing = list(PlayerStatistics.objects.select_for_update())
+        for stats in existing:
+            total = totals.get(stats.player_id, {})
+            for field in STAT_FIELDS:
+                setattr(stats, field, total.get(field) or 0)
+        PlayerStatistics.objects.bulk_update(existing, list(STAT_FIELDS), batch_size=1000)
+
+        missing = set(Player.objects.values_list('id', flat=True)) - {stats.player_id for stats in existing}
+        PlayerStatistics.objects.bulk_create(
+            [PlayerStatistics(player_id=player_id, **{field: totals.get(player_id, {}).get(field) or 0 for field in STAT_FIELDS}) for player_id in missing],
+            batch_size=1000
+        )
+    return len(existing) + len(missing)
 
 
 def update_player_stats_from_match_data(match: Match, scorers1_ids, assists1_ids, scorers2_ids, assists2_ids):
-    print(f"[Статистика] Оновлення для матчу {match.id}...")
-
-    processed_players = set()
-
-    # Process scorers and assistants ensuring IDs are strings for set operations
-    all_scorers = [str(pid) for pid in (scorers1_ids or []) + (scorers2_ids or [])]
-    all_assistants = [str(pid) for pid in (assists1_ids or []) + (assists2_ids or [])]
-
-    for player_id in all_scorers:
-         _update_single_player_stat(player_id, 'goal')
-         processed_players.add(player_id)
-
-    for player_id in all_assistants:
-         # Only update assist if player didn't score (to avoid double game count)
-         if player_id not in processed_players:
-            _update_single_player_stat(player_id, 'assist')
-            processed_players.add(player_id)
-         else: # If they scored, just update the assist count without game played again
-            try:
-                stats = PlayerStatistics.objects.get(player_id=player_id)
-                stats.assists +=1
-                stats.save(update_fields=['assists'])
-                print(f"Оновлено статистику (assist only) для {stats.player.name}: ['assists']")
-            except PlayerStatistics.DoesNotExist:
-                 print(f"Помилка оновлення асисту: Статистика гравця {player_id} не знайдена.")
-            except Exception as e:
-                 logger.error(f"Помилка оновлення асисту для {player_id}: {e}", exc_info=True)
-
-
-    # Get all players involved in the match
-    all_involved_player_ids = set()
-    try:
-        if match.team1:
-            all_involved_player_ids.update(str(p.id) for p in match.team1.players.all())
-        if match.team2:
-            all_involved_player_ids.update(str(p.id) for p in match.team2.players.all())
-    except Exception as e:
-         logger.error(f"Помилка отримання гравців для матчу {match.id}: {e}", exc_info=True)
-
-
-    # Update games_played for players who participated but didn't score/assist
-    for player_id in all_involved_player_ids:
-        if player_id not in processed_players:
-             _update_single_player_stat(player_id, None)
-
-    print(f"[Статистика] Оновлення для матчу {match.id} завершено.")
\ No newline at end of file
+    """
+    Записує рядки PlayerMatchStat матчу й оновлює зведення набором запитів фіксованої довжини.
+    Кожен гравець заявки отримує +1 зіграний матч незалежно від кількості голів чи асистів;
+    повторний виклик для того ж матчу замінює попередні рядки. Повертає застосовані прирости.
+    """
+    logger.debug("[Статистика] Оновлення для матчу %s...", match.id)
+
+    squads = load_squads([team_id for team_id in (match.team1_id, match.team2_id) if team_id])
+
+    rows = match_stat_rows(
+        match.id, squads,
+        list(scorers1_ids or []) + list(scorers2_ids or []),
+        list(assists1_ids or []) + list(assists2_ids or [])
+    )
+    deltas = record_player_match_stats({match.id: rows})
+
+    logger.debug("[Статистика] Оновлення для матчу %s завершено (%s гравців).", match.id, len(deltas))
+    return deltas
\ No newline at end of file
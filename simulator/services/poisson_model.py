@@ -0,0 +1,221 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.db.models import Count, Max
+
+from ..models import Match
+from .monte_carlo import sample_score
+
+
+def poisson_pmf(rate, max_goals):
+    pmf = np.empty(max_goals + 1)
+    pmf[0] = np.exp(-rate)
+    for goals in range(1, max_goals + 1):
+        pmf[goals] = pmf[goals - 1] * rate / goals
+    return pmf
+
+
+def dixon_coles_tau(score1, score2, rate1, rate2, rho):
+    """Поправка Діксона–Коулза для рахунків 0:0, 1:0, 0:1 і 1:1 (векторно)."""
+    tau = np.ones(np.broadcast(score1, score2, rate1, rate2).shape)
+    tau = np.where((score1 == 0) & (score2 == 0), 1 - rate1 * rate2 * rho, tau)
+    tau = np.where((score1 == 0) & (score2 == 1), 1 + rate1 * rho, tau)
+    tau = np.where((score1 == 1) & (score2 == 0), 1 + rate2 * rho, tau)
+    tau = np.where((score1 == 1) & (score2 == 1), 1 - rho, tau)
+    return tau
+
+
+class PoissonGoalModel:
+    """
+    Модель незалежних пуассонівських голів з поправкою Діксона–Коулза.
+
+    Очікувані голи господарів: base * home * attack[team1] * defence[team2],
+    гостей: base * attack[team2] * defence[team1]. Параметри підбираються
+    ітераціями методу Махера за завершеними матчами; prior_weight «уявних» матчів
+    проти середнього суперника стягує параметри команд з малою історією до 1.
+    rho підбирається за максимумом правдоподібності на сітці значень.
+
+    Для кожної пари команд повна матриця ймовірностей рахунків обчислюється один
+    раз і кешується (LRU), тож ймовірності результату рахуються аналітично,
+    а симуляція матчу — це один обернений CDF-запит до таблиці.
+    """
+
+    DEFAULT_GOALS_PER_TEAM = 1.35
+
+    def __init__(self, max_goals=10, prior_weight=2.0, dixon_coles=True, iterations=100, cache_size=4096, tolerance=1e-9):
+        self.max_goals = max_goals
+        self.prior_weight = prior_weight
+        self.dixon_coles = dixon_coles
+        self.iterations = iterations
+        self.tolerance = tolerance
+        self.cache_size = cache_size
+        self.base = self.DEFAULT_GOALS_PER_TEAM
+        self.home = 1.0
+        self.rho = 0.0
+        self.attack = {}
+        self.defence = {}
+        self.matches_fitted = 0
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fit(self, results=None):
+        """
+        results — ітерабельне з (team1_id, team2_id, score1, score2);
+        за замовчуванням усі завершені матчі з БД. Ітерації зупиняються раніше,
+        щойно параметри змінюються менше ніж на tolerance.
+        """
+        if results is None:
+            results = (
+                Match.objects.filter(status=Match.STATUS_FINISHED, score1__isnull=False, score2__isnull=False)
+                .values_list('team1_id', 'team2_id', 'score1', 'score2')
+                .iterator(chunk_size=5000)
+            )
+        rows = [(str(team1_id), str(team2_id), score1, score2) for team1_id, team2_id, score1, score2 in results]
+        self._matrices.clear()
+        self.matches_fitted = len(rows)
+        if not rows:
+            self.attack, self.defence = {}, {}
+            return self
+
+        team_ids = sorted({row[0] for row in rows} | {row[1] for row in rows})
+        index = {team_id: i for i, team_id in enumerate(team_ids)}
+        home_idx = np.array([index[row[0]] for row in rows])
+        away_idx = np.array([index[row[1]] for row in rows])
+        home_goals = np.array([row[2] for row in rows], dtype=float)
+        away_goals = np.array([row[3] for row in rows], dtype=float)
+        num_teams = len(team_ids)
+
+        attack = np.ones(num_teams)
+        defence = np.ones(num_teams)
+        base = max(away_goals.mean(), 0.1)
+        home = max(home_goals.mean(), 0.1) / base
+        scored = np.bincount(home_idx, home_goals, num_teams) + np.bincount(away_idx, away_goals, num_teams)
+        conceded = np.bincount(home_idx, away_goals, num_teams) + np.bincount(away_idx, home_goals, num_teams)
+        prior = self.prior_weight * (home_goals.sum() + away_goals.sum()) / (2 * len(rows))
+
+        for _ in range(self.iterations):
+            previous_attack, previous_defence = attack, defence
+            expected_for = (np.bincount(home_idx, base * home * defence[away_idx], num_teams)
+                            + np.bincount(away_idx, base * defence[home_idx], num_teams))
+            attack = (scored + prior) / (expected_for + prior)
+            attack /= attack.mean()
+
+            expected_against = (np.bincount(home_idx, base * attack[away_idx], num_teams)
+                                + np.bincount(away_idx, base * home * attack[home_idx], num_teams))
+            defence = (conceded + prior) / (expected_against + prior)
+            defence /= defence.mean()
+
+            base = max(away_goals.sum() / (attack[away_idx] * defence[home_idx]).sum(), 1e-6)
+            home = max(home_goals.sum() / (attack[home_idx] * defence[away_idx]).sum(), 1e-6) / base
+            if max(np.abs(attack - previous_attack).max(), np.abs(defence - previous_defence).max()) < self.tolerance:
+                break
+
+        self.base, self.home = float(base), float(home)
+        self.attack = dict(zip(team_ids, attack.tolist()))
+        self.defence = dict(zip(team_ids, defence.tolist()))
+        if self.dixon_coles:
+            rate1 = base * home * attack[home_idx] * defence[away_idx]
+            rate2 = base * attack[away_idx] * defence[home_idx]
+            self.rho = self._fit_rho(home_goals, away_goals, rate1, rate2)
+        return self
+
+    @staticmethod
+    def _fit_rho(score1, score2, rate1, rate2):
+        best_rho, best_likelihood = 0.0, 0.0
+        for rho in np.linspace(-0.2, 0.2, 41):
+            tau = dixon_coles_tau(score1, score2, rate1, rate2, rho)
+            if np.any(tau <= 0):
+                continue
+            likelihood = np.log(tau).sum()
+            if likelihood > best_likelihood:
+                best_rho, best_likelihood = float(rho), likelihood
+        return best_rho
+
+    def expected_goals(self, team1_id, team2_id):
+        team1_id, team2_id = str(team1_id), str(team2_id)
+        rate1 = self.base * self.home * self.attack.get(team1_id, 1.0) * self.defence.get(team2_id, 1.0)
+        rate2 = self.base * self.attack.get(team2_id, 1.0) * self.defence.get(team1_id, 1.0)
+        return rate1, rate2
+
+    def _tables(self, team1_id, team2_id):
+        key = (str(team1_id), str(team2_id))
+        with self._lock:
+            cached = self._matrices.get(key)
+            if cached is not None:
+                self._matrices.move_to_end(key)
+                return cached
+
+        rate1, rate2 = self.expected_goals(*key)
+        matrix = np.outer(poisson_pmf(rate1, self.max_goals), poisson_pmf(rate2, self.max_goals))
+        if self.rho:
+            goals = np.arange(self.max_goals + 1)
+            matrix *= dixon_coles_tau(goals[:, None], goals[None, :], rate1, rate2, self.rho)
+        matrix /= matrix.sum()
+        matrix.setflags(write=False)
+        cdf = np.cumsum(matrix.ravel())
+
+        with self._lock:
+            self._matrices[key] = (matrix, cdf)
+            while len(self._matrices) > self.cache_size:
+                self._matrices.popitem(last=False)
+        return matrix, cdf
+
+    def score_matrix(self, team1_id, team2_id):
+        """Матриця P[score1, score2] розміру (max_goals + 1)², з кешу."""
+        return self._tables(team1_id, team2_id)[0]
+
+    def score_cdf(self, team1_id, team2_id):
+        """Кумулятивна таблиця по score_matrix (рядками), з кешу — для sample_score."""
+        return self._tables(team1_id, team2_id)[1]
+
+    def outcome_probabilities(self, team1_id, team2_id):
+        """Повертає (перемога господарів, нічия, перемога гостей) без семплювання."""
+        matrix = self.score_matrix(team1_id, team2_id)
+        return float(np.tril(matrix, -1).sum()), float(np.trace(matrix)), float(np.triu(matrix, 1).sum())
+
+    def most_likely_score(self, team1_id, team2_id):
+        matrix = self.score_matrix(team1_id, team2_id)
+        score1, score2 = np.unravel_index(int(np.argmax(matrix)), matrix.shape)
+        return int(score1), int(score2)
+
+    def sample(self, team1_id, team2_id, rng, size=None):
+        """Обернений CDF: одна рівномірна величина на матч, пошук у кешованій таблиці."""
+        return sample_score(self.score_cdf(team1_id, team2_id), self.max_goals, rng, size)
+
+
+_fitted = {'current': None}
+_refit_lock = threading.Lock()
+
+
+def results_stamp():
+    """
+    (кількість, найпізніший updated_at) завершених матчів — один запит по індексу (status, updated_at).
+    Змінюється з кожним записом, зміною чи видаленням результату в будь-якому процесі.
+    """
+    stamp = Match.objects.filter(status=Match.STATUS_FINISHED).aggregate(count=Count('id'), latest=Max('updated_at'))
+    return stamp['count'], stamp['latest']
+
+
+def get_fitted_poisson_model(stamp=None):
+    """
+    Модель, підібрана за поточними результатами з БД. Модель процесу перевіряється
+    за results_stamp(), тож результати, записані іншими воркерами, теж її оновлюють,
+    а перепідбір відбувається лише раз на зміну результатів.
+
+    stamp — уже порахований у цьому запиті results_stamp(), щоб не повторювати агрегат.
+    Актуальна модель читається без замка; замок тримається лише під час перепідбору,
+    щоб паралельні запити не підбирали ту саму модель кілька разів. Модель одна на всі
+    турніри (сили команд оцінюються за всіма результатами), тож і ключ у неї один.
+    """
+    if stamp is None:
+        stamp = results_stamp()
+    current = _fitted['current']
+    if current is not None and current[0] == stamp:
+        return current[1]
+    with _refit_lock:
+        current = _fitted['current']
+        if current is None or current[0] != stamp:
+            current = (stamp, PoissonGoalModel().fit())
+            _fitted['current'] = current
+        return current[1]
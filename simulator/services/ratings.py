@@ -0,0 +1,171 @@
+import logging
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Match, Team, TeamRating, TeamRatingHistory
+
+logger = logging.getLogger(__name__)
+
+K_FACTOR = 20.0
+ELO_SCALE = 400.0
+
+
+def expected_score(rating1, rating2):
+    return 1.0 / (1.0 + 10 ** ((rating2 - rating1) / ELO_SCALE))
+
+
+def goal_difference_multiplier(goal_difference):
+    goal_difference = abs(goal_difference)
+    if goal_difference <= 1:
+        return 1.0
+    if goal_difference == 2:
+        return 1.5
+    return (11.0 + goal_difference) / 8.0
+
+
+def elo_update(rating1, rating2, score1, score2, k_factor=K_FACTOR):
+    """Повертає нові рейтинги обох команд після матчу (формула World Football Elo)."""
+    actual = 1.0 if score1 > score2 else 0.5 if score1 == score2 else 0.0
+    change = k_factor * goal_difference_multiplier(score1 - score2) * (actual - expected_score(rating1, rating2))
+    return rating1 + change, rating2 - change
+
+
+def _is_rateable(state):
+    return bool(
+        state and state['status'] == Match.STATUS_FINISHED
+        and state['score1'] is not None and state['score2'] is not None
+        and state['team1_id'] and state['team2_id']
+    )
+
+
+class EloRatingSystem:
+    """
+    Рейтинги Ело команд з історією змін.
+
+    Кожен завершений матч змінює рейтинги обох команд і записує по рядку
+    TeamRatingHistory на команду. Інкрементальні оновлення застосовуються в порядку
+    завершення матчів; виправлення результату відкочує внесок матчу й застосовує
+    його наново. rebuild() переграє всю історію в порядку match_datetime.
+    """
+
+    RATED_FIELDS = ('status', 'score1', 'score2', 'team1_id', 'team2_id')
+
+    def __init__(self, k_factor=K_FACTOR):
+        self.k_factor = k_factor
+
+    @staticmethod
+    def _load_ratings(team_ids):
+        ratings = {r.team_id: r for r in TeamRating.objects.select_for_update().filter(team_id__in=team_ids)}
+        missing = [TeamRating(team_id=team_id) for team_id in set(team_ids) - ratings.keys()]
+        for rating in TeamRating.objects.bulk_create(missing):
+            ratings[rating.team_id] = rating
+        return ratings
+
+    def apply_matches(self, matches):
+        """Застосовує завершені матчі до рейтингів; повертає кількість врахованих матчів."""
+        matches = sorted(
+            (m for m in matches if _is_rateable({field: getattr(m, field) for field in self.RATED_FIELDS})),
+            key=lambda m: (m.match_datetime, str(m.id))
+        )
+        if not matches:
+            return 0
+
+        with transaction.atomic():
+            ratings = self._load_ratings({m.team1_id for m in matches} | {m.team2_id for m in matches})
+            history = []
+            for match in matches:
+                rating1, rating2 = ratings[match.team1_id], ratings[match.team2_id]
+                new1, new2 = elo_update(rating1.rating, rating2.rating, match.score1, match.score2, self.k_factor)
+                history.append(TeamRatingHistory(team_id=match.team1_id, match_id=match.id, rating_before=rating1.rating,
+                                                 rating_after=new1, match_datetime=match.match_datetime))
+                history.append(TeamRatingHistory(team_id=match.team2_id, match_id=match.id, rating_before=rating2.rating,
+                                                 rating_after=new2, match_datetime=match.match_datetime))
+                rating1.rating, rating2.rating = new1, new2
+                rating1.matches_rated += 1
+                rating2.matches_rated += 1
+
+            now = timezone.now()
+            for rating in ratings.values():
+                rating.updated_at = now
+            TeamRating.objects.bulk_update(list(ratings.values()), ['rating', 'matches_rated', 'updated_at'])
+            TeamRatingHistory.objects.bulk_create(history)
+        return len(matches)
+
+    def revert_matches(self, match_ids):
+        """Відкочує внесок матчів у рейтинги та видаляє їхню історію."""
+        with transaction.atomic():
+            history = list(TeamRatingHistory.objects.filter(match_id__in=match_ids))
+            if not history:
+                return 0
+            ratings = self._load_ratings({row.team_id for row in history})
+            for row in history:
+                rating = ratings[row.team_id]
+                rating.rating -= row.delta
+                rating.matches_rated = max(rating.matches_rated - 1, 0)
+            now = timezone.now()
+            for rating in ratings.values():
+                rating.updated_at = now
+            TeamRating.objects.bulk_update(list(ratings.values()), ['rating', 'matches_rated', 'updated_at'])
+            TeamRatingHistory.objects.filter(pk__in=[row.pk for row in history]).delete()
+        return len({row.match_id for row in history})
+
+    def sync_match(self, previous_state, match):
+        """Узгоджує рейтинги після збереження матчу (викликається з сигналу post_save)."""
+        current_state = {field: getattr(match, field) for field in self.RATED_FIELDS}
+        if previous_state and all(previous_state.get(field) == current_state[field] for field in self.RATED_FIELDS):
+            return
+        with transaction.atomic():
+            if _is_rateable(previous_state):
+                self.revert_matches([match.id])
+            if _is_rateable(current_state):
+                self.apply_matches([match])
+
+    def rebuild(self, chunk_size=2000):
+        """
+        Перераховує всі рейтинги з нуля, переграючи завершені матчі за match_datetime.
+
+        Матчі читаються потоком (iterator), а історія пишеться пакетами по chunk_size,
+        тож пам'ять залежить лише від кількості команд. Повертає (матчів, команд).
+        """
+        with transaction.atomic():
+            TeamRatingHistory.objects.all().delete()
+            TeamRating.objects.all().delete()
+
+            ratings = {}
+            history = []
+            match_count = 0
+            finished = (
+                Match.objects.filter(status=Match.STATUS_FINISHED, score1__isnull=False, score2__isnull=False)
+                .order_by('match_datetime', 'id')
+                .values_list('id', 'team1_id', 'team2_id', 'score1', 'score2', 'match_datetime')
+            )
+            for match_id, team1_id, team2_id, score1, score2, match_datetime in finished.iterator(chunk_size=chunk_size):
+                rating1 = ratings.setdefault(team1_id, [TeamRating.INITIAL_RATING, 0])
+                rating2 = ratings.setdefault(team2_id, [TeamRating.INITIAL_RATING, 0])
+                new1, new2 = elo_update(rating1[0], rating2[0], score1, score2, self.k_factor)
+                history.append(TeamRatingHistory(team_id=team1_id, match_id=match_id, rating_before=rating1[0],
+                                                 rating_after=new1, match_datetime=match_datetime))
+                history.append(TeamRatingHistory(team_id=team2_id, match_id=match_id, rating_before=rating2[0],
+                                                 rating_after=new2, match_datetime=match_datetime))
+                rating1[0], rating2[0] = new1, new2
+                rating1[1] += 1
+                rating2[1] += 1
+                match_count += 1
+                if len(history) >= chunk_size:
+                    TeamRatingHistory.objects.bulk_create(history)
+                    history = []
+            TeamRatingHistory.objects.bulk_create(history)
+
+            TeamRating.objects.bulk_create(
+                (TeamRating(team_id=team_id, rating=rating, matches_rated=count) for team_id, (rating, count) in ratings.items()),
+                batch_size=chunk_size
+            )
+        logger.info("Рейтинги Ело перераховано: %s матчів, %s команд.", match_count, len(ratings))
+        return match_count, len(ratings)
+
+
+def rating_of(team: Team):
+    try:
+        return team.rating.rating
+    except TeamRating.DoesNotExist:
+        return TeamRating.INITIAL_RATING
@@ -1,3 +1,4 @@
+import logging
 
 from ..models import Team, Player, PlayerStatistics, Recommendation, Match
 from django.db.models import Avg, Q, Count
@@ -5,6 +6,8 @@ from django.utils import timezone
 from django.db.models import Sum
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
 class RecommendationSystem:
     def __init__(self, team_id):
         try:
@@ -96,6 +99,12 @@ class RecommendationSystem:
             if win_rate < 0.3 and form['L'] > form['W']:
                  recommendations.append(f"Погана поточна форма ({form['W']}W-{form['D']}D-{form['L']}L в останніх {form['played']} матчах). Розгляньте зміни в тактиці або складі.")
 
+        rating_changes = list(self.team.rating_history.values_list('rating_before', 'rating_after')[:5])
+        if len(rating_changes) >= 3:
+            rating_change = sum(after - before for before, after in rating_changes)
+            if rating_change <= -30:
+                recommendations.append(f"Рейтинг Ело знизився на {abs(rating_change):.0f} пунктів за останні {len(rating_changes)} матчів. Команда поступається суперникам свого рівня.")
+
         
         final_recommendation_text = "\n".join(f"- {rec}" for rec in recommendations) if recommendations else "На даний момент конкретних рекомендацій немає. Команда виглядає збалансовано."
 
@@ -108,9 +117,9 @@ class RecommendationSystem:
                     team=self.team,
                     recommendation_text=final_recommendation_text
                 )
-                print(f"Рекомендацію для команди '{self.team.name}' оновлено.")
+                logger.debug("Рекомендацію для команди '%s' оновлено.", self.team.name)
             except Exception as e:
-                print(f"Помилка збереження рекомендації: {e}")
+                logger.error("Помилка збереження рекомендації: %s", e)
 
         return final_recommendation_text
 
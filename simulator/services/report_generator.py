@@ -1,18 +1,21 @@
 # simulator/services/report_generator.py
 import abc
+import logging
 from django.utils import timezone
 from ..models import Match, Player, Team, Tournament, PlayerStatistics
 
+logger = logging.getLogger(__name__)
+
 class BaseReportGenerator(abc.ABC):
     def generate(self, output_format='text', **kwargs):
         """Шаблонний метод генерації звіту."""
-        print(f"--- Генерація звіту: {self.get_report_title()} ---")
+        logger.debug("--- Генерація звіту: %s ---", self.get_report_title())
         data = self.fetch_data(**kwargs)
         if not data:
-             print("Немає даних для звіту.")
+             logger.debug("Немає даних для звіту.")
              return None
         formatted_data = self.format_data(data, output_format=output_format, **kwargs)
-        print("--- Звіт згенеровано ---")
+        logger.debug("--- Звіт згенеровано ---")
         return formatted_data
 
     @abc.abstractmethod
@@ -44,7 +47,7 @@ class TournamentResultsReport(BaseReportGenerator):
             ).select_related('team1', 'team2').order_by('match_datetime')
             return {'tournament': tournament, 'matches': list(matches)}
         except Tournament.DoesNotExist:
-            print(f"Помилка: Турнір з ID {tournament_id} не знайдено.")
+            logger.warning("Помилка: Турнір з ID %s не знайдено.", tournament_id)
             return None
 
     def format_data(self, data, output_format='text', **kwargs):
@@ -80,7 +83,7 @@ class PlayerStatisticsReport(BaseReportGenerator):
                  team = Team.objects.get(pk=team_id)
                  stats = stats.filter(player__team=team)
              except Team.DoesNotExist:
-                 print(f"Попередження: Команда з ID {team_id} не знайдена, показуємо статистику всіх гравців.")
+                 logger.warning("Попередження: Команда з ID %s не знайдена, показуємо статистику всіх гравців.", team_id)
 
         return {'stats': list(stats[:top_n]), 'team_id': team_id}
 
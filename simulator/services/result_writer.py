@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Match
+from .player_stats_updater import record_player_match_stats
+from .ratings import EloRatingSystem
+from .standings_sync import deferred_standings, mark_dirty
+from .tournament_cache import tournament_cache
+
+RESULT_FIELDS = ('score1', 'score2', 'status', 'simulation_seed')
+
+
+def write_match_results(matches, stat_rows):
+    """
+    Записує результати багатьох матчів однією транзакцією без сигналів post_save.
+
+    matches — об'єкти Match з уже встановленими RESULT_FIELDS; stat_rows —
+    {match_id: [PlayerMatchStat, ...]} нових рядків статистики. Матчі пишуться
+    bulk_update, статистика — пакетом, рейтинги Ело відкочуються й застосовуються
+    наново, а таблиця кожного зачепленого турніру перераховується один раз після
+    коміту. Кількість запитів не залежить від кількості матчів. Повертає
+    застосовані прирости статистики гравців.
+    """
+    matches = list(matches)
+    if not matches:
+        return {}
+    with deferred_standings(), transaction.atomic():
+        ratings = EloRatingSystem()
+        ratings.revert_matches([match.id for match in matches])
+        now = timezone.now()
+        for match in matches:
+            match.updated_at = now
+        Match.objects.bulk_update(matches, [*RESULT_FIELDS, 'updated_at'], batch_size=500)
+        stat_deltas = record_player_match_stats(stat_rows)
+        ratings.apply_matches(matches)
+        tournament_ids = {match.tournament_id for match in matches}
+        mark_dirty(*tournament_ids)
+        tournament_cache.invalidate(*tournament_ids)
+    return stat_deltas
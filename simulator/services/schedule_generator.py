@@ -1,60 +1,471 @@
+import logging
 import abc
-import itertools
-import random
+import bisect
 import math
+import time
+from collections import defaultdict
+import numpy as np
 from datetime import timedelta
+from django.db import DatabaseError, transaction
+from django.db.models import Max
 from django.utils import timezone
 from ..models import Team, Match, Tournament
+from .monte_carlo import SimulationRNG
+from .tournament_manager import standings_sort_key
+from .knockout_bracket import bracket_slots, initial_bracket, standings_seed_order, strength_seed_order
+from .tournament_cache import tournament_cache
+
+logger = logging.getLogger(__name__)
 
 class ScheduleStrategy(abc.ABC):
     @abc.abstractmethod
     def generate(self, teams, start_date, **kwargs):
         pass
 
+    def tournament_kwargs(self, tournament):
+        """Додаткові параметри generate(), що залежать від стану турніру."""
+        return {}
+
+    def on_matches_created(self, tournament, matches):
+        pass
+
+def _first_match_datetime(start_date):
+    if isinstance(start_date, timezone.datetime):
+        return start_date
+    return timezone.make_aware(timezone.datetime.combine(start_date, timezone.datetime.min.time())) + timedelta(hours=12)
+
+
 class RoundRobinStrategy(ScheduleStrategy):
-    def generate(self, teams, start_date, time_per_match=timedelta(days=1), matches_per_day=1):
+    """
+    Коловий турнір за методом кола (таблиці Бергера).
+
+    Команда на першій позиції фіксована, решта обертаються на одну позицію кожного туру,
+    тож кожен тур — це N/2 матчів, де кожна команда грає не більше одного разу.
+    При непарній кількості команд додається «вихідний» (BYE). Для двоколового турніру
+    друге коло повторює перше зі зміною господарів.
+    """
+
+    BYE = None
+
+    def __init__(self, double_round_robin=False):
+        self.double_round_robin = double_round_robin
+
+    def rounds(self, teams):
+        slots = list(teams)
+        if len(slots) % 2:
+            slots.append(self.BYE)
+        num_slots = len(slots)
+        fixed, rotating = slots[0], slots[1:]
+
+        first_leg = []
+        for round_index in range(num_slots - 1):
+            current = [fixed] + rotating
+            pairs = []
+            for i in range(num_slots // 2):
+                home, away = current[i], current[num_slots - 1 - i]
+                if i == 0 and round_index % 2:
+                    home, away = away, home
+                if home is not self.BYE and away is not self.BYE:
+                    pairs.append((home, away))
+            first_leg.append(pairs)
+            rotating = rotating[-1:] + rotating[:-1]
+
+        if not self.double_round_robin:
+            return first_leg
+        return first_leg + [[(away, home) for home, away in pairs] for pairs in first_leg]
+
+    def generate(self, teams, start_date, time_per_match=timedelta(days=1), matches_per_day=1, rng=None):
         if len(teams) < 2: return []
         schedule = []
-        if isinstance(start_date, timezone.datetime):
-            match_datetime = start_date
+        match_datetime = _first_match_datetime(start_date)
+
+        match_count_today = 0
+        for round_number, pairs in enumerate(self.rounds(teams), start=1):
+            for team1, team2 in pairs:
+                schedule.append({
+                    'team1': team1, 'team2': team2, 'match_datetime': match_datetime,
+                    'status': Match.STATUS_SCHEDULED, 'round': round_number,
+                })
+                match_count_today += 1
+                if match_count_today >= matches_per_day:
+                    match_datetime += time_per_match
+                    match_count_today = 0
+        return schedule
+
+class KnockoutStrategy(ScheduleStrategy):
+    """
+    Олімпійська система: створює перший раунд повної сітки.
+
+    Кількість слотів доповнюється до степеня двійки, вільні слоти стають «вихідними»
+    для найвище сіяних команд. Посів: випадковий, за турнірною таблицею ('standings')
+    або за силою команд ('strength'). Наступні раунди створює advance_bracket.
+    Тури сітки нумеруються після вже зіграних (наприклад, групового етапу), тож пари
+    з групи можуть повторитися в плей-оф.
+    """
+
+    SEEDING_CHOICES = ('random', 'standings', 'strength')
+
+    def __init__(self, seeding='random'):
+        if seeding not in self.SEEDING_CHOICES:
+            raise ValueError(f"Невідомий спосіб посіву: {seeding}")
+        self.seeding = seeding
+        self.last_slots = []
+        self.first_round = 1
+
+    def tournament_kwargs(self, tournament):
+        if (tournament.bracket or {}).get('rounds'):
+            raise ValueError(f"Турнір '{tournament.name}' вже має сітку плей-оф.")
+        last_round = tournament.matches.aggregate(last=Max('round_number'))['last'] or 0
+        kwargs = {'first_round': last_round + 1}
+        if self.seeding == 'standings':
+            kwargs['seed_order'] = standings_seed_order(tournament)
+        elif self.seeding == 'strength':
+            kwargs['seed_order'] = strength_seed_order(tournament)
+        return kwargs
+
+    def generate(self, teams, start_date, time_per_match=timedelta(days=1), matches_per_day=1, rng=None, seed_order=None,
+                 first_round=1):
+        if len(teams) < 2: return []
+        if seed_order is not None:
+            rank = {team_id: i for i, team_id in enumerate(seed_order)}
+            teams = sorted(teams, key=lambda team: rank.get(team.id, len(rank)))
         else:
-             match_datetime = timezone.make_aware(timezone.datetime.combine(start_date, timezone.datetime.min.time())) + timedelta(hours=12)
+            rng = rng if rng is not None else np.random.default_rng()
+            teams = [teams[i] for i in rng.permutation(len(teams))]
 
+        self.last_slots = bracket_slots(teams)
+        self.first_round = first_round
+        schedule = []
+        match_datetime = _first_match_datetime(start_date)
         match_count_today = 0
-        for team1, team2 in itertools.combinations(teams, 2):
-            schedule.append({'team1': team1, 'team2': team2,'match_datetime': match_datetime,'status': Match.STATUS_SCHEDULED})
+        for i in range(0, len(self.last_slots), 2):
+            team1, team2 = self.last_slots[i], self.last_slots[i + 1]
+            if team1 is None or team2 is None:
+                continue
+            schedule.append({'team1': team1, 'team2': team2, 'match_datetime': match_datetime, 'status': Match.STATUS_SCHEDULED, 'round': first_round})
             match_count_today += 1
             if match_count_today >= matches_per_day:
                 match_datetime += time_per_match
                 match_count_today = 0
+        byes = len(self.last_slots) - len(teams)
+        logger.info("Knockout: Згенеровано %s матчів першого раунду, вихідних: %s.", len(schedule), byes)
         return schedule
 
-class KnockoutStrategy(ScheduleStrategy):
-    def generate(self, teams, start_date, time_per_match=timedelta(days=1), matches_per_day=1):
-        num_teams = len(teams)
-        if num_teams < 2: return []
-        if num_teams % 2 != 0:
-            print("Попередження: Непарна кількість команд для Knockout.")
-            random.shuffle(teams)
-            teams = teams[:-1]
-            num_teams -=1
-            if num_teams < 2: return []
-
-        random.shuffle(teams)
+    def on_matches_created(self, tournament, matches):
+        if not self.last_slots:
+            return
+        match_ids = {
+            (str(match.team1_id), str(match.team2_id)): match.id
+            for match in matches if match.round_number == self.first_round
+        }
+        slots = [str(team.id) if team is not None else None for team in self.last_slots]
+        missing = [
+            (slots[i], slots[i + 1]) for i in range(0, len(slots), 2)
+            if slots[i] and slots[i + 1] and (slots[i], slots[i + 1]) not in match_ids
+        ]
+        if missing:
+            raise ValueError(f"Не створено {len(missing)} матч(ів) першого раунду сітки — сітку не збережено.")
+        tournament.bracket = initial_bracket(self.last_slots, match_ids, first_round=self.first_round)
+        tournament.save(update_fields=['bracket'])
+
+class SwissStrategy(ScheduleStrategy):
+    """
+    Швейцарська система: кожен виклик створює один тур.
+
+    Команди впорядковуються за поточною таблицею з Tournament.standings (без
+    перерахунку) і паруються з найближчим за місцем суперником, з яким ще не грали.
+    Якщо команда «застрягла», пара відновлюється обміном з уже сформованою парою
+    (a, b) -> (t, a), (u, b), тож парування займає O(n²) у найгіршому випадку
+    замість перебору. При непарній кількості найнижча команда без вихідного
+    пропускає тур. Кількість турів за замовчуванням — ceil(log2(n)); турнір
+    не завершиться автоматично, доки їх не зіграно (Tournament.rounds_planned).
+    """
+
+    def __init__(self, rounds=None):
+        self.rounds = rounds
+
+    def tournament_kwargs(self, tournament):
+        matches = list(tournament.matches.exclude(status=Match.STATUS_CANCELLED).values_list('team1_id', 'team2_id', 'status', 'round_number'))
+        if any(status != Match.STATUS_FINISHED for _, _, status, _ in matches):
+            raise ValueError("Попередній тур швейцарської системи ще не завершено.")
+        return {
+            'standings': (tournament.standings or {}).get('table', []),
+            'played_pairs': [(team1_id, team2_id) for team1_id, team2_id, _, _ in matches],
+            'round_number': max((round_number or 0 for _, _, _, round_number in matches), default=0) + 1,
+        }
+
+    def generate(self, teams, start_date, time_per_match=timedelta(days=1), matches_per_day=1, rng=None,
+                 standings=(), played_pairs=(), round_number=1):
+        if len(teams) < 2: return []
+        played = {frozenset((str(team1_id), str(team2_id))) for team1_id, team2_id in played_pairs}
+        games = {entry['team_id']: entry.get('played', 0) for entry in standings}
+        rank = {entry['team_id']: i for i, entry in enumerate(sorted(standings, key=standings_sort_key))}
+        order = sorted(teams, key=lambda team: (rank.get(str(team.id), len(rank)), team.name))
+
+        if len(order) % 2:
+            most_games = max(games.get(str(team.id), 0) for team in order)
+            bye = next(team for team in reversed(order) if games.get(str(team.id), 0) == most_games)
+            order.remove(bye)
+            logger.debug("Swiss: %s пропускає тур %s.", bye.name, round_number)
+
+        pairs = self.pair(order, lambda a, b: frozenset((str(a.id), str(b.id))) not in played)
+
         schedule = []
-        match_datetime = timezone.make_aware(timezone.datetime.combine(start_date, timezone.datetime.min.time())) + timedelta(hours=12)
+        match_datetime = _first_match_datetime(start_date)
         match_count_today = 0
-        for i in range(0, num_teams, 2):
-            if i + 1 < num_teams:
-                team1 = teams[i]; team2 = teams[i+1]
-                schedule.append({'team1': team1,'team2': team2,'match_datetime': match_datetime,'status': Match.STATUS_SCHEDULED})
-                match_count_today += 1
-                if match_count_today >= matches_per_day:
-                    match_datetime += time_per_match
-                    match_count_today = 0
-        print(f"Knockout: Згенеровано {len(schedule)} матчів першого раунду.")
+        for team1, team2 in pairs:
+            schedule.append({'team1': team1, 'team2': team2, 'match_datetime': match_datetime, 'status': Match.STATUS_SCHEDULED, 'round': round_number})
+            match_count_today += 1
+            if match_count_today >= matches_per_day:
+                match_datetime += time_per_match
+                match_count_today = 0
+        logger.info("Swiss: Згенеровано %s матчів туру %s.", len(schedule), round_number)
+        return schedule
+
+    def on_matches_created(self, tournament, matches):
+        if matches and not tournament.rounds_planned:
+            tournament.rounds_planned = self.rounds or math.ceil(math.log2(max(tournament.teams.count(), 2)))
+            tournament.save(update_fields=['rounds_planned'])
+
+    @staticmethod
+    def pair(order, allowed):
+        """Парує впорядкований список команд; allowed(a, b) — чи допустима пара."""
+        pairs = []
+        unpaired = list(order)
+        while unpaired:
+            team = unpaired.pop(0)
+            opponent = next((other for other in unpaired if allowed(team, other)), None)
+            if opponent is not None:
+                unpaired.remove(opponent)
+                pairs.append((team, opponent))
+                continue
+
+            repaired = False
+            for index in range(len(pairs) - 1, -1, -1):
+                a, b = pairs[index]
+                for other in unpaired:
+                    if allowed(team, a) and allowed(other, b):
+                        pairs[index:index + 1] = [(a, team), (b, other)]
+                    elif allowed(team, b) and allowed(other, a):
+                        pairs[index:index + 1] = [(a, other), (b, team)]
+                    else:
+                        continue
+                    unpaired.remove(other)
+                    repaired = True
+                    break
+                if repaired:
+                    break
+
+            if not repaired:
+                opponent = unpaired.pop(0)
+                logger.warning("Swiss: Попередження: повторна зустріч %s - %s.", team.name, opponent.name)
+                pairs.append((team, opponent))
+        return pairs
+
+
+class ConstrainedScheduleStrategy(ScheduleStrategy):
+    """
+    Розклад у межах вікна події з обмеженнями: не більше `matches_per_venue_per_day`
+    матчів на арені за день і щонайменше `min_rest_days` днів відпочинку між матчами
+    команди (отже, і не двічі за день).
+
+    Пари та порядок турів бере з базової стратегії (разом з її tournament_kwargs
+    і on_matches_created). Спершу жадібно ставить кожен матч у найраніший допустимий
+    день; якщо вікно замале — у день з найменшою кількістю порушень. Далі локальний
+    пошук переносить конфліктні матчі, поки це зменшує кількість порушень. Обидві фази
+    вкладаються в `time_budget` секунд: після дедлайну решта матчів стає в найраніший
+    день без пошуку. Звіт — у `last_report`.
+    """
+
+    DEFAULT_VENUE = "Основна арена"
+
+    def __init__(self, base_strategy: ScheduleStrategy = None, matches_per_venue_per_day=2, min_rest_days=1,
+                 time_budget=2.0, first_kickoff=timedelta(hours=12), kickoff_interval=timedelta(hours=3)):
+        self.base_strategy = base_strategy or RoundRobinStrategy()
+        self.matches_per_venue_per_day = matches_per_venue_per_day
+        self.min_rest_days = min_rest_days
+        self.time_budget = time_budget
+        self.first_kickoff = first_kickoff
+        self.kickoff_interval = kickoff_interval
+        self.last_report = None
+
+    def tournament_kwargs(self, tournament):
+        kwargs = self.base_strategy.tournament_kwargs(tournament)
+        event = tournament.event
+        if event is None:
+            return kwargs
+        booked = (
+            Match.objects.filter(tournament__event=event)
+            .exclude(tournament=tournament)
+            .exclude(status=Match.STATUS_CANCELLED)
+            .values_list('match_datetime', 'venue', 'team1_id', 'team2_id')
+        )
+        return {
+            **kwargs,
+            'window_start': event.start_date,
+            'end_date': event.end_date,
+            'venues': [event.location] if event.location else None,
+            'booked': [(timezone.localdate(dt), venue, team1_id, team2_id) for dt, venue, team1_id, team2_id in booked],
+        }
+
+    def on_matches_created(self, tournament, matches):
+        self.base_strategy.on_matches_created(tournament, matches)
+
+    def generate(self, teams, start_date, end_date=None, venues=None, booked=(), window_start=None, rng=None,
+                 time_per_match=None, matches_per_day=None, **base_kwargs):
+        """
+        matches_per_day обмежує кількість матчів арени за день (замість matches_per_venue_per_day),
+        time_per_match — інтервал між початками матчів на арені (не більше kickoff_interval).
+        Решта параметрів (напр. first_round, seed_order) передається базовій стратегії;
+        невідомі для неї параметри — TypeError, як і в інших стратегій.
+        """
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        fixtures = self.base_strategy.generate(teams, start_date, rng=rng, **base_kwargs)
+        venues = list(venues or [self.DEFAULT_VENUE])
+        first_day = start_date.date() if isinstance(start_date, timezone.datetime) else start_date
+        if window_start and window_start > first_day:
+            first_day = window_start
+
+        rest = self.min_rest_days
+        capacity = matches_per_day or self.matches_per_venue_per_day
+        if end_date is not None:
+            num_days = max((end_date - first_day).days + 1, 1)
+        else:
+            num_days = max(len(fixtures) * (rest + 1), 1)
+
+        load = defaultdict(int)
+        team_days = defaultdict(list)
+        venue_index = {venue: i for i, venue in enumerate(venues)}
+        for day, venue, team1_id, team2_id in booked:
+            offset = (day - first_day).days
+            if 0 <= offset < num_days:
+                load[(offset, venue_index.get(venue, 0))] += 1
+            bisect.insort(team_days[team1_id], offset)
+            bisect.insort(team_days[team2_id], offset)
+        booked_load = dict(load)
+
+        def rest_conflicts(team_id, day):
+            days = team_days[team_id]
+            return bisect.bisect_right(days, day + rest) - bisect.bisect_left(days, day - rest)
+
+        def free_venue(day):
+            return min(range(len(venues)), key=lambda vi: load[(day, vi)])
+
+        def cost(team1_id, team2_id, day, vi):
+            overflow = 1 if load[(day, vi)] >= capacity else 0
+            return overflow + rest_conflicts(team1_id, day) + rest_conflicts(team2_id, day)
+
+        def place(i, day, vi):
+            placement[i] = (day, vi)
+            load[(day, vi)] += 1
+            bisect.insort(team_days[keys[i][0]], day)
+            bisect.insort(team_days[keys[i][1]], day)
+
+        def unplace(i):
+            day, vi = placement[i]
+            load[(day, vi)] -= 1
+            team_days[keys[i][0]].remove(day)
+            team_days[keys[i][1]].remove(day)
+
+        def best_slot(i):
+            return min(
+                ((cost(keys[i][0], keys[i][1], day, vi), day, vi) for day in range(num_days) for vi in range(len(venues))),
+                key=lambda option: option[0]
+            )
+
+        keys = [(f['team1'].id, f['team2'].id) for f in fixtures]
+        placement = [None] * len(fixtures)
+        last_day = {}
+        timed_out = False
+        for i, (team1_id, team2_id) in enumerate(keys):
+            earliest = max(last_day.get(team1_id, -rest - 1), last_day.get(team2_id, -rest - 1)) + rest + 1
+            slot = None
+            timed_out = timed_out or time.perf_counter() >= deadline
+            if timed_out:
+                day = min(max(earliest, 0), num_days - 1)
+                slot = (day, free_venue(day))
+            else:
+                for day in range(max(earliest, 0), num_days):
+                    vi = free_venue(day)
+                    if cost(team1_id, team2_id, day, vi) == 0:
+                        slot = (day, vi)
+                        break
+                if slot is None:
+                    _, day, vi = best_slot(i)
+                    slot = (day, vi)
+            place(i, *slot)
+            last_day[team1_id] = max(last_day.get(team1_id, slot[0]), slot[0])
+            last_day[team2_id] = max(last_day.get(team2_id, slot[0]), slot[0])
+
+        def conflicted(i):
+            day, vi = placement[i]
+            return load[(day, vi)] > capacity or rest_conflicts(keys[i][0], day) > 1 or rest_conflicts(keys[i][1], day) > 1
+
+        improved = True
+        while improved and time.perf_counter() < deadline:
+            improved = False
+            for i in [i for i in range(len(fixtures)) if conflicted(i)]:
+                if time.perf_counter() >= deadline:
+                    break
+                day, vi = placement[i]
+                unplace(i)
+                current = cost(keys[i][0], keys[i][1], day, vi)
+                best, best_day, best_vi = best_slot(i)
+                if best < current:
+                    place(i, best_day, best_vi)
+                    improved = True
+                else:
+                    place(i, day, vi)
+
+        # Усі матчі арени мають вміститися в один календарний день.
+        interval = min(time_per_match or self.kickoff_interval, (timedelta(days=1) - self.first_kickoff) / max(capacity, 1))
+        schedule = []
+        slot_counts = defaultdict(int)
+        for i in sorted(range(len(fixtures)), key=lambda i: placement[i]):
+            day, vi = placement[i]
+            slot_index = booked_load.get((day, vi), 0) + slot_counts[(day, vi)]
+            slot_counts[(day, vi)] += 1
+            schedule.append({
+                **fixtures[i],
+                'match_datetime': self._day_start(first_day + timedelta(days=day)) + self.first_kickoff + slot_index * interval,
+                'venue': venues[vi],
+            })
+
+        violations = self._violations(teams, venues, first_day, load, team_days, capacity, rest)
+        self.last_report = {
+            'feasible': not violations,
+            'violations': violations,
+            'fixtures': len(schedule),
+            'days_used': max((day for day, _ in placement), default=-1) + 1,
+            'window_days': num_days if end_date is not None else None,
+            'timed_out': timed_out or time.perf_counter() >= deadline,
+            'elapsed': time.perf_counter() - started,
+        }
+        logger.info("Constrained: розставлено %s матчів за %.2f с, порушень: %s.", len(schedule), self.last_report['elapsed'], len(violations))
         return schedule
 
+    @staticmethod
+    def _day_start(day):
+        return timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
+
+    @staticmethod
+    def _violations(teams, venues, first_day, load, team_days, capacity, rest):
+        names = {team.id: team.name for team in teams}
+        violations = []
+        for (day, vi), count in sorted(load.items()):
+            if count > capacity:
+                violations.append(f"{first_day + timedelta(days=day)}, {venues[vi]}: {count} матчів при ліміті {capacity}.")
+        for team in teams:
+            days = team_days[team.id]
+            for previous, current in zip(days, days[1:]):
+                if current - previous <= rest:
+                    violations.append(
+                        f"{names[team.id]}: матчі {first_day + timedelta(days=previous)} і "
+                        f"{first_day + timedelta(days=current)} — менше {rest} дн. відпочинку."
+                    )
+        return violations
+
 class ScheduleGenerator:
     def __init__(self, strategy: ScheduleStrategy):
         if not isinstance(strategy, ScheduleStrategy):
@@ -68,44 +479,71 @@ class ScheduleGenerator:
         if not team_list:
             return []
 
-        print(f"Генерація розкладу за стратегією: {self._strategy.__class__.__name__}")
+        logger.debug("Генерація розкладу за стратегією: %s", self._strategy.__class__.__name__)
         return self._strategy.generate(team_list, start_date, **kwargs)
 
-    def create_matches_for_tournament(self, tournament: Tournament, start_date, **kwargs):
-        teams = list(tournament.teams.all())
+    @property
+    def last_report(self):
+        return getattr(self._strategy, 'last_report', None)
+
+    def create_matches_for_tournament(self, tournament: Tournament, start_date, rng: SimulationRNG = None, **kwargs):
+        if rng is not None:
+            kwargs['rng'] = rng.for_tournament(tournament.id)
+        teams = list(tournament.teams.order_by('name', 'id'))
         if not teams:
-            print(f"У турнірі '{tournament.name}' немає команд для генерації розкладу.")
+            logger.warning("У турнірі '%s' немає команд для генерації розкладу.", tournament.name)
             return []
 
+        kwargs = {**self._strategy.tournament_kwargs(tournament), **kwargs}
         potential_matches_data = self.generate_schedule(teams, start_date, **kwargs)
-        created_matches = []
+
+        existing_pairs = set(Match.objects.filter(tournament=tournament).values_list('team1_id', 'team2_id', 'round_number'))
+        new_matches = []
         for match_data in potential_matches_data:
-            try:
-                defaults={
-                    'match_datetime': match_data['match_datetime'],
-                    'status': match_data['status']
-                }
-                match, created = Match.objects.get_or_create(
-                    tournament=tournament,
-                    team1=match_data['team1'],
-                    team2=match_data['team2'],
-                    defaults=defaults
-                )
-                if created:
-                    created_matches.append(match)
-                    print(f"Створено матч: {match} для турніру {tournament.name}")
-            except Exception as e:
-                 print(f"Помилка створення матчу для {match_data}: {e}")
+            pair = (match_data['team1'].id, match_data['team2'].id, match_data.get('round'))
+            if pair in existing_pairs:
+                continue
+            existing_pairs.add(pair)
+            new_matches.append(Match(
+                tournament=tournament,
+                team1=match_data['team1'],
+                team2=match_data['team2'],
+                match_datetime=match_data['match_datetime'],
+                status=match_data['status'],
+                round_number=match_data.get('round'),
+                venue=match_data.get('venue', ''),
+            ))
+
+        try:
+            with transaction.atomic():
+                created_matches = Match.objects.bulk_create(new_matches)
+                # ValueError стратегії (напр. неповна сітка) відкочує і створені матчі.
+                self._strategy.on_matches_created(tournament, created_matches)
+        except DatabaseError as e:
+            logger.exception("Помилка створення матчів для турніру %s: %s", tournament.name, e)
+            return []
+        tournament_cache.invalidate(tournament.id)
+        logger.info("Створено %s матчів для турніру %s", len(created_matches), tournament.name)
         return created_matches
 
 
 def create_schedule_generator(strategy_name: str) -> ScheduleGenerator:
     if strategy_name == 'round_robin':
         strategy_instance = RoundRobinStrategy()
+    elif strategy_name == 'double_round_robin':
+        strategy_instance = RoundRobinStrategy(double_round_robin=True)
     elif strategy_name == 'knockout':
         strategy_instance = KnockoutStrategy()
+    elif strategy_name == 'swiss':
+        strategy_instance = SwissStrategy()
+    elif strategy_name == 'constrained':
+        strategy_instance = ConstrainedScheduleStrategy()
+    elif strategy_name == 'knockout_seeded':
+        strategy_instance = KnockoutStrategy(seeding='standings')
+    elif strategy_name == 'knockout_rated':
+        strategy_instance = KnockoutStrategy(seeding='strength')
     else:
-        print(f"Попередження: Невідома стратегія '{strategy_name}'. Використовується RoundRobin.")
+        logger.warning("Попередження: Невідома стратегія '%s'. Використовується RoundRobin.", strategy_name)
         strategy_instance = RoundRobinStrategy()
 
     return ScheduleGenerator(strategy=strategy_instance)
\ No newline at end of file
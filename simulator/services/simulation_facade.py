@@ -1,13 +1,16 @@
+import logging
 
 from .tournament_manager import TournamentManager
 from .schedule_generator import ScheduleGenerator, RoundRobinStrategy # Example
 from .report_generator import TournamentResultsReport # Example
 from ..models import Tournament, Event, Team, Player, Match # etc.
 
+logger = logging.getLogger(__name__)
+
 class SimulationFacade:
     def create_event(self, name, start_date, end_date, location=None):
         event = Event.objects.create(name=name, start_date=start_date, end_date=end_date, location=location)
-        print(f"Створено подію: {event}")
+        logger.info("Створено подію: %s", event)
         return event
 
     def add_team_to_event(self, event_id, team_id):
@@ -16,14 +19,14 @@ class SimulationFacade:
             team = Team.objects.get(pk=team_id)
             event.add_team(team)
         except (Event.DoesNotExist, Team.DoesNotExist) as e:
-             print(f"Помилка додавання команди до події: {e}")
+             logger.error("Помилка додавання команди до події: %s", e)
 
     def create_tournament(self, name, event_id=None):
         params = {'name': name}
         if event_id:
             params['event_id'] = event_id
         tournament = Tournament.objects.create(**params)
-        print(f"Створено турнір: {tournament}")
+        logger.info("Створено турнір: %s", tournament)
         return tournament
 
     def generate_tournament_schedule(self, tournament_id, start_date, strategy_class=RoundRobinStrategy):
@@ -33,18 +36,18 @@ class SimulationFacade:
             matches = generator.create_matches_for_tournament(tournament, start_date)
             return matches
         except Tournament.DoesNotExist as e:
-             print(f"Помилка генерації розкладу: {e}")
+             logger.error("Помилка генерації розкладу: %s", e)
              return []
 
     def record_match_result(self, match_id, score1, score2):
          try:
             match = Match.objects.get(pk=match_id)
             match.set_result(score1, score2)
-            print(f"Результат матчу {match} записано.")
+            logger.debug("Результат матчу %s записано.", match)
          except Match.DoesNotExist as e:
-             print(f"Помилка запису результату: {e}")
+             logger.error("Помилка запису результату: %s", e)
          except (ValueError, TypeError) as e:
-             print(f"Помилка даних результату: {e}")
+             logger.error("Помилка даних результату: %s", e)
 
 
     def get_tournament_report(self, tournament_id):
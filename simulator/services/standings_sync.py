@@ -0,0 +1,77 @@
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from ..models import Tournament
+from .tournament_manager import TournamentManager
+
+_local = threading.local()
+
+
+class _StandingsBatch:
+    def __init__(self):
+        self.dirty = set()
+        self.depth = 0
+
+    def flush(self):
+        dirty, self.dirty = self.dirty, set()
+        for tournament_id in dirty:
+            try:
+                manager = TournamentManager(tournament_id=tournament_id)
+            except ValueError:
+                continue
+            manager.update_tournament_standings()
+            if manager.tournament.status == Tournament.STATUS_ONGOING:
+                manager.tournament.check_and_finish()
+        return dirty
+
+
+def _current_batch():
+    return getattr(_local, 'batch', None)
+
+
+def is_deferred():
+    return _current_batch() is not None
+
+
+def mark_dirty(*tournament_ids):
+    """
+    Позначає таблиці турнірів як застарілі. Усередині deferred_standings() лише додає
+    ID до набору; поза ним перераховує одразу після коміту поточної транзакції.
+    """
+    ids = {tournament_id for tournament_id in tournament_ids if tournament_id}
+    if not ids:
+        return
+    batch = _current_batch()
+    if batch is not None:
+        batch.dirty.update(ids)
+        return
+    batch = _StandingsBatch()
+    batch.dirty.update(ids)
+    transaction.on_commit(batch.flush)
+
+
+@contextmanager
+def deferred_standings():
+    """
+    Відкладає перерахунок турнірних таблиць до кінця пакетної операції.
+
+    Усі зміни матчів усередині блоку лише позначають турніри як «брудні»; при виході
+    з зовнішнього блоку кожна таблиця перераховується рівно один раз у
+    transaction.on_commit. Якщо транзакція відкочується, перерахунок не виконується.
+    Вкладені блоки приєднуються до зовнішнього.
+    """
+    batch = _current_batch()
+    if batch is None:
+        batch = _StandingsBatch()
+        _local.batch = batch
+    batch.depth += 1
+    try:
+        yield batch
+    finally:
+        batch.depth -= 1
+        if batch.depth == 0:
+            _local.batch = None
+            if batch.dirty:
+                transaction.on_commit(batch.flush)
@@ -0,0 +1,60 @@
+from django.conf import settings
+
+from ..models import TeamRating
+from .ratings import ELO_SCALE
+from .team_cache import TeamSquadCache, team_cache
+
+
+class SquadStrengthProvider:
+    """Історична модель: сила = кількість гравців * 10, бонус = len(назва) % 5."""
+
+    name = 'squad'
+
+    def __init__(self, cache: TeamSquadCache = None):
+        self.cache = cache or team_cache
+
+    def strengths(self, team_ids):
+        """Повертає {str(team_id): (base, bonus)}."""
+        return {team_id: (profile['base'], profile['bonus']) for team_id, profile in self.cache.get_many(team_ids).items()}
+
+
+class EloStrengthProvider:
+    """
+    Сила з рейтингу Ело: 50 * 10^((rating - 1500) / 400).
+
+    Відношення сил двох команд дорівнює шансам Ело, тож різниця в 400 пунктів
+    дає команді вдесятеро більшу ймовірність забити на кожному кроці симуляції.
+    Команди без рейтингу отримують початковий. Один запит на будь-яку кількість команд.
+    """
+
+    name = 'elo'
+    STRENGTH_AT_INITIAL = 50.0
+
+    @classmethod
+    def rating_to_strength(cls, rating):
+        return cls.STRENGTH_AT_INITIAL * 10 ** ((rating - TeamRating.INITIAL_RATING) / ELO_SCALE)
+
+    def strengths(self, team_ids):
+        team_ids = {str(team_id) for team_id in team_ids if team_id}
+        ratings = {
+            str(team_id): rating
+            for team_id, rating in TeamRating.objects.filter(team_id__in=team_ids).values_list('team_id', 'rating')
+        }
+        return {
+            team_id: (self.rating_to_strength(ratings.get(team_id, TeamRating.INITIAL_RATING)), 0.0)
+            for team_id in team_ids
+        }
+
+
+STRENGTH_PROVIDERS = {
+    SquadStrengthProvider.name: SquadStrengthProvider,
+    EloStrengthProvider.name: EloStrengthProvider,
+}
+
+
+def get_strength_provider(name=None):
+    name = name or getattr(settings, 'SIMULATOR_STRENGTH_PROVIDER', SquadStrengthProvider.name)
+    try:
+        return STRENGTH_PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Невідома модель сили команд: {name}")
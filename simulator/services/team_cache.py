@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from ..models import Player, Team
+from .monte_carlo import team_base_strength
+
+
+class TeamSquadCache:
+    """
+    Кеш складів і базової сили команд для симуляцій.
+
+    Рівень 1 — LRU у пам'яті процесу, рівень 2 — опційний кеш Django
+    (SIMULATOR_TEAM_CACHE_ALIAS), спільний для процесів. Промахи довантажуються
+    пакетом — двома запитами на будь-яку кількість команд. Записи скидаються
+    сигналами при зміні гравців чи команди (див. signals.py).
+
+    Зі спільним кешем кожна команда має там лічильник версії, як у TournamentCache:
+    invalidate() підвищує його, і запис рівня 1 використовується лише з поточною
+    версією, тож зміна в одному процесі видна всім. Без спільного кешу інші процеси
+    про скидання не дізнаються — записи рівня 1 живуть не довше SIMULATOR_TEAM_CACHE_TTL.
+    """
+
+    KEY_PREFIX = 'simulator:team-squad:'
+    VERSION_PREFIX = 'simulator:team-squad-version:'
+
+    def __init__(self, maxsize=None, alias=None, ttl=None):
+        self.maxsize = maxsize or getattr(settings, 'SIMULATOR_TEAM_CACHE_SIZE', 2048)
+        self.alias = alias if alias is not None else getattr(settings, 'SIMULATOR_TEAM_CACHE_ALIAS', None)
+        self.ttl = ttl if ttl is not None else getattr(settings, 'SIMULATOR_TEAM_CACHE_TTL', 60)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias] if self.alias else None
+
+    def _key(self, team_id, version):
+        return f"{self.KEY_PREFIX}{team_id}:v{version}"
+
+    def _version_key(self, team_id):
+        return f"{self.VERSION_PREFIX}{team_id}"
+
+    def _versions(self, backend, team_ids):
+        """Поточні версії команд у спільному кеші; відсутні ініціалізуються часом у наносекундах."""
+        keys = {team_id: self._version_key(team_id) for team_id in team_ids}
+        stored = backend.get_many(keys.values())
+        versions = {}
+        for team_id, key in keys.items():
+            version = stored.get(key)
+            if version is None:
+                backend.add(key, time.time_ns(), timeout=None)
+                version = backend.get(key)
+            versions[team_id] = version
+        return versions
+
+    def _local_get(self, team_id, version=None):
+        with self._lock:
+            item = self._entries.get(team_id)
+            if item is None:
+                return None
+            stored_at, stored_version, profile = item
+            if stored_version != version or (self.ttl is not None and time.monotonic() - stored_at > self.ttl):
+                del self._entries[team_id]
+                return None
+            self._entries.move_to_end(team_id)
+            return profile
+
+    def _local_set(self, team_id, profile, version=None):
+        with self._lock:
+            self._entries[team_id] = (time.monotonic(), version, profile)
+            self._entries.move_to_end(team_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _load(team_ids):
+        squads = defaultdict(list)
+        for player_id, team_id in Player.objects.filter(team_id__in=team_ids).order_by('name', 'id').values_list('id', 'team_id'):
+            squads[str(team_id)].append(str(player_id))
+        profiles = {}
+        for team_id, name in Team.objects.filter(id__in=team_ids).values_list('id', 'name'):
+            squad = squads[str(team_id)]
+            base, bonus = team_base_strength(len(squad), name)
+            profiles[str(team_id)] = {'name': name, 'squad': squad, 'base': base, 'bonus': bonus}
+        return profiles
+
+    def get_many(self, team_ids):
+        """Повертає {str(team_id): {'name', 'squad', 'base', 'bonus'}}."""
+        team_ids = {str(team_id) for team_id in team_ids if team_id}
+        backend = self.backend
+        versions = self._versions(backend, team_ids) if backend is not None and team_ids else {}
+        result = {}
+        for team_id in team_ids:
+            profile = self._local_get(team_id, versions.get(team_id))
+            if profile is not None:
+                result[team_id] = profile
+
+        missing = team_ids - result.keys()
+        if missing and backend is not None:
+            shared = backend.get_many([self._key(team_id, versions[team_id]) for team_id in missing])
+            for team_id in list(missing):
+                profile = shared.get(self._key(team_id, versions[team_id]))
+                if profile is not None:
+                    self._local_set(team_id, profile, versions[team_id])
+                    result[team_id] = profile
+                    missing.discard(team_id)
+
+        if missing:
+            loaded = self._load(missing)
+            for team_id, profile in loaded.items():
+                self._local_set(team_id, profile, versions.get(team_id))
+            if backend is not None and loaded:
+                backend.set_many({self._key(team_id, versions[team_id]): profile for team_id, profile in loaded.items()})
+            result.update(loaded)
+        return result
+
+    def get(self, team_id):
+        profile = self.get_many([team_id]).get(str(team_id))
+        if profile is None:
+            raise ValueError(f"Команду з ID {team_id} не знайдено.")
+        return profile
+
+    def preload(self, team_ids):
+        """Завантажує профілі команд наперед, щоб подальші симуляції не робили запитів."""
+        return self.get_many(team_ids)
+
+    def invalidate(self, *team_ids):
+        team_ids = {str(team_id) for team_id in team_ids if team_id}
+        if not team_ids:
+            return
+        with self._lock:
+            for team_id in team_ids:
+                self._entries.pop(team_id, None)
+        backend = self.backend
+        if backend is not None:
+            for team_id in team_ids:
+                try:
+                    backend.incr(self._version_key(team_id))
+                except ValueError:
+                    backend.set(self._version_key(team_id), time.time_ns(), timeout=None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+team_cache = TeamSquadCache()
@@ -0,0 +1,98 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+from ..models import Tournament
+
+_MISSING = object()
+
+
+class TournamentCache:
+    """
+    Версійний кеш даних сторінок і JSON-відповідей турніру.
+
+    Кожен турнір має лічильник версії в кеші Django (SIMULATOR_TOURNAMENT_CACHE_ALIAS);
+    ключі записів містять версію, тож будь-яка зміна турніру — матчі, команди, таблиця —
+    інвалідує всі його записи одним incr, без підбору TTL. Старі версії просто витісняються.
+    Відсутній лічильник ініціалізується часом у наносекундах, щоб після витіснення
+    не повернутися до версії, під якою ще лежать застарілі записи.
+
+    Якщо бекенд локальний для процесу (LocMemCache), інші воркери не бачать підвищення
+    версії. Тоді і лічильники, і записи живуть не довше SIMULATOR_TOURNAMENT_CACHE_LOCAL_TIMEOUT:
+    після цього воркер отримує нову версію (і новий ETag) і перечитує дані.
+    """
+
+    VERSION_PREFIX = 'simulator:tournament-version:'
+    KEY_PREFIX = 'simulator:tournament:'
+
+    def __init__(self, alias=None, timeout=_MISSING):
+        self.alias = alias or getattr(settings, 'SIMULATOR_TOURNAMENT_CACHE_ALIAS', 'default')
+        self.timeout = getattr(settings, 'SIMULATOR_TOURNAMENT_CACHE_TIMEOUT', None) if timeout is _MISSING else timeout
+        self.local_timeout = getattr(settings, 'SIMULATOR_TOURNAMENT_CACHE_LOCAL_TIMEOUT', 60)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def process_local(self):
+        return isinstance(self.backend, LocMemCache)
+
+    def _version_timeout(self):
+        return self.local_timeout if self.process_local else None
+
+    def _entry_timeout(self):
+        if self.process_local:
+            return min(self.timeout, self.local_timeout) if self.timeout is not None else self.local_timeout
+        return self.timeout
+
+    def _version_key(self, tournament_id):
+        return f"{self.VERSION_PREFIX}{tournament_id}"
+
+    def version(self, tournament_id):
+        key = self._version_key(tournament_id)
+        version = self.backend.get(key)
+        if version is None:
+            self.backend.add(key, time.time_ns(), timeout=self._version_timeout())
+            version = self.backend.get(key)
+        return version
+
+    def key(self, tournament_id, name):
+        return f"{self.KEY_PREFIX}{tournament_id}:v{self.version(tournament_id)}:{name}"
+
+    def get_or_set(self, tournament_id, name, builder):
+        """Повертає запис name поточної версії турніру; при промаху будує його builder()."""
+        key = self.key(tournament_id, name)
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            value = builder()
+            self.backend.set(key, value, timeout=self._entry_timeout())
+        return value
+
+    def _bump(self, tournament_ids):
+        for tournament_id in tournament_ids:
+            key = self._version_key(tournament_id)
+            try:
+                self.backend.incr(key)
+            except ValueError:
+                self.backend.set(key, time.time_ns(), timeout=self._version_timeout())
+
+    def invalidate(self, *tournament_ids):
+        """
+        Підвищує версії турнірів у момент запису. Пакетні зміни результатів (deferred_standings)
+        підвищують її ще раз після коміту, коли перерахована таблиця зберігається в Tournament.
+        """
+        self._bump({str(tournament_id) for tournament_id in tournament_ids if tournament_id})
+
+    def invalidate_for_teams(self, *team_ids):
+        team_ids = [team_id for team_id in team_ids if team_id]
+        if team_ids:
+            self.invalidate(*Tournament.teams.through.objects.filter(team_id__in=team_ids).values_list('tournament_id', flat=True))
+
+    def invalidate_for_event(self, event_id):
+        self.invalidate(*Tournament.objects.filter(event_id=event_id).values_list('id', flat=True))
+
+
+tournament_cache = TournamentCache()
@@ -1,6 +1,104 @@
+import logging
 from ..models import Tournament, Match, Team
+from django.db import transaction
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
+# Порядок тай-брейків: очки, різниця м'ячів, забиті м'ячі (усі за спаданням), далі назва команди.
+TIE_BREAK_FIELDS = ('points', 'gd', 'gf')
+
+
+# Поля матчу, від яких залежить його внесок у турнірну таблицю.
+RESULT_STATE_FIELDS = ('status', 'score1', 'score2', 'tournament_id', 'team1_id', 'team2_id')
+COUNTER_FIELDS = ('played', 'won', 'drawn', 'lost', 'gf', 'ga', 'points')
+
+
+def standings_sort_key(entry):
+    team_name = entry['team'].name if 'team' in entry else entry['team_name']
+    return tuple(-entry[field] for field in TIE_BREAK_FIELDS) + (team_name,)
+
+
+def match_result_state(match):
+    if match is None:
+        return None
+    return {field: getattr(match, field) for field in RESULT_STATE_FIELDS}
+
+
+def match_contribution(state):
+    """Внесок одного матчу в рядки таблиці: {team_id: {поле: значення}}. Порожній, якщо матч не враховується."""
+    if not state or state['status'] != Match.STATUS_FINISHED or not state['tournament_id']:
+        return {}
+    s1, s2 = state['score1'], state['score2']
+    if s1 is None or s2 is None:
+        return {}
+
+    rows = {}
+    for team_id, gf, ga in ((state['team1_id'], s1, s2), (state['team2_id'], s2, s1)):
+        won, drawn, lost = int(gf > ga), int(gf == ga), int(gf < ga)
+        rows[str(team_id)] = {
+            'played': 1, 'won': won, 'drawn': drawn, 'lost': lost,
+            'gf': gf, 'ga': ga, 'points': 3 * won + drawn,
+        }
+    return rows
+
+
+def standings_change(previous_state, current_state):
+    """Різниця внесків попереднього і поточного стану матчу, згрупована за турнірами."""
+    changes = defaultdict(lambda: defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0)))
+    for sign, state in ((-1, previous_state), (1, current_state)):
+        contribution = match_contribution(state)
+        for team_id, row in contribution.items():
+            for field, value in row.items():
+                changes[state['tournament_id']][team_id][field] += sign * value
+
+    return {
+        tournament_id: team_rows
+        for tournament_id, team_rows in changes.items()
+        if any(value for row in team_rows.values() for value in row.values())
+    }
+
+
+def apply_standings_change(previous_state, current_state):
+    """
+    Оновлює збережені таблиці лише на дельту одного матчу (включно з виправленням рахунку,
+    скасуванням результату чи перенесенням в інший турнір). Якщо збережена таблиця
+    відсутня або неузгоджена, виконується повний перерахунок TournamentManager.
+    Повертає ID турнірів, таблиці яких змінено.
+    """
+    changes = standings_change(previous_state, current_state)
+    for tournament_id, team_rows in changes.items():
+        with transaction.atomic():
+            try:
+                tournament = Tournament.objects.select_for_update().get(pk=tournament_id)
+            except Tournament.DoesNotExist:
+                continue
+            if not _apply_rows(tournament, team_rows):
+                TournamentManager(tournament_id=tournament_id).update_tournament_standings()
+    return list(changes)
+
+
+def _apply_rows(tournament, team_rows):
+    table = (tournament.standings or {}).get('table')
+    if not table:
+        return False
+    rows = {entry['team_id']: dict(entry) for entry in table}
+    if any(team_id not in rows for team_id in team_rows):
+        return False
+
+    for team_id, delta in team_rows.items():
+        row = rows[team_id]
+        for field, value in delta.items():
+            row[field] += value
+        row['gd'] = row['gf'] - row['ga']
+        if any(row[field] < 0 for field in COUNTER_FIELDS):
+            return False
+
+    tournament.standings = {"table": sorted(rows.values(), key=standings_sort_key)}
+    tournament.save(update_fields=['standings'])
+    return True
+
+
 class TournamentManager:
     def __init__(self, tournament_id):
         try:
@@ -54,13 +152,12 @@ class TournamentManager:
                 result_list.append(stats)
 
 
-        result_list.sort(key=lambda x: (-x['points'], -x['gd'], -x['gf'], x['team'].name))
+        result_list.sort(key=standings_sort_key)
 
         return result_list
 
-    def update_tournament_standings(self):
-        standings_data = self.calculate_standings()
-        json_standings = [
+    def serialize_standings(self, standings_data):
+        return [
             {
                 'team_id': str(entry['team'].id),
                 'team_name': entry['team'].name,
@@ -68,8 +165,11 @@ class TournamentManager:
             }
             for entry in standings_data
         ]
+
+    def update_tournament_standings(self):
+        json_standings = self.serialize_standings(self.calculate_standings())
         self.tournament.standings = {"table": json_standings}
         self.tournament.save(update_fields=['standings'])
-        print(f"Турнірна таблиця для '{self.tournament.name}' оновлена.")
+        logger.debug("Турнірна таблиця для '%s' оновлена.", self.tournament.name)
         return json_standings
 
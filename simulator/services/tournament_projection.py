@@ -0,0 +1,108 @@
+import numpy as np
+
+from ..models import Match
+from .monte_carlo import MonteCarloMatchEngine, SimulationRNG
+from .strength import get_strength_provider
+from .tournament_manager import TournamentManager, TIE_BREAK_FIELDS
+
+
+class TournamentProjection:
+    """
+    Монте-Карло прогноз підсумкової таблиці турніру.
+
+    Поточна таблиця береться з TournamentManager.calculate_standings() один раз,
+    далі всі заплановані матчі симулюються пакетами реплікацій у пам'яті, без
+    звернень до БД. Місця в кожній репліці визначаються тими ж тай-брейками,
+    що й у calculate_standings (TIE_BREAK_FIELDS, потім назва команди).
+    """
+
+    def __init__(self, tournament_id, replications=10000, engine: MonteCarloMatchEngine = None, chunk_size=5000,
+                 rng: SimulationRNG = None, strength_provider=None):
+        if replications < 1:
+            raise ValueError("Кількість реплікацій має бути додатною.")
+        self.manager = TournamentManager(tournament_id=tournament_id)
+        self.tournament = self.manager.tournament
+        self.replications = replications
+        self.rng = rng or SimulationRNG()
+        self.engine = engine or MonteCarloMatchEngine(rng=self.rng.for_tournament(self.tournament.id))
+        self.chunk_size = chunk_size
+        self.strength_provider = strength_provider or get_strength_provider()
+
+    def _load_state(self):
+        standings = self.manager.calculate_standings()
+        teams = [entry['team'] for entry in standings]
+        index = {team.id: i for i, team in enumerate(teams)}
+
+        base = {field: np.array([entry[field] for entry in standings], dtype=np.int64) for field in ('points', 'gf', 'ga')}
+
+        team_strengths = self.strength_provider.strengths(index)
+        strengths = np.array([team_strengths[str(team.id)][0] for team in teams], dtype=float)
+        bonuses = np.array([team_strengths[str(team.id)][1] for team in teams], dtype=float)
+
+        remaining = [
+            (index[m.team1_id], index[m.team2_id])
+            for m in self.tournament.matches.all()
+            if m.status == Match.STATUS_SCHEDULED and m.team1_id in index and m.team2_id in index
+        ]
+        idx1 = np.array([pair[0] for pair in remaining], dtype=np.int64)
+        idx2 = np.array([pair[1] for pair in remaining], dtype=np.int64)
+
+        return standings, teams, base, strengths, bonuses, idx1, idx2
+
+    def project(self):
+        standings, teams, base, strengths, bonuses, idx1, idx2 = self._load_state()
+        num_teams = len(teams)
+        if num_teams == 0:
+            return []
+
+        num_matches = len(idx1)
+        home = np.zeros((num_teams, num_matches))
+        away = np.zeros((num_teams, num_matches))
+        home[idx1, np.arange(num_matches)] = 1
+        away[idx2, np.arange(num_matches)] = 1
+
+        name_order = sorted(range(num_teams), key=lambda i: teams[i].name)
+        name_rank = np.empty(num_teams, dtype=np.int64)
+        name_rank[name_order] = np.arange(num_teams)
+
+        position_counts = np.zeros((num_teams, num_teams), dtype=np.int64)
+        points_total = np.zeros(num_teams)
+
+        done = 0
+        while done < self.replications:
+            chunk = min(self.chunk_size, self.replications - done)
+            score1, score2 = self.engine.simulate(
+                strengths[idx1], strengths[idx2], chunk,
+                bonus1=bonuses[idx1], bonus2=bonuses[idx2]
+            )
+            pts1 = 3 * (score1 > score2) + (score1 == score2)
+            pts2 = 3 * (score2 > score1) + (score1 == score2)
+
+            totals = {
+                'points': base['points'][:, None] + home @ pts1 + away @ pts2,
+                'gf': base['gf'][:, None] + home @ score1 + away @ score2,
+            }
+            ga = base['ga'][:, None] + home @ score2 + away @ score1
+            totals['gd'] = totals['gf'] - ga
+
+            keys = [np.broadcast_to(name_rank, (chunk, num_teams))]
+            keys += [-totals[field].T for field in reversed(TIE_BREAK_FIELDS)]
+            order = np.lexsort(keys, axis=-1)
+            np.add.at(position_counts, (order, np.arange(num_teams)[None, :]), 1)
+
+            points_total += totals['points'].sum(axis=1)
+            done += chunk
+
+        probabilities = position_counts / self.replications
+        return [
+            {
+                'team': team,
+                'team_id': str(team.id),
+                'team_name': team.name,
+                'current_points': standings[i]['points'],
+                'expected_points': float(points_total[i] / self.replications),
+                'win_probability': float(probabilities[i, 0]),
+                'position_probabilities': [float(p) for p in probabilities[i]],
+            }
+            for i, team in enumerate(teams)
+        ]
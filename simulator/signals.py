@@ -1,26 +1,131 @@
-from django.db.models.signals import post_save
+import logging
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Match, Tournament
-from .services.tournament_manager import TournamentManager
+from django.utils import timezone
+from .models import Event, Match, Player, PlayerStatistics, Team, Tournament
+from .services.tournament_manager import (
+    TournamentManager, RESULT_STATE_FIELDS, match_result_state, apply_standings_change, standings_change
+)
+from .services.standings_sync import is_deferred, mark_dirty
+from .services.team_cache import team_cache
+from .services.ratings import EloRatingSystem
+from .services.player_stats_updater import remove_player_match_stats
+from .services.tournament_cache import tournament_cache
+
+logger = logging.getLogger(__name__)
+
+@receiver(pre_save, sender=Match)
+def remember_previous_match_state(sender, instance: Match, raw=False, **kwargs):
+    instance._previous_result_state = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_result_state = Match.objects.filter(pk=instance.pk).values(*RESULT_STATE_FIELDS).first()
 
 @receiver(post_save, sender=Match)
-def process_match_finish(sender, instance: Match, created, **kwargs):
-    if instance.status == Match.STATUS_FINISHED and instance.score1 is not None and instance.score2 is not None:
-        print(f"Сигнал post_save для Match: Матч {instance.id} завершено/оновлено.")
+def process_match_finish(sender, instance: Match, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_state = getattr(instance, '_previous_result_state', None)
+    instance._previous_result_state = None
+    tournament_cache.invalidate(instance.tournament_id, (previous_state or {}).get('tournament_id'))
+
+    try:
+        EloRatingSystem().sync_match(previous_state, instance)
+    except Exception as e:
+        logger.exception("Сигнал: Помилка оновлення рейтингів для матчу %s: %s", instance.id, e)
+    if previous_state and previous_state['status'] == Match.STATUS_FINISHED and instance.status != Match.STATUS_FINISHED:
+        remove_player_match_stats([instance.id])
+
+    if is_deferred():
+        mark_dirty(*standings_change(previous_state, match_result_state(instance)))
+        return
 
-        if instance.tournament:
+    try:
+        changed_tournaments = apply_standings_change(previous_state, match_result_state(instance))
+    except Exception as e:
+        logger.exception("Сигнал: Неочікувана помилка при оновленні таблиці для матчу %s: %s", instance.id, e)
+        return
+
+    if changed_tournaments:
+        logger.debug("Сигнал post_save для Match: таблиці турнірів %s оновлено інкрементально.", changed_tournaments)
+
+    if instance.status == Match.STATUS_FINISHED and instance.score1 is not None and instance.score2 is not None:
+        if instance.tournament_id:
             tournament = instance.tournament
-            print(f"Оновлення турнірної таблиці для турніру ID: {tournament.id}")
-            try:
-                manager = TournamentManager(tournament_id=tournament.id)
-                manager.update_tournament_standings()
-
-                if tournament.status == Tournament.STATUS_ONGOING:
-                    tournament.check_and_finish()
-
-            except ValueError as e:
-                 print(f"Сигнал: Помилка обробки турніру {tournament.id}: {e}")
-            except Exception as e:
-                 print(f"Сигнал: Неочікувана помилка при обробці турніру: {e}")
+            if tournament.status == Tournament.STATUS_ONGOING:
+                tournament.check_and_finish()
         else:
-            print(f"Сигнал: Матч {instance.id} не належить до жодного турніру.")
\ No newline at end of file
+            logger.debug("Сигнал: Матч %s не належить до жодного турніру.", instance.id)
+
+@receiver(pre_delete, sender=Match)
+def revert_match_ratings(sender, instance: Match, **kwargs):
+    EloRatingSystem().revert_matches([instance.id])
+    remove_player_match_stats([instance.id])
+
+@receiver(post_delete, sender=Match)
+def process_match_delete(sender, instance: Match, **kwargs):
+    if instance.tournament_id:
+        Tournament.objects.filter(pk=instance.tournament_id).update(updated_at=timezone.now())
+    tournament_cache.invalidate(instance.tournament_id)
+    if is_deferred():
+        mark_dirty(*standings_change(match_result_state(instance), None))
+        return
+    try:
+        apply_standings_change(match_result_state(instance), None)
+    except Exception as e:
+        logger.exception("Сигнал: Помилка оновлення таблиці після видалення матчу %s: %s", instance.id, e)
+
+@receiver(m2m_changed, sender=Tournament.teams.through)
+def process_tournament_teams_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    tournament_ids = (pk_set or []) if reverse else [instance.pk]
+    Tournament.objects.filter(pk__in=tournament_ids).update(updated_at=timezone.now())
+    tournament_cache.invalidate(*tournament_ids)
+    if is_deferred():
+        mark_dirty(*tournament_ids)
+        return
+    for tournament_id in tournament_ids:
+        try:
+            TournamentManager(tournament_id=tournament_id).update_tournament_standings()
+        except ValueError as e:
+            logger.error("Сигнал: Помилка обробки турніру %s: %s", tournament_id, e)
+
+@receiver(pre_save, sender=Player)
+def remember_previous_player_team(sender, instance: Player, raw=False, **kwargs):
+    instance._previous_team_id = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_team_id = Player.objects.filter(pk=instance.pk).values_list('team_id', flat=True).first()
+
+@receiver(post_save, sender=Player)
+def create_player_statistics(sender, instance: Player, created=False, raw=False, **kwargs):
+    # Рядок статистики є в кожного гравця: список гравців сортує й гортає за колонками PlayerStatistics.
+    if created and not raw:
+        PlayerStatistics.objects.get_or_create(player_id=instance.pk)
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_player_team_cache(sender, instance: Player, **kwargs):
+    team_cache.invalidate(instance.team_id, getattr(instance, '_previous_team_id', None))
+    tournament_cache.invalidate_for_teams(instance.team_id, getattr(instance, '_previous_team_id', None))
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def invalidate_team_cache(sender, instance: Team, **kwargs):
+    team_cache.invalidate(instance.pk)
+    tournament_cache.invalidate_for_teams(instance.pk)
+
+@receiver(pre_delete, sender=Team)
+def invalidate_team_tournaments_cache(sender, instance: Team, **kwargs):
+    tournament_cache.invalidate_for_teams(instance.pk)
+
+@receiver(post_save, sender=Tournament)
+@receiver(post_delete, sender=Tournament)
+def invalidate_tournament_cache(sender, instance: Tournament, **kwargs):
+    tournament_cache.invalidate(instance.pk)
+
+@receiver(post_save, sender=Event)
+def invalidate_event_tournaments_cache(sender, instance: Event, raw=False, **kwargs):
+    if not raw:
+        tournament_cache.invalidate_for_event(instance.pk)
\ No newline at end of file
@@ -1,19 +1,48 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.models.functions import Coalesce
 from datetime import timedelta, date
+import time
 import uuid
+from collections import Counter, defaultdict
 import re
-
-from .models import Event, Team, Player, PlayerStatistics, Tournament, Match, Recommendation
+import json
+import logging
+import os
+import tempfile
+import numpy as np
+from unittest import mock
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .models import Event, Team, Player, PlayerStatistics, PlayerMatchStat, CommandJournalEntry, Tournament, Match, Recommendation, TeamRating, TeamRatingHistory
 from .forms import EventForm, TeamForm, PlayerForm, MatchResultForm, TournamentForm
 from .services.tournament_manager import TournamentManager
-from .services.schedule_generator import create_schedule_generator, RoundRobinStrategy, KnockoutStrategy
+from .services.tournament_projection import TournamentProjection
+from .services.knockout_bracket import KnockoutProjection, advance_bracket, seed_positions
+from .services.schedule_generator import create_schedule_generator, ScheduleGenerator, RoundRobinStrategy, KnockoutStrategy, ConstrainedScheduleStrategy, SwissStrategy
 from .services.report_generator import TournamentResultsReport, PlayerStatisticsReport
 from .services.recommendation_system import RecommendationSystem
-from .services.match_simulator import SimpleMatchSimulator
-from .services.commands import RecordMatchResultCommand, SimulateMatchResultCommand
+from .services.match_simulator import SimpleMatchSimulator, MonteCarloMatchEngine, PoissonMatchSimulator
+from .services.poisson_model import PoissonGoalModel, get_fitted_poisson_model, results_stamp
+from .services.commands import RecordMatchResultCommand, SimulateMatchResultCommand, BatchCommand, BatchRecordResultsCommand, BatchSimulateResultsCommand
+from .services.command_journal import CommandJournal
+from .services.tournament_cache import TournamentCache, tournament_cache
+from .checks import check_tournament_cache_backend
+from .services.parallel_simulation import ParallelMatchSimulator
+from .log_formatting import JsonFormatter
+from .middleware import QueryRecorder, query_metrics
+from .pagination import keyset_paginate
+from .services.monte_carlo import SimulationRNG
+from .services.player_stats_updater import apply_player_stat_deltas, update_player_stats_from_match_data, aggregate_player_stats, rebuild_player_statistics
+from .services.standings_sync import deferred_standings
+from .services.team_cache import TeamSquadCache, team_cache
+from .services.strength import EloStrengthProvider, get_strength_provider
 
 def create_team(name="Test Team", coach="Coach"):
     return Team.objects.create(name=name, coach=coach)
@@ -202,6 +231,7 @@ class ServiceLogicTests(TestCase):
         cls.match_ac = create_match(cls.team_a, cls.team_c, cls.tournament, days_offset=-1, status=Match.STATUS_FINISHED, score1=1, score2=1)
 
     def setUp(self):
+         team_cache.clear()
          self.match_bc_scheduled = create_match(self.team_b, self.team_c, self.tournament, days_offset=1, status=Match.STATUS_SCHEDULED)
 
 
@@ -239,6 +269,136 @@ class ServiceLogicTests(TestCase):
         schedule = generator.generate_schedule(teams, start_date)
         self.assertEqual(len(schedule), 2)
 
+    def test_round_robin_circle_method_rounds(self):
+        teams = [create_team(name=f"Circle Team {i}") for i in range(6)]
+        schedule = RoundRobinStrategy().generate(teams, date(2025, 7, 1))
+        self.assertEqual(len(schedule), 15)
+        rounds = {}
+        for fixture in schedule:
+            rounds.setdefault(fixture['round'], []).append(fixture)
+        self.assertEqual(len(rounds), 5)
+        for fixtures in rounds.values():
+            playing = [f['team1'] for f in fixtures] + [f['team2'] for f in fixtures]
+            self.assertEqual(len(playing), len(set(playing)))
+        pairs = {frozenset((f['team1'], f['team2'])) for f in schedule}
+        self.assertEqual(len(pairs), 15)
+
+    def test_double_round_robin_swaps_home_and_away(self):
+        teams = [self.team_a, self.team_b, self.team_c]
+        schedule = create_schedule_generator('double_round_robin').generate_schedule(teams, date(2025, 7, 1))
+        self.assertEqual(len(schedule), 6)
+        ordered_pairs = {(f['team1'], f['team2']) for f in schedule}
+        self.assertEqual(len(ordered_pairs), 6)
+        self.assertEqual(max(f['round'] for f in schedule), 6)
+
+    def test_create_matches_bulk_insert_is_idempotent(self):
+        new_tournament = create_tournament(name="Bulk Gen Test")
+        teams = [create_team(name=f"Bulk Gen Team {i}") for i in range(8)]
+        new_tournament.teams.add(*teams)
+        generator = create_schedule_generator('round_robin')
+        with CaptureQueriesContext(connection) as ctx:
+            created = generator.create_matches_for_tournament(new_tournament, date(2025, 7, 10))
+        self.assertEqual(len(created), 28)
+        self.assertLessEqual(len(ctx.captured_queries), 5)
+        self.assertEqual(generator.create_matches_for_tournament(new_tournament, date(2025, 7, 10)), [])
+        self.assertEqual(Match.objects.filter(tournament=new_tournament).exclude(round_number=None).count(), 28)
+
+    def test_constrained_schedule_packs_large_event_within_budget(self):
+        teams = [create_team(name=f"Packed Team {i:02d}") for i in range(46)]
+        strategy = ConstrainedScheduleStrategy(matches_per_venue_per_day=12, min_rest_days=1, time_budget=5.0)
+        schedule = strategy.generate(teams, date(2025, 7, 1), venues=['Арена 1', 'Арена 2'])
+
+        self.assertEqual(len(schedule), 1035)
+        self.assertTrue(strategy.last_report['feasible'])
+        self.assertLess(strategy.last_report['elapsed'], 5.0)
+        venue_load = Counter((timezone.localdate(f['match_datetime']), f['venue']) for f in schedule)
+        self.assertLessEqual(max(venue_load.values()), 12)
+        team_days = defaultdict(list)
+        for fixture in schedule:
+            team_days[fixture['team1']].append(timezone.localdate(fixture['match_datetime']))
+            team_days[fixture['team2']].append(timezone.localdate(fixture['match_datetime']))
+        for days in team_days.values():
+            days.sort()
+            self.assertTrue(all((b - a).days >= 2 for a, b in zip(days, days[1:])))
+
+    def test_constrained_schedule_reports_infeasible_window(self):
+        event = create_event(name="Tight Event")
+        new_tournament = create_tournament(name="Tight Cup", event=event)
+        new_tournament.teams.add(*[create_team(name=f"Tight Team {i}") for i in range(8)])
+        generator = create_schedule_generator('constrained')
+        created = generator.create_matches_for_tournament(new_tournament, event.start_date)
+
+        self.assertEqual(len(created), 28)
+        self.assertFalse(generator.last_report['feasible'])
+        self.assertTrue(generator.last_report['violations'])
+        self.assertTrue(all(event.start_date <= timezone.localdate(m.match_datetime) <= event.end_date for m in created))
+        self.assertEqual({m.venue for m in created}, {"Test Location"})
+
+    def test_constrained_schedule_honours_base_strategy_and_budget(self):
+        teams = [create_team(name=f"Bounded Team {i}") for i in range(8)]
+        strategy = ConstrainedScheduleStrategy(time_budget=60.0)
+        schedule = strategy.generate(teams, date(2025, 7, 1), matches_per_day=1, time_per_match=timedelta(hours=2))
+        self.assertLessEqual(max(Counter(timezone.localdate(f['match_datetime']) for f in schedule).values()), 1)
+        with self.assertRaises(TypeError):
+            strategy.generate(teams, date(2025, 7, 1), unknown_option=True)
+
+        strategy = ConstrainedScheduleStrategy(time_budget=0)
+        self.assertEqual(len(strategy.generate(teams, date(2025, 7, 1))), 28)
+        self.assertTrue(strategy.last_report['timed_out'])
+
+        cup = create_tournament(name="Constrained Knockout Cup", event=create_event(name="Knockout Window"))
+        cup.teams.add(*teams)
+        generator = ScheduleGenerator(ConstrainedScheduleStrategy(base_strategy=KnockoutStrategy()))
+        created = generator.create_matches_for_tournament(cup, cup.event.start_date)
+        cup.refresh_from_db()
+        self.assertEqual(len(created), 4)
+        self.assertEqual(cup.bracket['first_round'], 1)
+        self.assertEqual({m.round_number for m in created}, {1})
+
+    def test_swiss_pairs_large_open_without_rematches(self):
+        teams = [create_team(name=f"Swiss Team {i:03d}") for i in range(256)]
+        strategy = SwissStrategy()
+        rng = np.random.default_rng(5)
+        points = {str(team.id): 0 for team in teams}
+        played_pairs = []
+        started = time.perf_counter()
+        for round_number in range(1, 9):
+            standings = [{'team_id': team_id, 'team_name': team_id, 'points': p, 'gd': 0, 'gf': 0, 'played': round_number - 1} for team_id, p in points.items()]
+            schedule = strategy.generate(teams, date(2025, 7, 1), standings=standings, played_pairs=played_pairs, round_number=round_number)
+            self.assertEqual(len(schedule), 128)
+            for fixture in schedule:
+                team1_id, team2_id = str(fixture['team1'].id), str(fixture['team2'].id)
+                self.assertLessEqual(abs(points[team1_id] - points[team2_id]), 6)
+                played_pairs.append((team1_id, team2_id))
+                points[team1_id if rng.random() < 0.5 else team2_id] += 3
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len({frozenset(pair) for pair in played_pairs}), len(played_pairs))
+
+    def test_swiss_tournament_generates_next_round_from_standings(self):
+        new_tournament = create_tournament(name="Swiss Cup")
+        swiss_teams = [create_team(name=f"Swiss Cup Team {i}") for i in range(4)]
+        new_tournament.teams.add(*swiss_teams)
+        generator = create_schedule_generator('swiss')
+        first_round = generator.create_matches_for_tournament(new_tournament, date(2025, 7, 1))
+        self.assertEqual(len(first_round), 2)
+        new_tournament.refresh_from_db()
+        self.assertEqual(new_tournament.rounds_planned, 2)
+        with self.assertRaises(ValueError):
+            generator.create_matches_for_tournament(new_tournament, date(2025, 7, 2))
+
+        new_tournament.status = Tournament.STATUS_ONGOING
+        new_tournament.save(update_fields=['status'])
+        winners = []
+        for match in first_round:
+            match.set_result(2, 0)
+            winners.append(match.team1)
+        new_tournament.refresh_from_db()
+        self.assertEqual(new_tournament.status, Tournament.STATUS_ONGOING)
+
+        second_round = generator.create_matches_for_tournament(new_tournament, date(2025, 7, 2))
+        self.assertEqual([m.round_number for m in second_round], [2, 2])
+        self.assertEqual({second_round[0].team1, second_round[0].team2}, set(winners))
+
     def test_create_matches_for_tournament(self):
         generator = create_schedule_generator('round_robin')
         start_date = date(2025, 7, 10)
@@ -295,6 +455,185 @@ class ServiceLogicTests(TestCase):
         self.assertIsInstance(result[0], int)
         self.assertIsInstance(result[1], int)
 
+    def test_monte_carlo_engine_batch_shape_and_bounds(self):
+        engine = MonteCarloMatchEngine(rng=np.random.default_rng(42))
+        score1, score2 = engine.simulate([150, 10, 0], [10, 150, 0], replications=500, bonus1=[1, 2, 3], bonus2=[0, 0, 0])
+        self.assertEqual(score1.shape, (3, 500))
+        self.assertEqual(score2.shape, (3, 500))
+        self.assertTrue(((score1 >= 0) & (score1 <= engine.max_goals)).all())
+        self.assertGreater(score1[0].mean(), score2[0].mean())
+        self.assertLess(score1[1].mean(), score2[1].mean())
+
+    def test_monte_carlo_engine_matches_step_model(self):
+        engine = MonteCarloMatchEngine(noise_range=None, rng=np.random.default_rng(7))
+        score1, _ = engine.simulate([20], [100], replications=20000)
+        p1 = 20 / (20 + 100 + 1) * 0.5
+        self.assertAlmostEqual(score1.mean(), engine.simulation_steps * p1, delta=0.05)
+
+    def test_tournament_projection_probabilities(self):
+        engine = MonteCarloMatchEngine(rng=np.random.default_rng(1))
+        projection = TournamentProjection(self.tournament.id, replications=2000, engine=engine)
+        rows = projection.project()
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['team'], self.team_a)
+        for entry in rows:
+            self.assertAlmostEqual(sum(entry['position_probabilities']), 1.0)
+        for position in range(3):
+            self.assertAlmostEqual(sum(entry['position_probabilities'][position] for entry in rows), 1.0)
+        self.assertGreater(rows[0]['win_probability'], 0.5)
+        self.assertGreaterEqual(rows[0]['expected_points'], 4)
+
+    def test_parallel_simulator_is_deterministic_across_worker_counts(self):
+        matches = [self.match_bc_scheduled]
+        serial = ParallelMatchSimulator(workers=1, seed=123, chunk_size=1)
+        payloads, _ = serial._build_payloads(matches * 3)
+        pooled = ParallelMatchSimulator(workers=2, seed=123, chunk_size=1)
+        self.assertEqual(serial._run(payloads), pooled._run(payloads))
+
+    def test_parallel_simulator_writes_results_in_batch(self):
+        event = create_event(name="Parallel Event")
+        self.tournament.event = event
+        self.tournament.save(update_fields=['event'])
+        games_before = self.player_b1.statistics.games_played
+        for bad_id in (str(uuid.uuid4()), 'not-a-uuid'):
+            with self.assertRaises(CommandError):
+                call_command('simulate_event', bad_id, stdout=mock.MagicMock())
+
+        out = mock.MagicMock()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('simulate_event', str(event.id), '--workers', '1', '--seed', '5', stdout=out)
+
+        self.assertIn('Simulated 1 matches', out.write.call_args[0][0])
+        self.match_bc_scheduled.refresh_from_db()
+        self.assertEqual(self.match_bc_scheduled.status, Match.STATUS_FINISHED)
+        self.assertEqual(self.match_bc_scheduled.simulation_seed, '5')
+        self.player_b1.statistics.refresh_from_db()
+        self.assertEqual(self.player_b1.statistics.games_played, games_before + 1)
+        self.tournament.refresh_from_db()
+        self.assertEqual(sum(row['played'] for row in self.tournament.standings['table']), 6)
+
+    def test_seeded_simulation_is_reproducible_and_recorded(self):
+        first = SimpleMatchSimulator(self.match_bc_scheduled, rng=SimulationRNG(2024)).simulate()
+        second = SimpleMatchSimulator(self.match_bc_scheduled, rng=SimulationRNG(2024)).simulate()
+        self.assertEqual(first, second)
+
+        payloads, _ = ParallelMatchSimulator(seed=2024)._build_payloads([self.match_bc_scheduled])
+        batch_result = ParallelMatchSimulator(workers=1, seed=2024)._run(payloads)[0]
+        self.assertEqual(first, batch_result[1:3])
+
+        command = SimulateMatchResultCommand(match_id=self.match_bc_scheduled.id, rng=SimulationRNG(2024))
+        command.execute()
+        self.match_bc_scheduled.refresh_from_db()
+        self.assertEqual(self.match_bc_scheduled.simulation_seed, '2024')
+        self.assertEqual((self.match_bc_scheduled.score1, self.match_bc_scheduled.score2), first)
+
+    def test_knockout_strategy_seeded_order(self):
+        teams = [self.team_a, self.team_b, self.team_c, create_team(name="Service Team D")]
+        strategy = KnockoutStrategy()
+        first = strategy.generate(list(teams), date(2025, 7, 1), rng=SimulationRNG(9).for_tournament(self.tournament.id))
+        second = strategy.generate(list(teams), date(2025, 7, 1), rng=SimulationRNG(9).for_tournament(self.tournament.id))
+        self.assertEqual([(m['team1'], m['team2']) for m in first], [(m['team1'], m['team2']) for m in second])
+
+    def test_knockout_bracket_gives_byes_to_top_seeds(self):
+        self.assertEqual(seed_positions(8), [1, 8, 4, 5, 2, 7, 3, 6])
+        new_tournament = create_tournament(name="Bracket Bye Test")
+        new_tournament.teams.add(self.team_a, self.team_b, self.team_c)
+        created = create_schedule_generator('knockout_rated').create_matches_for_tournament(new_tournament, date(2025, 7, 1))
+        self.assertEqual([(m.team1, m.team2) for m in created], [(self.team_b, self.team_c)])
+
+        new_tournament.refresh_from_db()
+        first_round = new_tournament.bracket['rounds'][0]
+        self.assertEqual(new_tournament.bracket['size'], 4)
+        self.assertEqual(first_round[0], {'team1': str(self.team_a.id), 'team2': None, 'match_id': None, 'winner': str(self.team_a.id)})
+        self.assertEqual(first_round[1]['match_id'], str(created[0].id))
+
+    def test_advance_bracket_until_champion(self):
+        new_tournament = create_tournament(name="Bracket Advance Test")
+        new_tournament.teams.add(self.team_a, self.team_b, self.team_c)
+        first_match = create_schedule_generator('knockout_rated').create_matches_for_tournament(new_tournament, date(2025, 7, 1))[0]
+        new_tournament.status = Tournament.STATUS_ONGOING
+        new_tournament.save(update_fields=['status'])
+
+        first_match.set_result(2, 1)
+        final = advance_bracket(new_tournament)
+        self.assertEqual(len(final), 1)
+        self.assertEqual((final[0].team1, final[0].team2, final[0].round_number), (self.team_a, self.team_b, 2))
+        with self.assertRaises(ValueError):
+            advance_bracket(new_tournament)
+
+        rows = {row['team_id']: row for row in KnockoutProjection(new_tournament.id, replications=500, rng=SimulationRNG(3)).project()}
+        self.assertAlmostEqual(sum(row['champion_probability'] for row in rows.values()), 1.0)
+        self.assertEqual(rows[str(self.team_c.id)]['round_probabilities'], [1.0, 0.0])
+        self.assertEqual(rows[str(self.team_a.id)]['round_probabilities'], [1.0, 1.0])
+
+        Match.objects.get(pk=final[0].pk).set_result(0, 1)
+        new_tournament.refresh_from_db()
+        self.assertEqual(new_tournament.status, Tournament.STATUS_ONGOING)
+        self.assertEqual(advance_bracket(new_tournament), [])
+        new_tournament.refresh_from_db()
+        self.assertEqual(new_tournament.status, Tournament.STATUS_FINISHED)
+        self.assertEqual(new_tournament.winner, self.team_b)
+
+    def test_knockout_after_group_stage_repeats_group_pairs(self):
+        new_tournament = create_tournament(name="Group Then Knockout")
+        new_tournament.teams.add(self.team_a, self.team_b, self.team_c, create_team(name="Group Team D"))
+        group = create_schedule_generator('round_robin').create_matches_for_tournament(new_tournament, date(2025, 7, 1))
+        self.assertEqual(len(group), 6)
+        for match in group:
+            Match.objects.get(pk=match.pk).set_result(1, 0)
+
+        first_round = create_schedule_generator('knockout_rated').create_matches_for_tournament(new_tournament, date(2025, 8, 1))
+        self.assertEqual([match.round_number for match in first_round], [4, 4])
+        new_tournament.refresh_from_db()
+        self.assertEqual(new_tournament.bracket['first_round'], 4)
+        self.assertEqual(
+            {entry['match_id'] for entry in new_tournament.bracket['rounds'][0]},
+            {str(match.id) for match in first_round},
+        )
+        with self.assertRaises(ValueError):
+            create_schedule_generator('knockout').create_matches_for_tournament(new_tournament, date(2025, 8, 1))
+
+        for match in first_round:
+            Match.objects.get(pk=match.pk).set_result(2, 0)
+        final = advance_bracket(new_tournament)
+        self.assertEqual(len(final), 1)
+        self.assertEqual(final[0].round_number, 5)
+        self.assertTrue(Match.objects.filter(tournament=new_tournament, team1=final[0].team1, team2=final[0].team2, round_number__lt=4).exists()
+                        or Match.objects.filter(tournament=new_tournament, team1=final[0].team2, team2=final[0].team1, round_number__lt=4).exists())
+
+    def test_team_cache_avoids_queries_on_repeat_simulation(self):
+        SimpleMatchSimulator(self.match_bc_scheduled, rng=SimulationRNG(1)).simulate()
+        with self.assertNumQueries(0):
+            SimpleMatchSimulator(self.match_bc_scheduled, rng=SimulationRNG(1)).simulate()
+            self.assertEqual(SimpleMatchSimulator(self.match_bc_scheduled)._squad_ids(self.team_b), [str(self.player_b1.id)])
+
+    def test_team_cache_invalidated_on_player_changes(self):
+        self.assertEqual(team_cache.get(self.team_c.id)['squad'], [])
+        player = create_player(self.team_c, name="Cache Player")
+        self.assertEqual(team_cache.get(self.team_c.id)['squad'], [str(player.id)])
+        self.assertEqual(team_cache.get(self.team_c.id)['base'], 10)
+
+        team_cache.get(self.team_b.id)
+        player.team = self.team_b
+        player.save()
+        self.assertEqual(team_cache.get(self.team_c.id)['squad'], [])
+        self.assertIn(str(player.id), team_cache.get(self.team_b.id)['squad'])
+
+        player.delete()
+        self.assertNotIn(str(player.id), team_cache.get(self.team_b.id)['squad'])
+
+    def test_team_cache_invalidation_reaches_other_processes(self):
+        # Два екземпляри зі спільним alias — як два воркери з власними LRU.
+        worker1, worker2 = TeamSquadCache(alias='default'), TeamSquadCache(alias='default')
+        self.assertEqual(worker1.get(self.team_c.id)['squad'], [])
+        with self.assertNumQueries(0):
+            self.assertEqual(worker2.get(self.team_c.id)['squad'], [])
+
+        player = Player.objects.create(team=self.team_c, name="Shared Cache Player", age=20, position="Forward")
+        worker2.invalidate(self.team_c.id)
+        self.assertEqual(worker1.get(self.team_c.id)['squad'], [str(player.id)])
+
     def test_command_record_result_execute_and_undo(self):
         match_to_record = create_match(self.team_a, self.team_b, status=Match.STATUS_SCHEDULED, tournament=self.tournament, days_offset=5)
         initial_status = match_to_record.status
@@ -340,6 +679,729 @@ class ServiceLogicTests(TestCase):
         self.assertEqual(match_to_sim.status, initial_status)
         self.assertEqual(match_to_sim.score1, initial_score1)
 
+    def test_poisson_model_fit_and_cached_score_tables(self):
+        rng = np.random.default_rng(7)
+        results = []
+        for _ in range(200):
+            results.append(('strong', 'weak', int(rng.poisson(2.5)), int(rng.poisson(0.6))))
+            results.append(('weak', 'strong', int(rng.poisson(0.8)), int(rng.poisson(2.0))))
+        model = PoissonGoalModel().fit(results)
+        self.assertGreater(model.attack['strong'], 1)
+        self.assertLess(model.attack['weak'], 1)
+
+        matrix = model.score_matrix('strong', 'weak')
+        self.assertIs(model.score_matrix('strong', 'weak'), matrix)
+        win, draw, loss = model.outcome_probabilities('strong', 'weak')
+        self.assertAlmostEqual(win + draw + loss, 1.0)
+        self.assertGreater(win, loss)
+
+        score1, score2 = model.sample('strong', 'weak', np.random.default_rng(1), size=20000)
+        self.assertAlmostEqual((score1 > score2).mean(), win, delta=0.02)
+        self.assertAlmostEqual(score1.mean(), model.expected_goals('strong', 'weak')[0], delta=0.1)
+
+    def test_fitted_poisson_model_follows_results_written_elsewhere(self):
+        model = get_fitted_poisson_model()
+        with self.assertNumQueries(1):
+            self.assertIs(get_fitted_poisson_model(), model)
+
+        # Запис без сигналів, як з іншого воркера: модель процесу має це помітити.
+        Match.objects.filter(pk=self.match_bc_scheduled.pk).update(
+            status=Match.STATUS_FINISHED, score1=4, score2=0, updated_at=timezone.now()
+        )
+        refitted = get_fitted_poisson_model()
+        self.assertIsNot(refitted, model)
+        self.assertEqual(refitted.matches_fitted, model.matches_fitted + 1)
+
+    def test_command_simulate_with_poisson_model(self):
+        simulator = PoissonMatchSimulator(self.match_bc_scheduled, rng=SimulationRNG(3))
+        self.assertAlmostEqual(sum(simulator.outcome_probabilities()), 1.0)
+        with self.assertRaises(ValueError):
+            SimulateMatchResultCommand(match_id=self.match_bc_scheduled.id, simulator='unknown')
+
+        command = SimulateMatchResultCommand(match_id=self.match_bc_scheduled.id, rng=SimulationRNG(3), simulator='poisson')
+        self.assertTrue(command.execute())
+        self.match_bc_scheduled.refresh_from_db()
+        self.assertEqual(self.match_bc_scheduled.status, Match.STATUS_FINISHED)
+        self.assertIsNotNone(self.match_bc_scheduled.score1)
+
+    def test_command_journal_undo_redo_across_instances(self):
+        entry = CommandJournal().execute(SimulateMatchResultCommand(self.match_bc_scheduled.id, rng=SimulationRNG(5)))
+        self.match_bc_scheduled.refresh_from_db()
+        result = (self.match_bc_scheduled.score1, self.match_bc_scheduled.score2)
+        stats_after = PlayerStatistics.objects.get(player=self.player_b1)
+        stats_after = (stats_after.games_played, stats_after.goals, stats_after.assists)
+
+        CommandJournal().undo(match_id=self.match_bc_scheduled.id)
+        self.match_bc_scheduled.refresh_from_db()
+        self.assertEqual(self.match_bc_scheduled.status, Match.STATUS_SCHEDULED)
+        self.assertEqual(PlayerStatistics.objects.get(player=self.player_b1).games_played, 0)
+        with self.assertRaises(ValueError):
+            CommandJournal().undo(match_id=self.match_bc_scheduled.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CommandJournal().redo(entry.id)
+        self.match_bc_scheduled.refresh_from_db()
+        self.assertEqual((self.match_bc_scheduled.score1, self.match_bc_scheduled.score2), result)
+        stats = PlayerStatistics.objects.get(player=self.player_b1)
+        self.assertEqual((stats.games_played, stats.goals, stats.assists), stats_after)
+        self.assertEqual(
+            list(CommandJournalEntry.objects.filter(match=self.match_bc_scheduled).values_list('action', flat=True)),
+            [CommandJournalEntry.ACTION_EXECUTE, CommandJournalEntry.ACTION_UNDO, CommandJournalEntry.ACTION_REDO]
+        )
+
+    def test_command_journal_replay_recomputes_each_tournament_once(self):
+        other = create_tournament(name="Replay Cup")
+        other.teams.add(self.team_a, self.team_c)
+        other_match = create_match(self.team_c, self.team_a, other, days_offset=3)
+        journal = CommandJournal()
+        journal.execute(RecordMatchResultCommand(self.match_bc_scheduled.id, 2, 1, scorers1_ids=[str(self.player_b1.id)] * 2))
+        journal.execute(RecordMatchResultCommand(other_match.id, 0, 4, scorers2_ids=[str(self.player_a1.id)]))
+        journal.execute(RecordMatchResultCommand(other_match.id, 0, 2))
+
+        Match.objects.filter(pk__in=[self.match_bc_scheduled.pk, other_match.pk]).update(status=Match.STATUS_SCHEDULED, score1=None, score2=None)
+        PlayerMatchStat.objects.all().delete()
+        PlayerStatistics.objects.update(games_played=0, goals=0, assists=0)
+
+        with mock.patch.object(TournamentManager, 'update_tournament_standings', autospec=True) as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                replayed = journal.replay()
+        self.assertEqual(replayed, {self.tournament.id: 1, other.id: 1})
+        self.assertEqual(update.call_count, 2)
+        other_match.refresh_from_db()
+        self.assertEqual((other_match.score1, other_match.score2), (0, 2))
+        self.assertEqual(PlayerStatistics.objects.get(player=self.player_b1).goals, 2)
+        self.assertEqual(PlayerStatistics.objects.get(player=self.player_a1).goals, 0)
+
+    def test_replay_journal_command_reports_bad_tournament(self):
+        for tournament_id in ('not-a-uuid', str(uuid.uuid4())):
+            with self.assertRaises(CommandError):
+                call_command('replay_journal', '--tournament', tournament_id, stdout=mock.MagicMock())
+        out = mock.MagicMock()
+        call_command('replay_journal', '--tournament', str(self.tournament.id), stdout=out)
+        self.assertIn('Replayed 0 matches', out.write.call_args[0][0])
+
+
+class PlayerStatsBulkUpdateTests(TestCase):
+
+    def _make_match(self, squad_size, suffix):
+        home = create_team(name=f"Bulk Home {suffix}")
+        away = create_team(name=f"Bulk Away {suffix}")
+        home_players = [create_player(home, name=f"H{suffix}-{i}") for i in range(squad_size)]
+        away_players = [create_player(away, name=f"A{suffix}-{i}") for i in range(squad_size)]
+        PlayerStatistics.objects.filter(player=away_players[-1]).delete()
+        match = create_match(home, away, status=Match.STATUS_FINISHED, score1=2, score2=0)
+        return match, home_players, away_players
+
+    def _update(self, match, home_players):
+        with CaptureQueriesContext(connection) as ctx:
+            update_player_stats_from_match_data(
+                match=match,
+                scorers1_ids=[home_players[0].id, home_players[0].id], assists1_ids=[home_players[1].id],
+                scorers2_ids=[], assists2_ids=[]
+            )
+        return len(ctx.captured_queries)
+
+    def test_stats_deltas_applied(self):
+        match, home_players, away_players = self._make_match(3, "S")
+        self._update(match, home_players)
+
+        scorer_stats = PlayerStatistics.objects.get(player=home_players[0])
+        self.assertEqual((scorer_stats.games_played, scorer_stats.goals, scorer_stats.assists), (1, 2, 0))
+        assistant_stats = PlayerStatistics.objects.get(player=home_players[1])
+        self.assertEqual((assistant_stats.games_played, assistant_stats.goals, assistant_stats.assists), (1, 0, 1))
+        created_stats = PlayerStatistics.objects.get(player=away_players[-1])
+        self.assertEqual(created_stats.games_played, 1)
+
+    def test_query_count_is_constant(self):
+        small_match, small_home, _ = self._make_match(2, "small")
+        large_match, large_home, _ = self._make_match(15, "large")
+        self.assertEqual(self._update(small_match, small_home), self._update(large_match, large_home))
+
+    def test_match_facts_drive_rollup_and_corrections(self):
+        match, home_players, away_players = self._make_match(3, "F")
+        self._update(match, home_players)
+        self.assertEqual(PlayerMatchStat.objects.filter(match=match).count(), 6)
+        self.assertEqual(PlayerMatchStat.objects.get(match=match, player=home_players[0]).goals, 2)
+
+        update_player_stats_from_match_data(match, [home_players[2].id], [], [], [])
+        self.assertEqual(PlayerMatchStat.objects.filter(match=match).count(), 6)
+        scorer_stats = PlayerStatistics.objects.get(player=home_players[0])
+        self.assertEqual((scorer_stats.games_played, scorer_stats.goals), (1, 0))
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[2]).goals, 1)
+
+        totals = {row['player_id']: row for row in aggregate_player_stats(PlayerMatchStat.objects.filter(match__tournament=match.tournament))}
+        self.assertEqual(totals[home_players[2].id]['goals'], 1)
+        self.assertEqual(totals[away_players[0].id]['games_played'], 1)
+
+        PlayerStatistics.objects.filter(player=home_players[2]).update(goals=99)
+        rebuild_player_statistics()
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[2]).goals, 1)
+
+        match.delete()
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[2]).games_played, 0)
+
+    def test_command_undo_restores_player_stats_exactly(self):
+        match, home_players, _ = self._make_match(2, "U")
+        match.status = Match.STATUS_SCHEDULED
+        match.score1 = match.score2 = None
+        match.save()
+
+        command = RecordMatchResultCommand(match.id, 1, 0, scorers1_ids=[str(home_players[0].id)], assists1_ids=[str(home_players[1].id)])
+        command.execute()
+        correction = RecordMatchResultCommand(match.id, 2, 0, scorers1_ids=[str(home_players[1].id)] * 2)
+        correction.execute()
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[1]).goals, 2)
+
+        correction.undo()
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[1]).goals, 0)
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[1]).assists, 1)
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[0]).goals, 1)
+
+        command.undo()
+        self.assertFalse(PlayerMatchStat.objects.filter(match=match).exists())
+        self.assertEqual(
+            list(PlayerStatistics.objects.filter(player__in=home_players).values_list('games_played', 'goals', 'assists')),
+            [(0, 0, 0), (0, 0, 0)]
+        )
+
+    def test_undo_refuses_to_clamp_edited_stats(self):
+        match, home_players, _ = self._make_match(2, "C")
+        match.status = Match.STATUS_SCHEDULED
+        match.score1 = match.score2 = None
+        match.save()
+        scorer = home_players[0]
+
+        command = RecordMatchResultCommand(match.id, 2, 0, scorers1_ids=[str(scorer.id)] * 2)
+        command.execute()
+        PlayerStatistics.objects.filter(player=scorer).update(goals=1)
+        with self.assertRaises(ValueError):
+            apply_player_stat_deltas({str(scorer.id): {'games_played': 0, 'goals': -2, 'assists': 0}})
+        self.assertFalse(command.undo())
+        stats = PlayerStatistics.objects.get(player=scorer)
+        self.assertEqual((stats.games_played, stats.goals), (1, 1))
+        self.assertEqual(Match.objects.get(pk=match.pk).status, Match.STATUS_FINISHED)
+
+        PlayerStatistics.objects.filter(player=scorer).update(goals=5)
+        self.assertTrue(command.undo())
+        command.execute()
+        self.assertEqual(PlayerStatistics.objects.get(player=scorer).goals, 5)
+
+    def test_simulate_undo_reverses_deltas_and_reopens_tournament(self):
+        home, away = create_team(name="Undo Home"), create_team(name="Undo Away")
+        home_players = [create_player(home, name=f"UH{i}") for i in range(3)]
+        create_player(away, name="UA0")
+        tournament = Tournament.objects.create(name="Undo Cup", status=Tournament.STATUS_ONGOING)
+        tournament.teams.add(home, away)
+        match = create_match(home, away, tournament=tournament, status=Match.STATUS_SCHEDULED)
+
+        command = SimulateMatchResultCommand(match.id, rng=SimulationRNG(11))
+        self.assertTrue(command.execute())
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.status, Tournament.STATUS_FINISHED)
+
+        other = create_match(away, home, tournament=None, status=Match.STATUS_SCHEDULED)
+        RecordMatchResultCommand(other.id, 0, 3, scorers2_ids=[str(home_players[0].id)] * 3).execute()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(command.undo())
+        stat_reads = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and '"simulator_playerstatistics"."goals"' in q['sql']]
+        self.assertEqual(stat_reads, [])
+
+        self.assertEqual(PlayerStatistics.objects.get(player=home_players[0]).goals, 3)
+        self.assertEqual(
+            [PlayerStatistics.objects.get(player=player).games_played for player in home_players], [1, 1, 1]
+        )
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.status, Tournament.STATUS_ONGOING)
+        self.assertIsNone(tournament.winner)
+        standings = {row['team_id']: row for row in tournament.standings['table']}
+        self.assertEqual(standings[str(home.id)]['played'], 0)
+
+
+class BatchCommandTests(TestCase):
+
+    def setUp(self):
+        team_cache.clear()
+        self.teams = [create_team(name=f"Batch Team {i}") for i in range(6)]
+        self.players = [create_player(team, name=f"Batch Player {i}") for i, team in enumerate(self.teams)]
+        self.tournament = create_tournament(name="Batch Cup")
+        self.tournament.teams.add(*self.teams)
+        self.matches = [
+            create_match(self.teams[i], self.teams[j], self.tournament, days_offset=i * 6 + j)
+            for i in range(6) for j in range(i + 1, 6)
+        ]
+
+    def _results(self, matches):
+        return [
+            {'match_id': str(m.id), 'score1': 2, 'score2': 1, 'scorers1_ids': [str(m.team1.players.first().id)] * 2}
+            for m in matches
+        ]
+
+    def _execute(self, command):
+        with CaptureQueriesContext(connection) as ctx:
+            command.execute()
+        return len(ctx.captured_queries)
+
+    def test_batch_record_validates_together_and_writes_in_constant_queries(self):
+        cancelled = self.matches[0]
+        cancelled.status = Match.STATUS_CANCELLED
+        cancelled.save()
+        bad = self._results(self.matches[:3]) + [{'match_id': str(self.matches[4].id), 'score1': -1, 'score2': 0}, {'match_id': 'nope', 'score1': 0, 'score2': 0}]
+        with self.assertRaises(ValidationError) as ctx:
+            BatchRecordResultsCommand(bad).execute()
+        self.assertEqual(len(ctx.exception.messages), 3)
+        self.assertFalse(Match.objects.filter(status=Match.STATUS_FINISHED).exists())
+
+        small = self._execute(BatchRecordResultsCommand(self._results(self.matches[1:4])))
+        with mock.patch.object(TournamentManager, 'update_tournament_standings', autospec=True) as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                command = BatchRecordResultsCommand(self._results(self.matches[4:13]))
+                large = self._execute(command)
+        self.assertEqual(small, large)
+        self.assertEqual(update.call_count, 1)
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_FINISHED).count(), 12)
+        self.assertEqual(PlayerStatistics.objects.get(player=self.players[0]).goals, 2 * 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            command.undo()
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_FINISHED).count(), 3)
+        self.assertEqual(PlayerMatchStat.objects.count(), 3 * 2)
+        self.tournament.refresh_from_db()
+        self.assertEqual(sum(row['played'] for row in self.tournament.standings['table']), 6)
+
+    def _post_batch(self, payload, client=None, **headers):
+        headers.setdefault('HTTP_AUTHORIZATION', 'Bearer batch-token')
+        return (client or self.client).post(reverse('simulator:match_results_batch'), data=json.dumps(payload), content_type='application/json', **headers)
+
+    def test_batch_record_rejects_players_outside_match_teams(self):
+        result = self._results(self.matches[:1])[0]
+        outsider = str(self.players[5].id)
+        bad = [
+            dict(result, assists1_ids=[outsider]),
+            dict(result, match_id=str(self.matches[1].id), scorers2_ids=[str(self.matches[1].team1.players.first().id)]),
+            dict(result, match_id=str(self.matches[2].id), scorers1_ids=['nope']),
+        ]
+        matches, errors = BatchRecordResultsCommand(bad).validate()
+        self.assertEqual(len(matches), 3)
+        self.assertEqual(len(errors), 3)
+        self.assertIn(outsider, errors[0])
+        with self.assertRaises(ValidationError):
+            BatchRecordResultsCommand(bad).execute()
+        self.assertFalse(PlayerMatchStat.objects.exists())
+
+    @override_settings(SIMULATOR_BATCH_API_TOKENS=['batch-token'])
+    def test_batch_endpoint_requires_token_or_staff_session(self):
+        payload = self._results(self.matches[:1])
+        self.assertEqual(self._post_batch(payload, HTTP_AUTHORIZATION='').status_code, 401)
+        self.assertEqual(self._post_batch(payload, HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+        browser = Client(enforce_csrf_checks=True)
+        browser.force_login(User.objects.create_user('batch-user', password='pw'))
+        self.assertEqual(self._post_batch(payload, client=browser, HTTP_AUTHORIZATION='').status_code, 403)
+        browser.force_login(User.objects.create_user('batch-staff', password='pw', is_staff=True))
+        self.assertEqual(self._post_batch(payload, client=browser, HTTP_AUTHORIZATION='').status_code, 403)
+        self.assertFalse(Match.objects.filter(status=Match.STATUS_FINISHED).exists())
+
+        scripted = Client(enforce_csrf_checks=True)
+        self.assertEqual(self._post_batch(payload, client=scripted).status_code, 200)
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_FINISHED).count(), 1)
+
+    @override_settings(SIMULATOR_BATCH_API_TOKENS=['batch-token'])
+    def test_batch_endpoint_journals_each_match(self):
+        payload = {'results': self._results(self.matches[:2]), 'simulate': [str(m.id) for m in self.matches[2:5]], 'seed': 9}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post_batch(payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['applied'], 5)
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_FINISHED).count(), 5)
+        self.assertEqual(Match.objects.get(pk=self.matches[2].pk).simulation_seed, '9')
+
+        goals_before = PlayerStatistics.objects.get(player=self.players[0]).goals
+        CommandJournal().undo(match_id=self.matches[1].id)
+        self.assertEqual(Match.objects.get(pk=self.matches[1].pk).status, Match.STATUS_SCHEDULED)
+        self.assertEqual(PlayerStatistics.objects.get(player=self.players[0]).goals, goals_before - 2)
+
+        response = self._post_batch({'simulate': [str(self.matches[0].id)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('errors', response.json())
+
+    def test_apply_results_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+            json.dump(self._results(self.matches[:4]), f)
+        self.addCleanup(os.remove, f.name)
+        call_command('apply_results', f.name, '--validate-only', stdout=mock.MagicMock())
+        self.assertFalse(Match.objects.filter(status=Match.STATUS_FINISHED).exists())
+        call_command('apply_results', f.name, stdout=mock.MagicMock())
+        self.assertEqual(Match.objects.filter(status=Match.STATUS_FINISHED).count(), 4)
+        self.assertEqual(CommandJournalEntry.objects.count(), 4)
+
+    def test_batch_command_requires_journal_entries(self):
+        class IncompleteBatch(BatchCommand):
+            def execute(self):
+                return 0
+        with self.assertRaises(TypeError):
+            IncompleteBatch()
+
+    def test_batch_simulate_journals_simulator_used(self):
+        matches = self.matches[:3]
+        model = get_fitted_poisson_model()
+        expected = {m.id: model.sample(m.team1_id, m.team2_id, SimulationRNG(4).for_match(m.id)) for m in matches}
+        with self.assertRaises(ValueError):
+            BatchSimulateResultsCommand([m.id for m in matches], simulator='unknown')
+
+        CommandJournal().execute_batch(BatchSimulateResultsCommand([m.id for m in matches], rng=SimulationRNG(4), simulator='poisson'))
+        self.assertEqual({m.id: (m.score1, m.score2) for m in Match.objects.filter(pk__in=expected)}, expected)
+        payloads = list(CommandJournalEntry.objects.values_list('payload', flat=True))
+        self.assertEqual([payload['simulator'] for payload in payloads], ['poisson'] * 3)
+        self.assertTrue(all(payload['seed'] == '4' for payload in payloads))
+
+
+class LoggingTests(TestCase):
+
+    def test_json_formatter_emits_one_object_per_record(self):
+        record = logging.LogRecord('simulator.test', logging.INFO, __file__, 1, "Матч %s: %s", ('m1', 'ok'), None)
+        record.match_id = 'm1'
+        data = json.loads(JsonFormatter().format(record))
+        self.assertEqual(data['level'], 'INFO')
+        self.assertEqual(data['logger'], 'simulator.test')
+        self.assertEqual(data['message'], "Матч m1: ok")
+        self.assertEqual(data['match_id'], 'm1')
+
+    def test_per_match_simulation_messages_are_debug_only(self):
+        team_cache.clear()
+        teams = [create_team(name=f"Log Team {i}") for i in range(4)]
+        for team in teams:
+            create_player(team, name=f"{team.name} Player")
+        tournament = create_tournament(name="Log Cup")
+        tournament.teams.add(*teams)
+        matches = [create_match(teams[0], teams[i], tournament, days_offset=i) for i in range(1, 4)]
+
+        self.assertFalse(logging.getLogger('simulator').isEnabledFor(logging.DEBUG))
+        with self.assertLogs('simulator', level='DEBUG') as logs:
+            for match in matches:
+                SimulateMatchResultCommand(match.id).execute()
+        self.assertTrue(logs.records)
+        self.assertEqual([r.getMessage() for r in logs.records if r.levelno >= logging.INFO], [])
+
+
+class QueryMetricsTests(TestCase):
+
+    def setUp(self):
+        query_metrics.clear()
+        self.addCleanup(query_metrics.clear)
+        teams = [create_team(name=f"Metrics Team {i}") for i in range(2)]
+        for i in range(6):
+            create_tournament(name=f"Metrics Cup {i}").teams.add(*teams)
+
+    @override_settings(SIMULATOR_QUERY_BUDGETS={'simulator:tournament_list': 0}, SIMULATOR_QUERY_DUPLICATE_THRESHOLD=3)
+    def test_middleware_records_queries_and_flags_budget_and_repeats(self):
+        with self.assertLogs('simulator.middleware', level='WARNING') as logs:
+            response = self.client.get(reverse('simulator:tournament_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+        self.assertIn("бюджет 0", logs.output[0])
+
+        row = next(row for row in query_metrics.summary({'simulator:tournament_list': 0}) if row['view'] == 'simulator:tournament_list')
+        self.assertEqual(row['requests'], 1)
+        self.assertGreaterEqual(row['queries_max'], 1)
+        self.assertEqual(row['budget_violations'], 1)
+        self.assertGreater(row['render_ms_avg'], 0)
+        self.assertGreaterEqual(row['app_ms_avg'], 0)
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for tournament in Tournament.objects.all():
+                tournament.teams.count()
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual([count for _, count in recorder.duplicates(3)], [6])
+
+        # JSON-ендпоінт не рендерить шаблонів: увесь його час — БД і Python.
+        self.client.get(reverse('simulator:api_fixtures'))
+        api_row = next(row for row in query_metrics.summary() if row['view'] == 'simulator:api_fixtures')
+        self.assertEqual(api_row['render_ms_avg'], 0)
+
+    def test_metrics_endpoint_is_staff_only(self):
+        url = reverse('simulator:query_metrics')
+        self.client.get(reverse('simulator:index'))
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        staff = User.objects.create_user('metrics', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get(url).json()
+        self.assertIn('simulator:index', [row['view'] for row in data['views']])
+        self.client.post(url)
+        self.assertEqual([row['view'] for row in self.client.get(url).json()['views']], ['simulator:query_metrics'])
+
+
+class ListQueryCountTests(TestCase):
+
+    def _add_rows(self, count):
+        for _ in range(count):
+            teams = [create_team(name=f"List Team {Team.objects.count()}") for _ in range(2)]
+            for team in teams:
+                create_player(team, name=f"{team.name} Player")
+            tournament = create_tournament(name=f"List Cup {Tournament.objects.count()}")
+            tournament.teams.add(*teams)
+            create_match(teams[0], teams[1], tournament)
+            create_match(teams[1], teams[0], tournament, days_offset=2)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_list_views_and_admin_changelists_use_constant_queries(self):
+        self.client.force_login(User.objects.create_superuser('lists', password='pw'))
+        urls = [
+            reverse('simulator:tournament_list'), reverse('simulator:team_list'),
+            reverse('admin:simulator_tournament_changelist'), reverse('admin:simulator_team_changelist'),
+            reverse('admin:simulator_event_changelist'),
+        ]
+        self._add_rows(2)
+        small = [self._queries(url)[0] for url in urls]
+        self._add_rows(6)
+        large = [self._queries(url)[0] for url in urls]
+        self.assertEqual(small, large)
+
+        _, response = self._queries(reverse('simulator:tournament_list'))
+        tournament = response.context['tournaments'][0]
+        self.assertEqual((tournament.teams_count, tournament.matches_count), (2, 2))
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        team = create_team(name="Keyset Team")
+        self.players = [create_player(team, name=f"Keyset {i % 3}", age=20 + i % 2) for i in range(8)]
+        for i, player in enumerate(self.players[:5]):
+            PlayerStatistics.objects.filter(player=player).update(goals=i % 2)
+        PlayerStatistics.objects.filter(player__in=self.players[5:]).delete()
+
+    def _players(self):
+        return Player.objects.annotate(goals=Coalesce('statistics__goals', 0)).values('id', 'name', 'goals')
+
+    def test_walks_forward_and_back_without_gaps_on_ties(self):
+        ordering = ['-goals', '-id']
+        expected = [row['id'] for row in self._players().order_by(*ordering)]
+
+        pages, cursor = [], None
+        while True:
+            page = keyset_paginate(self._players(), ordering, after=cursor, page_size=3)
+            pages.append([row['id'] for row in page])
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+        self.assertEqual([player_id for rows in pages for player_id in rows], expected)
+        self.assertEqual([len(rows) for rows in pages], [3, 3, 2])
+
+        back = keyset_paginate(self._players(), ordering, before=page.previous_cursor, page_size=3)
+        self.assertEqual([row['id'] for row in back], pages[1])
+        self.assertIsNotNone(back.previous_cursor)
+        with self.assertRaises(ValueError):
+            keyset_paginate(self._players(), ordering, after='bad')
+
+    def test_player_list_sorts_and_pages_by_cursor(self):
+        first = self.client.get(reverse('simulator:player_list'), {'sort': '-goals', 'size': 3})
+        page = first.context['page']
+        self.assertEqual([row['goals'] for row in page], [1, 1, 0])
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(reverse('simulator:player_list'), {'sort': '-goals', 'size': 3, 'after': page.next_cursor})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertFalse({row['id'] for row in page} & {row['id'] for row in second.context['page']})
+        plan = PlayerStatistics.objects.order_by('-goals', '-player_id').values('goals', 'player__name')[:3].explain()
+        self.assertIn('player_stats_goals_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(self.client.get(reverse('simulator:player_list'), {'after': '%%%'}).status_code, 200)
+
+
+class JsonApiTests(TestCase):
+
+    def setUp(self):
+        team_cache.clear()
+        self.teams = [create_team(name=f"Api Team {i}") for i in range(4)]
+        self.players = [create_player(team, name=f"Api Player {i}") for i, team in enumerate(self.teams)]
+        self.tournament = create_tournament(name="Api Cup")
+        self.tournament.teams.add(*self.teams)
+        self.matches = [
+            create_match(self.teams[i], self.teams[j], self.tournament, days_offset=0)
+            for i in range(4) for j in range(i + 1, 4)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            RecordMatchResultCommand(self.matches[0].id, 2, 0, scorers1_ids=[str(self.players[0].id)] * 2).execute()
+
+    def test_standings_field_selection_and_etag(self):
+        url = reverse('simulator:api_tournament_standings', args=[self.tournament.id])
+        response = self.client.get(url, {'fields': 'team_name,points'})
+        self.assertEqual(response.status_code, 200)
+        table = response.json()['table']
+        self.assertEqual(set(table[0]), {'team_name', 'points'})
+        self.assertEqual(table[0], {'team_name': 'Api Team 0', 'points': 3})
+
+        cached = self.client.get(url, {'fields': 'team_name,points'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.client.get(url, {'fields': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('simulator:api_tournament_standings', args=[uuid.uuid4()])).status_code, 404)
+
+    def test_fixtures_cursor_pagination_and_filters(self):
+        url = reverse('simulator:api_fixtures')
+        params = {'tournament': str(self.tournament.id), 'size': 4, 'fields': 'id,team1_name,status'}
+        first = self.client.get(url, params).json()
+        second = self.client.get(url, {**params, 'after': first['next']}).json()
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted(str(m.id) for m in self.matches))
+        self.assertIsNone(second['next'])
+        self.assertEqual(set(first['results'][0]), {'id', 'team1_name', 'status'})
+
+        finished = self.client.get(url, {'status': Match.STATUS_FINISHED, 'date': timezone.localdate().isoformat()}).json()['results']
+        self.assertEqual([row['score1'] for row in finished], [2])
+        self.assertEqual(self.client.get(url, {'tournament': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'after': 'broken'}).status_code, 400)
+
+        detail = self.client.get(reverse('simulator:api_match_detail', args=[self.matches[0].id])).json()
+        self.assertEqual(detail['scorers'][0]['goals'], 2)
+
+    def test_player_leaderboard_global_and_per_tournament(self):
+        url = reverse('simulator:api_player_leaderboard')
+        top = self.client.get(url, {'fields': 'player_name,goals', 'size': 1}).json()
+        self.assertEqual(top['results'], [{'player_name': 'Api Player 0', 'goals': 2}])
+        self.assertIsNotNone(top['next'])
+
+        scoped = self.client.get(url, {'tournament': str(self.tournament.id), 'stat': 'games_played'}).json()['results']
+        self.assertEqual({row['player_name']: row['games_played'] for row in scoped}, {'Api Player 0': 1, 'Api Player 1': 1})
+        self.assertEqual(self.client.get(url, {'stat': 'age'}).status_code, 400)
+
+
+class TournamentCacheTests(TestCase):
+
+    def setUp(self):
+        team_cache.clear()
+        self.teams = [create_team(name=f"Cache Team {i}") for i in range(3)]
+        for team in self.teams:
+            create_player(team, name=f"{team.name} Player")
+        self.tournament = create_tournament(name="Cache Cup")
+        self.tournament.teams.add(*self.teams)
+        self.match = create_match(self.teams[0], self.teams[1], self.tournament)
+        self.urls = [
+            reverse('simulator:tournament_detail', args=[self.tournament.id]),
+            reverse('simulator:tournament_standings', args=[self.tournament.id]),
+            reverse('simulator:report_tournament_results', args=[self.tournament.id]),
+            reverse('simulator:api_tournament_standings', args=[self.tournament.id]),
+            reverse('simulator:api_fixtures') + f'?tournament={self.tournament.id}',
+        ]
+
+    def _get_all(self):
+        responses = []
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            responses.append(response)
+        return responses
+
+    def test_repeat_reads_do_no_queries_until_a_write(self):
+        self._get_all()
+        with self.assertNumQueries(0):
+            self._get_all()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.match.set_result(3, 1)
+        detail, standings, report, api_standings, fixtures = self._get_all()
+        self.assertContains(detail, "3 - 1")
+        self.assertEqual(standings.context['standings'][0]['team'], self.teams[0])
+        self.assertEqual(api_standings.json()['table'][0]['points'], 3)
+        self.assertEqual(fixtures.json()['results'][0]['score1'], 3)
+
+    def test_team_and_batch_changes_bump_version(self):
+        version = tournament_cache.version(self.tournament.id)
+        self.teams[2].name = "Cache Team Renamed"
+        self.teams[2].save()
+        self.assertGreater(tournament_cache.version(self.tournament.id), version)
+
+        self._get_all()
+        version = tournament_cache.version(self.tournament.id)
+        BatchRecordResultsCommand([{'match_id': str(self.match.id), 'score1': 0, 'score2': 2}]).execute()
+        self.assertGreater(tournament_cache.version(self.tournament.id), version)
+        self.assertContains(self.client.get(self.urls[0]), "0 - 2")
+        self.assertContains(self.client.get(self.urls[0]), "Cache Team Renamed")
+
+    def test_process_local_backend_gets_finite_lifetime_and_warning(self):
+        self.assertTrue(tournament_cache.process_local)
+        with override_settings(SIMULATOR_TOURNAMENT_CACHE_LOCAL_TIMEOUT=30):
+            cache = TournamentCache(timeout=None)
+        self.assertEqual((cache._version_timeout(), cache._entry_timeout()), (30, 30))
+        with override_settings(SIMULATOR_TOURNAMENT_CACHE_TIMEOUT=10):
+            self.assertEqual(TournamentCache()._entry_timeout(), 10)
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_tournament_cache_backend(None), [])
+        with override_settings(DEBUG=False):
+            self.assertEqual([error.id for error in check_tournament_cache_backend(None)], ['simulator.W001'])
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        team_cache.clear()
+        self.teams = [create_team(name=f"Kiosk Team {i}") for i in range(2)]
+        self.tournament = create_tournament(name="Kiosk Cup")
+        self.tournament.teams.add(*self.teams)
+        self.match = create_match(self.teams[0], self.teams[1], self.tournament)
+
+    def test_tournament_pages_answer_304_until_a_change(self):
+        for name in ('tournament_detail', 'tournament_standings', 'report_tournament_results'):
+            url = reverse(f'simulator:{name}', args=[self.tournament.id])
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first.has_header('Last-Modified'))
+            with self.assertNumQueries(0):
+                cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+        url = reverse('simulator:tournament_detail', args=[self.tournament.id])
+        etag = self.client.get(url)['ETag']
+        self.match.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_match_detail_etag_follows_updated_at(self):
+        url = reverse('simulator:match_detail', args=[self.match.id])
+        first = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.templates)
+
+        before = Match.objects.get(pk=self.match.pk).updated_at
+        self.match.set_result(1, 1)
+        self.assertGreater(Match.objects.get(pk=self.match.pk).updated_at, before)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+        etag = self.client.get(url)['ETag']
+        Team.objects.get(pk=self.teams[1].pk).save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        other = create_match(self.teams[1], self.teams[0], status=Match.STATUS_FINISHED, score1=2, score2=0)
+        scheduled = create_match(self.teams[0], self.teams[1], days_offset=3)
+        url = reverse('simulator:match_detail', args=[scheduled.id])
+        etag = self.client.get(url)['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        stamp = mock.Mock(wraps=results_stamp)
+        with mock.patch('simulator.views.results_stamp', stamp), mock.patch('simulator.services.poisson_model.results_stamp', stamp):
+            response = self.client.get(url)
+        self.assertIsNotNone(response.context['odds'])
+        self.assertEqual(stamp.call_count, 1)
+
+    def test_pending_message_bypasses_304(self):
+        url = reverse('simulator:tournament_detail', args=[self.tournament.id])
+        first = self.client.get(url)
+        self.client.post(reverse('simulator:tournament_generate_schedule', args=[self.tournament.id]), {'start_date': 'not-a-date'})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Некоректний формат дати початку.")
+        self.assertNotContains(self.client.get(reverse('simulator:team_list')), "Некоректний формат дати початку.")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
 
 class ViewAccessAndFormTests(TestCase):
 
@@ -355,7 +1417,8 @@ class ViewAccessAndFormTests(TestCase):
         cls.match_finished_view = create_match(cls.team1, cls.team2, cls.tournament1, status=Match.STATUS_FINISHED, score1=1, score2=0, days_offset=-5)
         cls.match_scheduled_view = create_match(cls.team1, cls.team2, cls.tournament1, status=Match.STATUS_SCHEDULED, days_offset=2)
 
-
+    def setUp(self):
+        team_cache.clear()
 
     def test_index_view(self):
         response = self.client.get(reverse('simulator:index'))
@@ -375,6 +1438,14 @@ class ViewAccessAndFormTests(TestCase):
         self.assertTemplateUsed(response, 'simulator/team_list.html')
         self.assertContains(response, self.team1.name)
 
+    def test_every_player_gets_a_statistics_row(self):
+        team = create_team(name="Stats Row Team")
+        player = Player.objects.create(name="No Stats Yet", age=20, team=team)
+        self.assertTrue(PlayerStatistics.objects.filter(player=player, goals=0, assists=0).exists())
+        PlayerStatistics.objects.filter(player=player).delete()
+        rebuild_player_statistics()
+        self.assertTrue(PlayerStatistics.objects.filter(player=player).exists())
+
     def test_player_list_view(self):
         response = self.client.get(reverse('simulator:player_list'))
         self.assertEqual(response.status_code, 200)
@@ -502,6 +1573,29 @@ class ViewAccessAndFormTests(TestCase):
         self.assertContains(response, f"Турнірна таблиця: {self.tournament1.name}")
         self.assertContains(response, self.team1.name)
 
+    def test_tournament_projection_view(self):
+        response = self.client.get(reverse('simulator:tournament_projection', args=[self.tournament1.id]), {'replications': 500})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'simulator/tournament_projection.html')
+        self.assertContains(response, self.team1.name)
+
+    def test_tournament_bracket_view(self):
+        knockout = create_tournament(name="View Knockout")
+        knockout.teams.add(self.team1, self.team2)
+        create_schedule_generator('knockout').create_matches_for_tournament(knockout, date(2025, 7, 1))
+        response = self.client.get(reverse('simulator:tournament_bracket', args=[knockout.id]), {'replications': 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'simulator/tournament_bracket.html')
+        self.assertContains(response, self.team2.name)
+
+    def test_tournament_odds_view(self):
+        create_match(self.team1, self.team2, self.tournament1, status=Match.STATUS_SCHEDULED, days_offset=10)
+        response = self.client.get(reverse('simulator:tournament_odds', args=[self.tournament1.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'simulator/tournament_odds.html')
+        self.assertEqual(len(response.context['odds']), self.tournament1.matches.filter(status=Match.STATUS_SCHEDULED).count())
+        self.assertContains(response, self.team2.name)
+
     def test_detail_view_404(self):
         random_uuid = uuid.uuid4()
         response = self.client.get(reverse('simulator:team_detail', args=[random_uuid]))
@@ -531,4 +1625,103 @@ class SignalEffectTests(TestCase):
         self.assertIsNotNone(team1_entry)
         self.assertIsNotNone(team2_entry)
         self.assertEqual(team1_entry['points'], 3)
-        self.assertEqual(team2_entry['points'], 0)
\ No newline at end of file
+        self.assertEqual(team2_entry['points'], 0)
+
+    def _assert_standings_consistent(self, tournament):
+        tournament.refresh_from_db()
+        manager = TournamentManager(tournament_id=tournament.id)
+        self.assertEqual(tournament.standings['table'], manager.serialize_standings(manager.calculate_standings()))
+
+    def test_incremental_standings_correction_and_undo(self):
+        team1 = create_team("Delta Team 1")
+        team2 = create_team("Delta Team 2")
+        tournament = create_tournament("Delta Tourn")
+        tournament.teams.add(team1, team2)
+        match = create_match(team1, team2, tournament, status=Match.STATUS_SCHEDULED)
+        match.set_result(2, 1)
+        self._assert_standings_consistent(tournament)
+
+        with mock.patch.object(TournamentManager, 'update_tournament_standings') as full_recompute:
+            match.set_result(0, 3)
+            match.status = Match.STATUS_SCHEDULED
+            match.score1 = match.score2 = None
+            match.save()
+            full_recompute.assert_not_called()
+
+        tournament.refresh_from_db()
+        self.assertEqual(sum(row['played'] for row in tournament.standings['table']), 0)
+        self._assert_standings_consistent(tournament)
+
+        match.set_result(1, 1)
+        match.delete()
+        self._assert_standings_consistent(tournament)
+
+    def test_elo_ratings_follow_results_and_match_full_replay(self):
+        team1, team2, team3 = create_team("Elo Team 1"), create_team("Elo Team 2"), create_team("Elo Team 3")
+        create_match(team1, team2, days_offset=-3, status=Match.STATUS_FINISHED, score1=2, score2=0)
+        create_match(team2, team3, days_offset=-2, status=Match.STATUS_FINISHED, score1=1, score2=1)
+        last = create_match(team3, team1, days_offset=-1)
+        last.set_result(3, 1)
+        last.set_result(0, 1)
+
+        incremental = dict(TeamRating.objects.values_list('team_id', 'rating'))
+        self.assertGreater(incremental[team1.id], TeamRating.INITIAL_RATING)
+        self.assertAlmostEqual(sum(incremental.values()), 3 * TeamRating.INITIAL_RATING)
+        self.assertEqual(TeamRatingHistory.objects.filter(match=last).count(), 2)
+
+        call_command('rebuild_ratings', chunk_size=1)
+        rebuilt = dict(TeamRating.objects.values_list('team_id', 'rating'))
+        for team_id, rating in incremental.items():
+            self.assertAlmostEqual(rebuilt[team_id], rating)
+
+        rating_before_last = TeamRatingHistory.objects.get(match=last, team=team3).rating_before
+        updated_before_revert = TeamRating.objects.get(team=team3).updated_at
+        last.delete()
+        self.assertAlmostEqual(TeamRating.objects.get(team=team3).rating, rating_before_last)
+        self.assertEqual(TeamRating.objects.get(team=team3).matches_rated, 1)
+        self.assertGreater(TeamRating.objects.get(team=team3).updated_at, updated_before_revert)
+
+    def test_elo_strength_provider_maps_rating_gap_to_odds(self):
+        strong, weak = create_team("Elo Strong"), create_team("Elo Weak")
+        TeamRating.objects.create(team=strong, rating=1900)
+        strengths = EloStrengthProvider().strengths([strong.id, weak.id])
+        self.assertAlmostEqual(strengths[str(strong.id)][0] / strengths[str(weak.id)][0], 10.0)
+
+        match = create_match(strong, weak)
+        simulator = SimpleMatchSimulator(match, rng=SimulationRNG(1), strength_provider=get_strength_provider('elo'))
+        self.assertEqual(simulator.strength_provider.strengths([weak.id])[str(weak.id)], (EloStrengthProvider.STRENGTH_AT_INITIAL, 0.0))
+        self.assertIsNotNone(simulator.simulate())
+
+    def test_rebuild_standings_command_repairs_mismatch(self):
+        team1 = create_team("Repair Team 1")
+        team2 = create_team("Repair Team 2")
+        tournament = create_tournament("Repair Tourn")
+        tournament.teams.add(team1, team2)
+        create_match(team1, team2, tournament, status=Match.STATUS_FINISHED, score1=1, score2=0)
+        Tournament.objects.filter(pk=tournament.pk).update(standings={})
+
+        call_command('rebuild_standings', str(tournament.id))
+        self._assert_standings_consistent(tournament)
+        call_command('rebuild_standings', str(tournament.id), '--check')
+
+    def test_deferred_standings_recompute_once_per_tournament(self):
+        teams = [create_team(f"Batch Team {i}") for i in range(3)]
+        tournament = create_tournament("Batch Tourn")
+        tournament.teams.add(*teams)
+        matches = [
+            create_match(teams[0], teams[1], tournament),
+            create_match(teams[0], teams[2], tournament),
+            create_match(teams[1], teams[2], tournament),
+        ]
+
+        original = TournamentManager.update_tournament_standings
+        with mock.patch.object(TournamentManager, 'update_tournament_standings', autospec=True, side_effect=original) as recompute:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with deferred_standings():
+                    for match in matches:
+                        match.set_result(1, 0)
+                    self.assertEqual(recompute.call_count, 0)
+            self.assertEqual(len(callbacks), 1)
+            self.assertEqual(recompute.call_count, 1)
+
+        self._assert_standings_consistent(tournament)
\ No newline at end of file
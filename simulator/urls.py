@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'simulator'
 
@@ -31,12 +31,26 @@ urlpatterns = [
     path('tournaments/<uuid:tournament_id>/update/', views.tournament_update, name='tournament_update'),
     path('tournaments/<uuid:tournament_id>/', views.tournament_detail, name='tournament_detail'),
     path('tournaments/<uuid:tournament_id>/standings/', views.tournament_standings, name='tournament_standings'),
+    path('tournaments/<uuid:tournament_id>/projection/', views.tournament_projection, name='tournament_projection'),
+    path('tournaments/<uuid:tournament_id>/odds/', views.tournament_odds, name='tournament_odds'),
+    path('tournaments/<uuid:tournament_id>/bracket/', views.tournament_bracket, name='tournament_bracket'),
+    path('tournaments/<uuid:tournament_id>/bracket/advance/', views.tournament_advance_bracket, name='tournament_advance_bracket'),
     path('tournaments/<uuid:tournament_id>/generate_schedule/', views.tournament_generate_schedule, name='tournament_generate_schedule'),
     path('tournaments/<uuid:tournament_id>/matches/add/', views.match_create, name='match_create'),
 
     path('matches/<uuid:match_id>/', views.match_detail, name='match_detail'),
     path('matches/<uuid:match_id>/record_result/', views.match_record_result, name='match_record_result'),
+    path('matches/results/batch/', views.match_results_batch, name='match_results_batch'),
     path('matches/<uuid:match_id>/simulate/', views.match_simulate, name='match_simulate'),
+    path('matches/<uuid:match_id>/undo/', views.match_undo, name='match_undo'),
+    path('matches/<uuid:match_id>/redo/', views.match_redo, name='match_redo'),
 
     path('reports/tournament/<uuid:tournament_id>/results/', views.report_tournament_results, name='report_tournament_results'),
+
+    path('metrics/queries/', views.query_metrics_view, name='query_metrics'),
+
+    path('api/tournaments/<uuid:tournament_id>/standings/', api.tournament_standings, name='api_tournament_standings'),
+    path('api/fixtures/', api.fixtures, name='api_fixtures'),
+    path('api/matches/<uuid:match_id>/', api.match_detail, name='api_match_detail'),
+    path('api/players/leaderboard/', api.player_leaderboard, name='api_player_leaderboard'),
 ]
\ No newline at end of file
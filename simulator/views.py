@@ -1,19 +1,42 @@
+import logging
+import json
+from functools import wraps
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse, Http404, HttpResponseForbidden, HttpResponseRedirect
+from django.http import HttpResponse, Http404, HttpResponseForbidden, HttpResponseRedirect, JsonResponse
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.utils import timezone
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.core.management import call_command
-
-from .models import Event, Team, Player, Tournament, Match, PlayerStatistics
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import condition
+from django.views.decorators.csrf import csrf_exempt
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.crypto import constant_time_compare
+
+from .models import Event, Team, Player, Tournament, Match, PlayerStatistics, PlayerMatchStat, CommandJournalEntry
 from .forms import EventForm, TeamForm, PlayerForm, MatchResultForm, TournamentForm, MatchForm
 from .services.tournament_manager import TournamentManager
+from .services.tournament_projection import TournamentProjection
+from .services.knockout_bracket import KnockoutProjection, advance_bracket
+from .services.strength import get_strength_provider
+from .services.poisson_model import get_fitted_poisson_model, results_stamp
+from .services.match_simulator import MATCH_SIMULATORS
+from .services.player_stats_updater import aggregate_player_stats
+from .services.command_journal import CommandJournal
+from .services.tournament_cache import tournament_cache
 from .services.report_generator import TournamentResultsReport
 from .services.schedule_generator import create_schedule_generator
 from .services.recommendation_system import RecommendationSystem
-from .services.commands import RecordMatchResultCommand, SimulateMatchResultCommand
+from .services.commands import RecordMatchResultCommand, SimulateMatchResultCommand, batch_commands_from_payload
+from .middleware import query_metrics
+from .pagination import DEFAULT_PAGE_SIZE, keyset_paginate
+
+logger = logging.getLogger(__name__)
 
 def index(request):
     num_events = Event.objects.count()
@@ -46,17 +69,49 @@ def delete_data_view(request):
         return HttpResponseRedirect(reverse('simulator:index'))
     return redirect('simulator:index')
 
+PLAYER_SORT_FIELDS = ('name', 'age', 'goals', 'assists')
+
+def keyset_page(request, queryset, ordering):
+    """Сторінка за ?after=/?before= і ?size=; зіпсований курсор чи розмір — перша сторінка за замовчуванням."""
+    try:
+        page_size = int(request.GET.get('size', DEFAULT_PAGE_SIZE))
+        return keyset_paginate(queryset, ordering, after=request.GET.get('after'), before=request.GET.get('before'), page_size=page_size)
+    except ValueError:
+        return keyset_paginate(queryset, ordering)
+
 def event_list(request):
-    events = Event.objects.order_by('-start_date')
-    return render(request, 'simulator/event_list.html', {'events': events})
+    events = Event.objects.only('id', 'name', 'location', 'start_date', 'end_date')
+    page = keyset_page(request, events, ['-start_date', '-id'])
+    return render(request, 'simulator/event_list.html', {'events': page, 'page': page})
 
 def team_list(request):
-    teams = Team.objects.order_by('name').prefetch_related('players')
-    return render(request, 'simulator/team_list.html', {'teams': teams})
+    teams = Team.objects.only('id', 'name', 'coach').annotate(players_count=Count('players'))
+    page = keyset_page(request, teams, ['name', 'id'])
+    return render(request, 'simulator/team_list.html', {'teams': page, 'page': page})
+
+# Поля рядка списку гравців -> ті самі поля, вибрані від PlayerStatistics.
+PLAYER_STAT_ROW_FIELDS = {
+    'id': 'player_id', 'name': 'player__name', 'age': 'player__age', 'position': 'player__position',
+    'team_id': 'player__team_id', 'team__name': 'player__team__name', 'goals': 'goals', 'assists': 'assists',
+}
 
 def player_list(request):
-    players = Player.objects.select_related('team', 'statistics').order_by('name')
-    return render(request, 'simulator/player_list.html', {'players': players})
+    sort = request.GET.get('sort', 'name')
+    if sort.lstrip('-') not in PLAYER_SORT_FIELDS:
+        sort = 'name'
+    direction = '-' if sort.startswith('-') else ''
+    if sort.lstrip('-') in ('goals', 'assists'):
+        # Голи й асисти — сирі колонки PlayerStatistics (рядок є в кожного гравця), тож сортування
+        # і курсор ідуть по індексах player_stats_goals_idx / player_stats_assists_idx.
+        stats = PlayerStatistics.objects.values(*PLAYER_STAT_ROW_FIELDS.values())
+        page = keyset_page(request, stats, [sort, f'{direction}player_id'])
+        page.rows = [{field: row[source] for field, source in PLAYER_STAT_ROW_FIELDS.items()} for row in page.rows]
+    else:
+        players = Player.objects.annotate(
+            goals=Coalesce('statistics__goals', 0), assists=Coalesce('statistics__assists', 0),
+        ).values(*PLAYER_STAT_ROW_FIELDS)
+        page = keyset_page(request, players, [sort, f'{direction}id'])
+    return render(request, 'simulator/player_list.html', {'players': page, 'page': page, 'sort': sort})
 
 def tournament_create(request):
     if request.method == 'POST':
@@ -86,7 +141,9 @@ def tournament_update(request, tournament_id):
     return render(request, 'simulator/tournament_form.html', {'form': form})
 
 def tournament_list(request):
-    tournaments = Tournament.objects.select_related('event').prefetch_related('teams', 'matches').order_by('name')
+    tournaments = Tournament.objects.select_related('event').annotate(
+        teams_count=Count('teams', distinct=True), matches_count=Count('matches', distinct=True),
+    ).order_by('name')
     return render(request, 'simulator/tournament_list.html', {'tournaments': tournaments})
 
 def event_detail(request, event_id):
@@ -94,59 +151,228 @@ def event_detail(request, event_id):
     return render(request, 'simulator/event_detail.html', {'event': event})
 
 def team_detail(request, team_id):
-    team = get_object_or_404(Team.objects.prefetch_related('players__statistics', 'tournaments'), pk=team_id)
-    return render(request, 'simulator/team_detail.html', {'team': team})
+    team = get_object_or_404(Team.objects.select_related('rating').prefetch_related('players__statistics', 'tournaments'), pk=team_id)
+    rating_history = team.rating_history.select_related('match__team1', 'match__team2')[:10]
+    return render(request, 'simulator/team_detail.html', {'team': team, 'rating_history': rating_history})
 
 def player_detail(request, player_id):
     player = get_object_or_404(Player.objects.select_related('team', 'statistics'), pk=player_id)
     return render(request, 'simulator/player_detail.html', {'player': player})
 
+def unless_messages_pending(func):
+    """
+    Валідатори для @condition: поки в запиті є непоказані flash-повідомлення (напр. помилка
+    після редиректу), сторінку треба відрендерити, а не відповісти 304 — інакше повідомлення
+    з'явиться на наступній, сторонній сторінці.
+    """
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
+        if len(messages.get_messages(request)):
+            return None
+        return func(request, *args, **kwargs)
+    return wrapper
+
+@unless_messages_pending
+def tournament_etag(request, tournament_id):
+    """Версія кешу турніру: змінюється з будь-якою зміною його матчів, команд чи таблиці, без запитів до БД."""
+    return f"{tournament_id}-{tournament_cache.version(tournament_id)}"
+
+@unless_messages_pending
+def tournament_last_modified(request, tournament_id):
+    """Найпізніший updated_at турніру, його матчів і команд; кешується під тією ж версією, що й ETag."""
+    def latest_update():
+        latest_match = Match.objects.filter(tournament_id=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+        latest_team = Team.objects.filter(tournaments=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]
+        row = Tournament.objects.filter(pk=tournament_id).values_list('updated_at', Subquery(latest_match), Subquery(latest_team)).first()
+        return max(filter(None, row)) if row else None
+    return tournament_cache.get_or_set(tournament_id, 'last-modified', latest_update)
+
+def request_results_stamp(request):
+    """results_stamp() один раз на запит: його ділять валідатори @condition і тіло view."""
+    if not hasattr(request, '_results_stamp'):
+        request._results_stamp = results_stamp()
+    return request._results_stamp
+
+@unless_messages_pending
+def match_last_modified(request, match_id):
+    """Найпізніша зміна матчу, його команд або будь-якого результату (від них залежать коефіцієнти моделі)."""
+    if not hasattr(request, '_match_last_modified'):
+        _, latest_result = request_results_stamp(request)
+        row = Match.objects.filter(pk=match_id).values_list('updated_at', 'team1__updated_at', 'team2__updated_at').first()
+        request._match_last_modified = max(filter(None, (*row, latest_result))) if row else None
+    return request._match_last_modified
+
+@unless_messages_pending
+def match_etag(request, match_id):
+    # Last-Modified має точність до секунди, тож ETag бере мітку з мікросекундами; кількість
+    # результатів — щоб видалення чи скидання результату теж змінювало ETag (як і модель).
+    last_modified = match_last_modified(request, match_id)
+    results_count, _ = request_results_stamp(request)
+    return f"{match_id}-{results_count}-{last_modified.timestamp():.6f}" if last_modified else None
+
+@condition(etag_func=tournament_etag, last_modified_func=tournament_last_modified)
 def tournament_detail(request, tournament_id):
-    tournament = get_object_or_404(
-        Tournament.objects.select_related('event', 'winner').prefetch_related(
-            'teams', 'matches__team1', 'matches__team2'
-        ), pk=tournament_id
-    )
-    standings_table_list = tournament.final_standings.get('table') or tournament.standings.get('table')
-    context = {
-        'tournament': tournament,
-        'standings_table_list': standings_table_list,
-    }
+    def build_context():
+        tournament = get_object_or_404(
+            Tournament.objects.select_related('event', 'winner').prefetch_related(
+                'teams', 'matches__team1', 'matches__team2'
+            ), pk=tournament_id
+        )
+        standings_table_list = tournament.final_standings.get('table') or tournament.standings.get('table')
+        return {
+            'tournament': tournament,
+            'standings_table_list': standings_table_list,
+        }
+
+    # Кешуються дані сторінки, а не HTML: у формах сторінки є CSRF-токен конкретного користувача.
+    context = tournament_cache.get_or_set(tournament_id, 'detail', build_context)
     return render(request, 'simulator/tournament_detail.html', context)
 
 
+@condition(etag_func=match_etag, last_modified_func=match_last_modified)
 def match_detail(request, match_id):
     match = get_object_or_404(Match.objects.select_related('team1', 'team2', 'tournament'), pk=match_id)
-    return render(request, 'simulator/match_detail.html', {'match': match})
+    odds = match_odds(get_fitted_poisson_model(request_results_stamp(request)), match) if match.status == Match.STATUS_SCHEDULED else None
+    last_command = match.journal_entries.filter(action=CommandJournalEntry.ACTION_EXECUTE).order_by('-created_at').first()
+    return render(request, 'simulator/match_detail.html', {'match': match, 'odds': odds, 'last_command': last_command})
+
+
+def match_odds(model, match):
+    win, draw, loss = model.outcome_probabilities(match.team1_id, match.team2_id)
+    expected1, expected2 = model.expected_goals(match.team1_id, match.team2_id)
+    return {
+        'match': match, 'win': win, 'draw': draw, 'loss': loss,
+        'expected1': expected1, 'expected2': expected2,
+        'likely_score': model.most_likely_score(match.team1_id, match.team2_id),
+    }
 
+def tournament_odds(request, tournament_id):
+    tournament = get_object_or_404(Tournament, pk=tournament_id)
+    model = get_fitted_poisson_model()
+    matches = tournament.matches.filter(status=Match.STATUS_SCHEDULED).select_related('team1', 'team2')
+    return render(request, 'simulator/tournament_odds.html', {
+        'tournament': tournament,
+        'odds': [match_odds(model, match) for match in matches],
+        'matches_fitted': model.matches_fitted,
+    })
 
+
+@condition(etag_func=tournament_etag, last_modified_func=tournament_last_modified)
 def tournament_standings(request, tournament_id):
-    try:
+    def build_context():
         manager = TournamentManager(tournament_id)
-        standings = manager.calculate_standings()
-        tournament = manager.tournament
+        return {
+            'tournament': manager.tournament,
+            'standings': manager.calculate_standings(),
+            'top_scorers': list(aggregate_player_stats(PlayerMatchStat.objects.filter(match__tournament=manager.tournament))[:10]),
+        }
+
+    try:
+        context = tournament_cache.get_or_set(tournament_id, 'standings', build_context)
     except ValueError:
         raise Http404("Турнір не знайдено.")
     except Exception as e:
-        print(f"Помилка при розрахунку таблиці: {e}")
+        logger.exception("Помилка при розрахунку таблиці: %s", e)
         messages.error(request, "Помилка при отриманні турнірної таблиці.")
         return redirect('simulator:tournament_list')
+    return render(request, 'simulator/tournament_standings.html', context)
+
+def tournament_projection(request, tournament_id):
+    try:
+        replications = int(request.GET.get('replications', 10000))
+    except (TypeError, ValueError):
+        replications = 10000
+    replications = max(100, min(replications, 100000))
+
+    try:
+        strength_provider = get_strength_provider(request.GET.get('strength') or None)
+    except ValueError as e:
+        messages.error(request, str(e))
+        strength_provider = get_strength_provider()
 
-    return render(request, 'simulator/tournament_standings.html', {
+    try:
+        projection = TournamentProjection(tournament_id, replications=replications, strength_provider=strength_provider)
+        rows = projection.project()
+        tournament = projection.tournament
+    except ValueError:
+        raise Http404("Турнір не знайдено.")
+
+    return render(request, 'simulator/tournament_projection.html', {
         'tournament': tournament,
-        'standings': standings
+        'rows': rows,
+        'replications': replications,
+        'strength_model': strength_provider.name,
+        'positions': range(1, len(rows) + 1),
     })
 
-def report_tournament_results(request, tournament_id):
-    reporter = TournamentResultsReport()
+def tournament_bracket(request, tournament_id):
+    tournament = get_object_or_404(Tournament, pk=tournament_id)
+    rounds = (tournament.bracket or {}).get('rounds') or []
+    if not rounds:
+        messages.warning(request, "Турнір не має сітки плей-оф.")
+        return redirect('simulator:tournament_detail', tournament_id=tournament.id)
+
+    try:
+        replications = int(request.GET.get('replications', 10000))
+    except (TypeError, ValueError):
+        replications = 10000
+    replications = max(100, min(replications, 100000))
+
+    team_ids = {team_id for entries in rounds for entry in entries for team_id in (entry['team1'], entry['team2']) if team_id}
+    match_ids = [entry['match_id'] for entries in rounds for entry in entries if entry['match_id']]
+    teams = {str(pk): team for pk, team in Team.objects.in_bulk(team_ids).items()}
+    matches = {str(pk): match for pk, match in Match.objects.in_bulk(match_ids).items()}
+    bracket_rounds = [
+        [
+            {
+                'team1': teams.get(entry['team1']),
+                'team2': teams.get(entry['team2']),
+                'match': matches.get(entry['match_id']),
+                'winner': teams.get(entry['winner']),
+            }
+            for entry in entries
+        ]
+        for entries in rounds
+    ]
+    rows = KnockoutProjection(tournament.id, replications=replications).project()
+
+    return render(request, 'simulator/tournament_bracket.html', {
+        'tournament': tournament,
+        'bracket_rounds': bracket_rounds,
+        'rows': rows,
+        'replications': replications,
+        'round_numbers': range(1, len(rows[0]['round_probabilities']) + 1) if rows else [],
+    })
+
+def tournament_advance_bracket(request, tournament_id):
+    tournament = get_object_or_404(Tournament, pk=tournament_id)
+    if request.method != 'POST':
+        messages.error(request, "Неприпустимий метод запиту.")
+        return redirect('simulator:tournament_bracket', tournament_id=tournament.id)
     try:
-        report_text = reporter.generate(tournament_id=tournament_id, output_format='text')
+        created = advance_bracket(tournament)
+        if created:
+            messages.success(request, f"Створено {len(created)} матчів наступного раунду.")
+        else:
+            messages.success(request, "Сітку завершено, чемпіона визначено.")
+    except ValueError as e:
+        messages.error(request, f"Неможливо перейти до наступного раунду: {e}")
+    return redirect('simulator:tournament_bracket', tournament_id=tournament.id)
+
+@condition(etag_func=tournament_etag, last_modified_func=tournament_last_modified)
+def report_tournament_results(request, tournament_id):
+    def build_report():
+        report_text = TournamentResultsReport().generate(tournament_id=tournament_id, output_format='text')
         if report_text is None:
              raise Http404("Не вдалося згенерувати звіт (можливо, турнір не знайдено або немає даних).")
+        return report_text
+
+    try:
+        report_text = tournament_cache.get_or_set(tournament_id, 'report:text', build_report)
     except Http404:
          raise
     except Exception as e:
-        print(f"Помилка генерації звіту: {e}")
+        logger.exception("Помилка генерації звіту: %s", e)
         return HttpResponse("Помилка під час генерації звіту.", status=500)
 
     return HttpResponse(report_text, content_type='text/plain; charset=utf-8')
@@ -269,7 +495,7 @@ def match_record_result(request, match_id):
             )
 
             try:
-                command.execute()
+                CommandJournal().execute(command)
                 messages.success(request, f"Результат матчу {match} успішно збережено.")
 
                 if match.tournament:
@@ -313,6 +539,13 @@ def tournament_generate_schedule(request, tournament_id):
         try:
             generator = create_schedule_generator(strategy_type)
             created_matches = generator.create_matches_for_tournament(tournament, start_date)
+            report = generator.last_report
+            if report and report['violations']:
+                messages.warning(
+                    request,
+                    f"Розклад не вміщується в обмеження: {len(report['violations'])} порушень. "
+                    f"Наприклад: {'; '.join(report['violations'][:3])}"
+                )
 
             if created_matches:
                 messages.success(request, f"Розклад ({strategy_type}) з {len(created_matches)} матчів успішно згенеровано.")
@@ -352,10 +585,11 @@ def match_simulate(request, match_id):
         except Match.DoesNotExist:
              return redirect('simulator:index')
 
-    command = SimulateMatchResultCommand(match_id=match_id)
+    simulator = request.POST.get('simulator', 'simple')
+    command = SimulateMatchResultCommand(match_id=match_id, simulator=simulator if simulator in MATCH_SIMULATORS else 'simple')
     match = None
     try:
-        success = command.execute()
+        success = CommandJournal().execute(command) is not None
         match = command._get_match(match_id)
 
         if success:
@@ -384,6 +618,76 @@ def match_simulate(request, match_id):
     else:
         return redirect('simulator:index')
 
+def match_journal_action(request, match_id, action):
+    match = get_object_or_404(Match, pk=match_id)
+    if request.method != 'POST':
+        messages.error(request, "Неприпустимий метод запиту.")
+        return redirect('simulator:match_detail', match_id=match.id)
+
+    journal = CommandJournal()
+    try:
+        if action == 'undo':
+            journal.undo(match_id=match.id)
+            messages.success(request, f"Останню дію для матчу {match} скасовано.")
+        else:
+            journal.redo(match_id=match.id)
+            messages.success(request, f"Дію для матчу {match} повторено.")
+    except ValueError as e:
+        messages.error(request, str(e))
+    return redirect('simulator:match_detail', match_id=match.id)
+
+def match_undo(request, match_id):
+    return match_journal_action(request, match_id, 'undo')
+
+def match_redo(request, match_id):
+    return match_journal_action(request, match_id, 'redo')
+
+def batch_api_auth(view):
+    """
+    Доступ до пакетного API: токен з SIMULATOR_BATCH_API_TOKENS у заголовку
+    Authorization: Bearer <token> (скрипти, без CSRF) або сесія персоналу
+    з перевіркою CSRF, як у звичайних формах.
+    """
+    @csrf_exempt
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer':
+            if not any(constant_time_compare(token.strip(), known) for known in settings.SIMULATOR_BATCH_API_TOKENS):
+                return JsonResponse({'errors': ["Недійсний токен доступу."]}, status=401)
+            return view(request, *args, **kwargs)
+        if not request.user.is_authenticated:
+            response = JsonResponse({'errors': ["Потрібна автентифікація."]}, status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+        if not request.user.is_staff:
+            return JsonResponse({'errors': ["Недостатньо прав."]}, status=403)
+        if CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {}) is not None:
+            return JsonResponse({'errors': ["Перевірка CSRF не пройдена."]}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapped
+
+@batch_api_auth
+def match_results_batch(request):
+    """POST з JSON-пакетом результатів (див. batch_commands_from_payload); все або нічого."""
+    if request.method != 'POST':
+        return JsonResponse({'errors': ["Неприпустимий метод запиту."]}, status=405)
+    try:
+        commands = batch_commands_from_payload(json.loads(request.body or b'null'))
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+        return JsonResponse({'errors': [str(e)]}, status=400)
+
+    journal = CommandJournal()
+    try:
+        with transaction.atomic():
+            entries = [entry for command in commands for entry in journal.execute_batch(command)]
+    except ValidationError as e:
+        return JsonResponse({'errors': e.messages}, status=400)
+    return JsonResponse({
+        'applied': len(entries),
+        'journal_entries': [{'id': str(entry.id), 'match_id': str(entry.match_id)} for entry in entries],
+    })
+
 def match_create(request, tournament_id):
     tournament = get_object_or_404(Tournament, pk=tournament_id)
     tournament_teams = tournament.teams.all()
@@ -413,4 +717,15 @@ def match_create(request, tournament_id):
     else:
         form = MatchForm(tournament_teams=tournament_teams)
 
-    return render(request, 'simulator/match_form.html', {'form': form, 'tournament': tournament})
\ No newline at end of file
+    return render(request, 'simulator/match_form.html', {'form': form, 'tournament': tournament})
+
+@staff_member_required
+def query_metrics_view(request):
+    """Зведення QueryMetricsMiddleware по view (лише для персоналу); POST очищає вікно."""
+    if request.method == 'POST':
+        query_metrics.clear()
+    return JsonResponse({
+        'enabled': settings.SIMULATOR_QUERY_METRICS,
+        'duplicate_threshold': settings.SIMULATOR_QUERY_DUPLICATE_THRESHOLD,
+        'views': query_metrics.summary(settings.SIMULATOR_QUERY_BUDGETS),
+    })
\ No newline at end of file
@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'simulator.middleware.QueryMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'sports_simulator_project.urls'
@@ -126,3 +127,65 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Team squad/strength cache used by the simulators: an in-process LRU, optionally
+# backed by a shared cache from CACHES (set the alias to share it across processes).
+# With a shared alias every read checks a per-team version there, so invalidations reach
+# all workers; without one, other workers only drop their copies after the TTL (seconds).
+SIMULATOR_TEAM_CACHE_ALIAS = None
+SIMULATOR_TEAM_CACHE_SIZE = 2048
+SIMULATOR_TEAM_CACHE_TTL = 60
+
+# Team strength model used by simulations and projections: 'squad' (player count) or 'elo'.
+SIMULATOR_STRENGTH_PROVIDER = 'squad'
+
+# Logging for the simulator app. Per-match and per-player messages are logged at DEBUG,
+# so at the default INFO level bulk simulations and data generation do no per-item I/O.
+# SIMULATOR_LOG_FORMAT=json emits one JSON object per line for log collectors.
+SIMULATOR_LOG_LEVEL = os.environ.get('SIMULATOR_LOG_LEVEL', 'INFO')
+SIMULATOR_LOG_FORMAT = os.environ.get('SIMULATOR_LOG_FORMAT', 'text')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+        'json': {'()': 'simulator.log_formatting.JsonFormatter'},
+    },
+    'handlers': {
+        'simulator_console': {'class': 'logging.StreamHandler', 'formatter': SIMULATOR_LOG_FORMAT},
+    },
+    'loggers': {
+        'simulator': {'handlers': ['simulator_console'], 'level': SIMULATOR_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Per-view SQL query count / DB time instrumentation (simulator.middleware). Samples are kept
+# in a rolling in-process window and served to staff at /metrics/queries/. Views that exceed
+# their budget, or repeat one statement DUPLICATE_THRESHOLD+ times (likely N+1), log a warning.
+SIMULATOR_QUERY_METRICS = os.environ.get('SIMULATOR_QUERY_METRICS', '1' if DEBUG else '0') == '1'
+SIMULATOR_QUERY_METRICS_WINDOW = 200
+SIMULATOR_QUERY_DUPLICATE_THRESHOLD = 5
+SIMULATOR_QUERY_BUDGETS = {
+    'simulator:index': 5,
+    'simulator:event_list': 10,
+    'simulator:team_list': 10,
+    'simulator:player_list': 10,
+    'simulator:tournament_list': 10,
+    'simulator:tournament_detail': 20,
+    'simulator:match_detail': 20,
+}
+
+# Versioned cache for tournament pages, reports and API payloads (simulator.services.tournament_cache).
+# Entries are keyed by a per-tournament version bumped on every change, so they never need a TTL;
+# point the alias at a shared backend (file-based, Redis, Memcached) in CACHES to share across processes.
+# A process-local backend (LocMemCache, the default) cannot see other workers' version bumps, so there
+# versions and entries expire after the LOCAL_TIMEOUT (seconds) and check simulator.W001 warns outside DEBUG.
+SIMULATOR_TOURNAMENT_CACHE_ALIAS = 'default'
+SIMULATOR_TOURNAMENT_CACHE_TIMEOUT = None
+SIMULATOR_TOURNAMENT_CACHE_LOCAL_TIMEOUT = 60
+
+# Machine clients of the batch results endpoint (/matches/results/batch/) authenticate with
+# "Authorization: Bearer <token>" using one of these tokens (comma-separated in the environment);
+# token requests skip CSRF. Staff browser sessions may also POST there, with the usual CSRF check.
+SIMULATOR_BATCH_API_TOKENS = [token for token in os.environ.get('SIMULATOR_BATCH_API_TOKENS', '').split(',') if token]